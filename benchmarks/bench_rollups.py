@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Rollup benchmark: NumPy bucket statistics vs a pure-Python loop.
+
+Builds synthetic run histories of growing length and times (a) converting
+runs to columns, (b) the vectorized daily + weekly rollups and (c) the same
+statistics computed with dict grouping and sorted() per bucket. The two
+results are checked for equality before timings are reported.
+
+    python benchmarks/bench_rollups.py --years 1 5 10 --runs-per-day 48
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "scripts"))
+
+import rollups  # noqa: E402
+from run_records import WorkflowRun  # noqa: E402
+
+CONCLUSIONS = ["success"] * 8 + ["failure", "cancelled"]
+
+
+def synthetic_runs(years: int, runs_per_day: int) -> list[WorkflowRun]:
+    rng = random.Random(0)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    step = timedelta(days=1) / runs_per_day
+    return [
+        WorkflowRun(
+            id=i,
+            created_at=start + step * i,
+            conclusion=rng.choice(CONCLUSIONS),
+            duration=rng.lognormvariate(7.5, 0.4),
+        )
+        for i in range(years * 365 * runs_per_day)
+    ]
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    pos = q * (len(sorted_values) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (
+        pos - lo
+    )
+
+
+def python_rollup(runs: list[WorkflowRun], period: str) -> dict[str, list]:
+    """Reference implementation: group in a dict, sort each bucket."""
+    groups: dict[int, list[WorkflowRun]] = defaultdict(list)
+    for run in runs:
+        days = int(run.created_at.timestamp()) // rollups.SECONDS_PER_DAY
+        if period == "weekly":
+            days = (days + 3) // 7 * 7 - 3
+        groups[days].append(run)
+    out: dict[str, list] = defaultdict(list)
+    for days in sorted(groups):
+        bucket = groups[days]
+        durations = sorted(r.duration for r in bucket)
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        out["date"].append((epoch + timedelta(days=days)).date().isoformat())
+        out["count"].append(len(bucket))
+        for name, q in rollups.PERCENTILES.items():
+            out[name].append(round(_percentile(durations, q), 1))
+        out["max"].append(round(durations[-1], 1))
+        ok = sum((r.conclusion or "success") == "success" for r in bucket)
+        out["success_rate"].append(round(ok / len(bucket), 3))
+    return dict(out)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--runs-per-day", type=int, default=48)
+    args = parser.parse_args()
+
+    print(
+        f"{'years':>5} {'runs':>9} {'columns s':>10} {'numpy s':>9} "
+        f"{'python s':>9} {'speedup':>8}"
+    )
+    for years in args.years:
+        runs = synthetic_runs(years, args.runs_per_day)
+        columns, t_columns = timed(rollups.run_columns, runs)
+        vectorized, t_numpy = timed(
+            rollups.compute_rollups, {"series": columns}
+        )
+        reference, t_python = timed(
+            lambda: {p: python_rollup(runs, p) for p in rollups.PERIODS}
+        )
+        for period in rollups.PERIODS:
+            got = vectorized[period]["series"]
+            want = reference[period]
+            for key in got:
+                # Allow last-digit rounding differences between float paths.
+                assert len(got[key]) == len(want[key]), (period, key)
+                if key in ("date", "count"):
+                    assert got[key] == want[key], (period, key)
+                else:
+                    assert all(
+                        abs(a - b) <= 0.11 for a, b in zip(got[key], want[key])
+                    ), (period, key)
+        print(
+            f"{years:>5} {len(runs):>9} {t_columns:>10.3f} {t_numpy:>9.3f} "
+            f"{t_python:>9.3f} {t_python / t_numpy:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Memory benchmark: GitHub run dicts vs WorkflowRun records.
+
+Builds a synthetic history of GitHub-shaped runs and measures the memory
+held by (a) the API listing as full dicts, the way runs were passed around
+before, and (b) the same runs projected into WorkflowRun. It then does the
+same for the JSONL load path: entry dicts vs WorkflowRun.from_jsonl.
+
+    python benchmarks/bench_run_records.py --runs 100000
+"""
+
+import argparse
+import gc
+import json
+import pathlib
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "scripts"))
+
+from run_records import WORKFLOW_JSONL_FIELDS, WorkflowRun  # noqa: E402
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+CONCLUSIONS = ["success"] * 8 + ["failure", "cancelled"]
+
+
+def synthetic_api_run(i: int, start: datetime) -> dict:
+    """A run object with the field set of GET /actions/workflows/{id}/runs."""
+    created = start + timedelta(minutes=20 * i)
+    repo = {
+        "id": 123,
+        "name": "autoware",
+        "full_name": "autowarefoundation/autoware",
+        "owner": {"login": "autowarefoundation", "id": 1, "type": "Organization"},
+        "html_url": "https://github.com/autowarefoundation/autoware",
+        "description": "Autoware - the world's leading open-source software "
+        "project for autonomous driving",
+    }
+    return {
+        "id": 9_000_000_000 + i,
+        "name": "health-check",
+        "node_id": f"WFR_kwLOA{i:010d}",
+        "head_branch": "main",
+        "head_sha": f"{i:040x}",
+        "path": ".github/workflows/health-check.yaml",
+        "run_number": i,
+        "event": "schedule",
+        "status": "completed",
+        "conclusion": CONCLUSIONS[i % len(CONCLUSIONS)],
+        "workflow_id": 42,
+        "url": f"https://api.github.com/repos/o/r/actions/runs/{i}",
+        "html_url": f"https://github.com/o/r/actions/runs/{i}",
+        "created_at": created.strftime(TIME_FORMAT),
+        "updated_at": (created + timedelta(hours=2)).strftime(TIME_FORMAT),
+        "run_started_at": created.strftime(TIME_FORMAT),
+        "run_attempt": 1,
+        "jobs_url": f"https://api.github.com/repos/o/r/actions/runs/{i}/jobs",
+        "logs_url": f"https://api.github.com/repos/o/r/actions/runs/{i}/logs",
+        "actor": {"login": "github-actions[bot]", "id": 41898282, "type": "Bot"},
+        "triggering_actor": {"login": "github-actions[bot]", "id": 41898282},
+        "head_commit": {
+            "id": f"{i:040x}",
+            "message": f"chore: update {i}\n\nSigned-off-by: bot",
+            "author": {"name": "bot", "email": "bot@example.com"},
+        },
+        "repository": repo,
+        "head_repository": dict(repo),
+    }
+
+
+def measure(build) -> tuple[int, float]:
+    """Return (bytes retained by build()'s result, peak MiB while building)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak / 2**20
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100_000)
+    args = parser.parse_args()
+
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    pages = [
+        json.dumps(synthetic_api_run(i, start)) for i in range(args.runs)
+    ]
+
+    def api_dicts():
+        runs = [json.loads(p) for p in pages]
+        for run in runs:
+            for key in ("created_at", "updated_at", "run_started_at"):
+                run[key] = datetime.strptime(run[key], TIME_FORMAT).replace(
+                    tzinfo=timezone.utc
+                )
+            run["duration"] = 7200.0
+            run["jobs"] = {}
+        return runs
+
+    def api_records():
+        runs = [WorkflowRun.from_api(json.loads(p)) for p in pages]
+        for run in runs:
+            run.duration = 7200.0
+        return runs
+
+    records = api_records()
+    lines = [json.dumps(r.to_jsonl(WORKFLOW_JSONL_FIELDS)) for r in records]
+    del records
+
+    def jsonl_dicts():
+        entries = [json.loads(line) for line in lines]
+        for entry in entries:
+            entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+        return entries
+
+    def jsonl_records():
+        return [WorkflowRun.from_jsonl(json.loads(line)) for line in lines]
+
+    print(f"{args.runs} synthetic runs")
+    print(f"{'case':<22}{'retained MiB':>14}{'peak MiB':>10}{'B/run':>8}")
+    for name, build in [
+        ("api: dicts", api_dicts),
+        ("api: WorkflowRun", api_records),
+        ("jsonl: dicts", jsonl_dicts),
+        ("jsonl: WorkflowRun", jsonl_records),
+    ]:
+        retained, peak = measure(build)
+        print(
+            f"{name:<22}{retained / 2**20:>14.1f}{peak:>10.1f}"
+            f"{retained // args.runs:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
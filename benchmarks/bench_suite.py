@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite for the scrape, load, append and export paths.
+
+Cases:
+
+    scrape              backfill every series from an empty data dir
+    scrape-incremental  the next cron run: re-scrape a scraped data dir
+    logs                stream the logs zip of a few runs
+    load                load every stored series and the image sizes
+    append              append one day of new runs to every series
+    export              load, roll up and write the dashboard JSON
+
+The scrape cases talk to a local FakeGitHub (fake_github.py); the others
+run against a synthetic data-storage tree (synthetic_data.py), generated
+once per --runs/--years and reused from --work-dir.
+
+Each case runs in a fresh child process, so its peak RSS is its own. The
+fake server lives in this process and counts the requests. Results (wall
+time, requests, peak RSS) are printed and written as JSON, so runs on
+different commits can be diffed:
+
+    python benchmarks/bench_suite.py --runs 200000 --output before.json
+    git checkout <other>; python benchmarks/bench_suite.py ... --output after.json
+    python benchmarks/bench_suite.py --compare before.json after.json
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+HERE = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "scripts"))
+sys.path.insert(0, str(HERE))
+
+CASES = (
+    "scrape",
+    "scrape-incremental",
+    "logs",
+    "load",
+    "append",
+    "export",
+)
+
+
+# ---- child side: one case per process ------------------------------------
+
+
+def _all_series():
+    import measure_workflows as mw
+
+    return [(mw.REPO, spec["id"]) for spec in mw.WORKFLOWS.values()] + [
+        (spec["repo"], spec["workflow_id"]) for spec in mw.MULTI_REPO_WORKFLOWS
+    ]
+
+
+def case_scrape(data_dir: pathlib.Path, api_url: str, workers: int) -> None:
+    import github_api
+    import measure_workflows as mw
+    from storage import open_storage
+
+    store = open_storage(data_dir, None, mw.REPO, mw.MANIFEST_ID_WINDOW)
+    api = github_api.GitHubWorkflowAPI(
+        "fake-token", max_workers=workers, api_url=api_url
+    )
+    for key in mw.WORKFLOWS:
+        mw.collect_workflow_runs(key, store, api)
+    for spec in mw.MULTI_REPO_WORKFLOWS:
+        mw.collect_multi_repo_runs(
+            spec["repo"], spec["workflow_id"], store, api
+        )
+    store.close()
+
+
+def case_logs(data_dir: pathlib.Path, api_url: str, workers: int) -> None:
+    import github_api
+
+    api = github_api.GitHubWorkflowAPI("fake-token", api_url=api_url)
+    for run_id in range(1_000_000, 1_000_005):
+        for _, lines in api.iter_workflow_logs("fake/fake", str(run_id)):
+            for _ in lines:
+                pass
+
+
+def case_load(data_dir: pathlib.Path, api_url: str, workers: int) -> None:
+    import measure_workflows as mw
+    from storage import open_storage
+
+    store = open_storage(data_dir, None, mw.REPO, mw.MANIFEST_ID_WINDOW)
+    for repo, workflow_id in _all_series():
+        store.load_runs(repo, workflow_id)
+    mw.load_docker_image_history(store)
+
+
+def case_append(data_dir: pathlib.Path, api_url: str, workers: int) -> None:
+    import measure_workflows as mw
+    from storage import open_storage
+    from synthetic_data import synthetic_runs
+
+    store = open_storage(data_dir, None, mw.REPO, mw.MANIFEST_ID_WINDOW)
+    for k, (repo, workflow_id) in enumerate(_all_series()):
+        cursor = store.run_cursor(repo, workflow_id)
+        start = cursor.max_created_at + timedelta(minutes=1)
+        runs = synthetic_runs(48, start, start + timedelta(days=1), k == 0, k)
+        for run in runs:
+            run.id += 50_000_000
+        store.append_runs(repo, workflow_id, runs, cursor)
+
+
+def case_export(data_dir: pathlib.Path, api_url: str, workers: int) -> None:
+    import json_export
+    import measure_workflows as mw
+    from storage import open_storage
+
+    store = open_storage(data_dir, None, mw.REPO, mw.MANIFEST_ID_WINDOW)
+    hc = store.load_runs(mw.REPO, mw.WORKFLOWS["health-check"]["id"])
+    db = store.load_runs(mw.REPO, mw.WORKFLOWS["docker-build-and-push"]["id"])
+    repo_ci_runs = {
+        mw.repo_short_name(spec["repo"]): store.load_runs(
+            spec["repo"], spec["workflow_id"]
+        )
+        for spec in mw.MULTI_REPO_WORKFLOWS
+    }
+    docker_images = mw.load_docker_image_history(store)
+    rollup_data = mw.build_rollups(hc, db, repo_ci_runs)
+    document = mw.export_to_json(
+        hc, db, docker_images, repo_ci_runs, rollup_data=rollup_data
+    )
+    json_export.write_json(data_dir.parent / "export.json", document)
+
+
+CASE_FUNCTIONS = {
+    "scrape": case_scrape,
+    "scrape-incremental": case_scrape,
+    "logs": case_logs,
+    "load": case_load,
+    "append": case_append,
+    "export": case_export,
+}
+
+
+def run_child(args: argparse.Namespace) -> None:
+    fn = CASE_FUNCTIONS[args.child]
+    # Imports happen inside the cases; load them first so they are not timed.
+    import github_api  # noqa: F401
+    import json_export  # noqa: F401
+    import measure_workflows  # noqa: F401
+    import synthetic_data  # noqa: F401
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    fn(args.data_dir, args.api_url, args.api_workers)
+    seconds = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    args.result.write_text(
+        json.dumps(
+            {
+                "seconds": round(seconds, 3),
+                # ru_maxrss is in KiB on Linux.
+                "peak_rss_mb": round(peak / 1024, 1),
+                "baseline_rss_mb": round(baseline / 1024, 1),
+            }
+        )
+    )
+
+
+# ---- parent side -----------------------------------------------------------
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=HERE,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _spawn(
+    case: str,
+    data_dir: pathlib.Path,
+    api_url: str,
+    args: argparse.Namespace,
+) -> dict:
+    result = args.work_dir / "result.json"
+    result.unlink(missing_ok=True)
+    command = [
+        sys.executable,
+        str(pathlib.Path(__file__).resolve()),
+        "--child",
+        case,
+        "--data-dir",
+        str(data_dir),
+        "--api-url",
+        api_url,
+        "--api-workers",
+        str(args.api_workers),
+        "--result",
+        str(result),
+    ]
+    output = None if args.verbose else subprocess.DEVNULL
+    subprocess.run(command, check=True, stdout=output)
+    return json.loads(result.read_text())
+
+
+def _fresh_copy(source: Optional[pathlib.Path], target: pathlib.Path) -> None:
+    shutil.rmtree(target, ignore_errors=True)
+    if source is None:
+        target.mkdir(parents=True)
+    else:
+        shutil.copytree(source, target)
+
+
+def run_suite(args: argparse.Namespace) -> dict:
+    from fake_github import FakeGitHub
+    from synthetic_data import generate
+
+    args.work_dir.mkdir(parents=True, exist_ok=True)
+    tree = args.work_dir / f"data-{args.runs}-{args.years}y"
+    if not (tree / "workflow_runs").exists():
+        print(f"Generating {args.runs} synthetic runs into {tree} ...")
+        shutil.rmtree(tree, ignore_errors=True)
+        generate(tree, args.runs, args.years)
+
+    fake = FakeGitHub(
+        runs=args.api_runs,
+        # Spread over 60 days so the whole listing is inside the backfill.
+        interval=timedelta(days=60) / args.api_runs,
+        latency=args.latency,
+    ).start()
+    scratch = args.work_dir / "scratch" / "data-storage"
+    # Seeded from this server's history (relative to now) on first use.
+    scraped = args.work_dir / "scraped"
+    shutil.rmtree(scraped, ignore_errors=True)
+    results = {}
+    try:
+        for case in args.cases:
+            timings = []
+            for _ in range(args.repeat):
+                if case == "scrape-incremental" and not scraped.exists():
+                    _fresh_copy(None, scraped)
+                    _spawn("scrape", scraped, fake.url, args)
+                source = {
+                    "scrape": None,
+                    "scrape-incremental": scraped,
+                    "logs": None,
+                    "append": tree,
+                }.get(case)
+                if case in ("load", "export"):
+                    # Read-only; export writes next to the data dir.
+                    data_dir = tree
+                else:
+                    _fresh_copy(source, scratch)
+                    data_dir = scratch
+                fake.requests.clear()
+                timing = _spawn(case, data_dir, fake.url, args)
+                timing["requests"] = sum(fake.requests.values())
+                timing["requests_by_route"] = dict(sorted(fake.requests.items()))
+                timings.append(timing)
+            best = min(timings, key=lambda t: t["seconds"])
+            best["peak_rss_mb"] = max(t["peak_rss_mb"] for t in timings)
+            results[case] = best
+            print(
+                f"{case:<20} {best['seconds']:>8.2f}s "
+                f"{best['requests']:>7} req {best['peak_rss_mb']:>8.1f} MB"
+            )
+    finally:
+        fake.close()
+    return {
+        "commit": _git_commit(),
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "params": {
+            "runs": args.runs,
+            "years": args.years,
+            "api_runs": args.api_runs,
+            "latency": args.latency,
+            "api_workers": args.api_workers,
+            "repeat": args.repeat,
+        },
+        "cases": results,
+    }
+
+
+def compare(before_path: pathlib.Path, after_path: pathlib.Path) -> None:
+    before = json.loads(before_path.read_text())["cases"]
+    after = json.loads(after_path.read_text())["cases"]
+    print(f"{'case':<20} {'seconds':>17} {'requests':>15} {'peak MB':>17}")
+    for case in after:
+        if case not in before:
+            continue
+        b, a = before[case], after[case]
+        print(
+            f"{case:<20} {b['seconds']:>7.2f} -> {a['seconds']:<7.2f}"
+            f" {b['requests']:>6} -> {a['requests']:<6}"
+            f" {b['peak_rss_mb']:>7.1f} -> {a['peak_rss_mb']:<7.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--runs", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument(
+        "--api-runs",
+        type=int,
+        default=500,
+        help="Runs per workflow served by the fake API.",
+    )
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--api-workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--work-dir", type=pathlib.Path, default=pathlib.Path(".bench")
+    )
+    parser.add_argument(
+        "--output", type=pathlib.Path, default=pathlib.Path("bench-results.json")
+    )
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument(
+        "--compare", nargs=2, type=pathlib.Path, metavar=("BEFORE", "AFTER")
+    )
+    # Internal: run one case in this process.
+    parser.add_argument("--child", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", type=pathlib.Path, help=argparse.SUPPRESS)
+    parser.add_argument("--api-url", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=pathlib.Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+    elif args.compare:
+        compare(*args.compare)
+    else:
+        args.work_dir = args.work_dir.resolve()
+        report = run_suite(args)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
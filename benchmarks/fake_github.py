@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Local stand-in for the GitHub Actions endpoints the scraper calls.
+
+Every repository and workflow serves the same synthetic history: `runs`
+completed runs, one every `interval`, the newest at `end`. Served routes:
+
+    GET /repos/{owner}/{repo}/actions/workflows/{workflow}/runs
+        newest first, `per_page` (capped at 100) / `page` pagination,
+        `created=>=...` honoured the way GitHub applies it
+    GET /jobs/{run_id}                  (each run's jobs_url)
+    GET /repos/{owner}/{repo}/actions/runs/{run_id}/logs     (zip)
+
+Each response is delayed by `latency` seconds. No rate-limit headers are
+sent, so the client's scheduler never throttles. Requests are counted per
+route in `requests`.
+
+    python benchmarks/fake_github.py --runs 5000 --latency 0.05
+    # then point GitHubWorkflowAPI(api_url="http://127.0.0.1:<port>") at it
+"""
+
+import argparse
+import bisect
+import io
+import json
+import threading
+import time
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+CONCLUSIONS = ["success"] * 8 + ["failure", "cancelled"]
+JOB_NAMES = ["build (main)", "build (nightly)", "test"]
+
+
+class FakeGitHub:
+    def __init__(
+        self,
+        runs: int = 1000,
+        interval: timedelta = timedelta(hours=1),
+        end: Optional[datetime] = None,
+        latency: float = 0.0,
+        log_lines: int = 10000,
+    ):
+        self.latency = latency
+        self.log_lines = log_lines
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        end = end or datetime.now(timezone.utc).replace(microsecond=0)
+        # Oldest first; the listing reverses it.
+        self.created = [end - interval * (runs - 1 - i) for i in range(runs)]
+        self._logs: Optional[bytes] = None
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None, "server not started"
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FakeGitHub":
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeGitHub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self.requests[route] += 1
+
+    def run(self, index: int, host: str) -> dict:
+        created = self.created[index]
+        started = created + timedelta(minutes=1)
+        run_id = 1_000_000 + index
+        return {
+            "id": run_id,
+            "name": "workflow",
+            "run_attempt": 1,
+            "status": "completed",
+            "conclusion": CONCLUSIONS[index % len(CONCLUSIONS)],
+            "created_at": created.strftime(TIME_FORMAT),
+            "run_started_at": started.strftime(TIME_FORMAT),
+            "updated_at": (
+                started + timedelta(minutes=30 + index % 60)
+            ).strftime(TIME_FORMAT),
+            "html_url": f"https://github.com/fake/fake/actions/runs/{run_id}",
+            "jobs_url": f"http://{host}/jobs/{run_id}",
+            "head_sha": f"{index:040x}",
+            "head_commit": {"message": f"Commit {index}\n\nBody text."},
+            # Bulk the real listing carries and the scraper ignores.
+            "repository": {"full_name": "fake/fake", "description": "x" * 200},
+            "actor": {"login": "someone", "avatar_url": "https://x/" + "y" * 60},
+        }
+
+    def jobs(self, run_id: int) -> dict:
+        index = run_id - 1_000_000
+        started = self.created[index] + timedelta(minutes=1)
+        jobs = []
+        for k, name in enumerate(JOB_NAMES):
+            completed = started + timedelta(minutes=10 + (index + k) % 50)
+            jobs.append(
+                {
+                    "name": name,
+                    "started_at": started.strftime(TIME_FORMAT),
+                    "completed_at": completed.strftime(TIME_FORMAT),
+                }
+            )
+        return {"total_count": len(jobs), "jobs": jobs}
+
+    def logs(self) -> bytes:
+        if self._logs is None:
+            buf = io.BytesIO()
+            with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+                for name in JOB_NAMES:
+                    archive.writestr(
+                        f"{name}/1_run.txt",
+                        "".join(
+                            f"2026-01-01T00:00:00Z {name} step line {i}\n"
+                            for i in range(self.log_lines)
+                        ),
+                    )
+            self._logs = buf.getvalue()
+        return self._logs
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeGitHub
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        fake = self.fake
+        if fake.latency:
+            time.sleep(fake.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith("/runs"):
+            fake.count("runs")
+            self._send(200, self._runs_page(query), "application/json")
+        elif url.path.startswith("/jobs/"):
+            fake.count("jobs")
+            run_id = int(url.path.rsplit("/", 1)[1])
+            body = json.dumps(fake.jobs(run_id)).encode()
+            self._send(200, body, "application/json")
+        elif url.path.endswith("/logs"):
+            fake.count("logs")
+            self._send(200, fake.logs(), "application/zip")
+        else:
+            fake.count("other")
+            self._send(404, b'{"message": "Not Found"}', "application/json")
+
+    def _runs_page(self, query: dict) -> bytes:
+        fake = self.fake
+        per_page = min(int(query.get("per_page", ["30"])[0]), 100)
+        page = int(query.get("page", ["1"])[0])
+        first = 0
+        created = query.get("created", [""])[0]
+        if created.startswith(">="):
+            since = datetime.strptime(created[2:], TIME_FORMAT).replace(
+                tzinfo=timezone.utc
+            )
+            first = bisect.bisect_left(fake.created, since)
+        total = len(fake.created) - first
+        # Newest first: page 1 starts at the end of the history.
+        stop = len(fake.created) - (page - 1) * per_page
+        start = max(first, stop - per_page)
+        host = self.headers["Host"]
+        runs = [fake.run(i, host) for i in range(stop - 1, start - 1, -1)]
+        return json.dumps({"total_count": total, "workflow_runs": runs}).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--interval-minutes", type=float, default=60)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeGitHub(
+        runs=args.runs,
+        interval=timedelta(minutes=args.interval_minutes),
+        latency=args.latency,
+    ).start()
+    print(f"Serving {args.runs} runs per workflow at {fake.url} (Ctrl-C stops)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.close()
+        print(dict(fake.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Local stand-in for the parts of the GHCR registry API the scripts call.
+
+Each tag maps to a list of (layer name, uncompressed size) pairs. A layer
+name used by several tags is one shared blob, as in a real registry. Layer
+contents are deterministic, moderately compressible bytes, gzipped once
+and kept in memory. Served routes:
+
+    GET  /token                                  {"token": ...}
+    GET/HEAD /v2/{name}/manifests/{tag}          manifest list (amd64, arm64)
+    GET/HEAD /v2/{name}/manifests/{digest}       image manifest or list
+    GET  /v2/{name}/blobs/{digest}               302 to /cdn/{digest}
+    GET  /cdn/{digest}                           the blob; honours Range
+
+Responses carry Docker-Content-Digest and Content-Length, and every
+request is counted per route in `requests` (bytes sent in `bytes_sent`).
+
+With auth=True, manifest and blob requests need a token from /token that
+has not outlived `token_ttl` or been dropped by `revoke_tokens()`; others
+get a 401 (counted as "unauthorized").
+
+    python benchmarks/fake_registry.py --layers 4 --layer-mb 8
+    # then pass http://127.0.0.1:<port> as the registry URL
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse
+
+MANIFEST_LIST_TYPE = "application/vnd.docker.distribution.manifest.list.v2+json"
+MANIFEST_TYPE = "application/vnd.docker.distribution.manifest.v2+json"
+LAYER_TYPE = "application/vnd.docker.image.rootfs.diff.tar.gzip"
+
+Layers = list[tuple[str, int]]
+
+
+def _layer_bytes(name: str, size: int) -> bytes:
+    """`size` bytes of text-like data, seeded by the layer name."""
+    rng = random.Random(name)
+    words = [
+        bytes(rng.choices(b"abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 9)))
+        for _ in range(512)
+    ]
+    out = bytearray()
+    while len(out) < size:
+        out += b" ".join(rng.choices(words, k=256)) + b"\n"
+    return bytes(out[:size])
+
+
+def _digest(data: bytes) -> str:
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+class FakeRegistry:
+    def __init__(
+        self,
+        tags: dict[str, Layers],
+        latency: float = 0.0,
+        auth: bool = False,
+        token_ttl: int = 300,
+    ):
+        self.latency = latency
+        self.auth = auth
+        self.token_ttl = token_ttl
+        # token -> time.monotonic() it expires at
+        self.issued: dict[str, float] = {}
+        self.requests: Counter = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.blobs: dict[str, bytes] = {}
+        self.uncompressed: dict[str, int] = {}
+        self.manifests: dict[str, bytes] = {}
+        self.tags: dict[str, str] = {}
+        for tag, layers in tags.items():
+            self.set_tag(tag, layers)
+
+    def set_tag(self, tag: str, layers: Layers) -> str:
+        """(Re)point tag at an image of `layers`; return its amd64 digest."""
+        descriptors = []
+        for name, size in layers:
+            raw = _layer_bytes(name, size)
+            # mtime=0 keeps a layer's blob, and so its digest, stable.
+            blob = gzip.compress(raw, mtime=0)
+            digest = _digest(blob)
+            self.blobs[digest] = blob
+            self.uncompressed[digest] = size
+            descriptors.append(
+                {"mediaType": LAYER_TYPE, "size": len(blob), "digest": digest}
+            )
+        image = json.dumps(
+            {
+                "schemaVersion": 2,
+                "mediaType": MANIFEST_TYPE,
+                "config": {"mediaType": "config", "size": 0, "digest": ""},
+                "layers": descriptors,
+            }
+        ).encode()
+        amd64 = _digest(image)
+        self.manifests[amd64] = image
+        index = json.dumps(
+            {
+                "schemaVersion": 2,
+                "mediaType": MANIFEST_LIST_TYPE,
+                "manifests": [
+                    {
+                        "mediaType": MANIFEST_TYPE,
+                        "digest": "sha256:" + "0" * 64,
+                        "platform": {"architecture": "arm64", "os": "linux"},
+                    },
+                    {
+                        "mediaType": MANIFEST_TYPE,
+                        "digest": amd64,
+                        "size": len(image),
+                        "platform": {"architecture": "amd64", "os": "linux"},
+                    },
+                ],
+            }
+        ).encode()
+        self.manifests[tag] = index
+        self.manifests[_digest(index)] = index
+        self.tags[tag] = amd64
+        return amd64
+
+    def uncompressed_size(self, tag: str) -> int:
+        image = json.loads(self.manifests[self.tags[tag]])
+        return sum(self.uncompressed[l["digest"]] for l in image["layers"])
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None, "server not started"
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FakeRegistry":
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeRegistry":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def issue_token(self) -> str:
+        with self._lock:
+            token = f"fake-registry-token-{len(self.issued) + 1}"
+            self.issued[token] = time.monotonic() + self.token_ttl
+        return token
+
+    def revoke_tokens(self) -> None:
+        """Make every token issued so far expire now."""
+        with self._lock:
+            self.issued = dict.fromkeys(self.issued, 0.0)
+
+    def authorized(self, header: str) -> bool:
+        if not self.auth:
+            return True
+        expiry = self.issued.get(header.removeprefix("Bearer "))
+        return expiry is not None and time.monotonic() < expiry
+
+    def count(self, route: str, sent: int) -> None:
+        with self._lock:
+            self.requests[route] += 1
+            self.bytes_sent += sent
+
+
+_MANIFEST = re.compile(r"^/v2/.+/manifests/([^/]+)$")
+_BLOB = re.compile(r"^/v2/.+/blobs/([^/]+)$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeRegistry
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(
+        self,
+        route: str,
+        status: int,
+        body: bytes = b"",
+        headers: Optional[dict] = None,
+        head: bool = False,
+    ) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        self.fake.count(route, 0 if head else len(body))
+
+    def do_HEAD(self) -> None:
+        self._route(head=True)
+
+    def do_GET(self) -> None:
+        self._route(head=False)
+
+    def _route(self, head: bool) -> None:
+        fake = self.fake
+        if fake.latency:
+            time.sleep(fake.latency)
+        path = urlparse(self.path).path
+        if path == "/token":
+            body = json.dumps(
+                {"token": fake.issue_token(), "expires_in": fake.token_ttl}
+            ).encode()
+            self._send("token", 200, body, {"Content-Type": "application/json"})
+            return
+        if path.startswith("/v2/") and not fake.authorized(
+            self.headers.get("Authorization", "")
+        ):
+            self._send("unauthorized", 401, b"{}", head=head)
+            return
+        match = _MANIFEST.match(path)
+        if match:
+            body = fake.manifests.get(match.group(1))
+            if body is None:
+                self._send("manifest", 404, b"{}", head=head)
+                return
+            media_type = json.loads(body)["mediaType"]
+            headers = {
+                "Content-Type": media_type,
+                "Docker-Content-Digest": _digest(body),
+            }
+            route = "manifest-head" if head else "manifest"
+            self._send(route, 200, body, headers, head)
+            return
+        match = _BLOB.match(path)
+        if match:
+            # GHCR hands blobs off to a CDN; mirror that redirect.
+            self._send("blob", 302, headers={"Location": f"/cdn/{match[1]}"})
+            return
+        if path.startswith("/cdn/"):
+            self._blob(path[len("/cdn/") :], head)
+            return
+        self._send("other", 404, b"{}")
+
+    def _blob(self, digest: str, head: bool) -> None:
+        blob = self.fake.blobs.get(digest)
+        if blob is None:
+            self._send("cdn", 404, b"", head=head)
+            return
+        match = _RANGE.match(self.headers.get("Range", ""))
+        if not match:
+            self._send("cdn", 200, blob, {"Docker-Content-Digest": digest}, head)
+            return
+        first, last = match.groups()
+        if first == "":
+            start, end = max(len(blob) - int(last), 0), len(blob)
+        else:
+            start = int(first)
+            end = min(int(last) + 1, len(blob)) if last else len(blob)
+        headers = {"Content-Range": f"bytes {start}-{end - 1}/{len(blob)}"}
+        self._send("cdn-range", 206, blob[start:end], headers, head)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tags", nargs="+", default=["core-humble"])
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--layer-mb", type=float, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    size = int(args.layer_mb * 1024 * 1024)
+    # The first half of the layers is shared by every tag.
+    shared = [(f"base-{i}", size) for i in range(args.layers // 2)]
+    fake = FakeRegistry(
+        {
+            tag: shared
+            + [(f"{tag}-{i}", size) for i in range(args.layers - len(shared))]
+            for tag in args.tags
+        },
+        latency=args.latency,
+    ).start()
+    print(f"Serving {args.tags} at {fake.url} (Ctrl-C stops)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.close()
+        print(dict(fake.requests), fake.bytes_sent, "bytes sent")
+
+
+if __name__ == "__main__":
+    main()
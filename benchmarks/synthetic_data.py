@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Generate a synthetic data-storage tree for the benchmarks.
+
+Runs are spread evenly over `years` ending now and split across the series
+the scraper keeps: health-check (with per-job durations),
+docker-build-and-push, and build-and-test of every MULTI_REPO_WORKFLOWS
+repository. They are written through JsonlStorage, so the yearly files and
+cursor manifests have exactly the production layout. One docker image size
+entry per canonical tag and day is added as well.
+
+    python benchmarks/synthetic_data.py --out /tmp/data-storage --runs 200000
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "scripts"))
+
+import measure_workflows as mw  # noqa: E402
+from run_records import WorkflowRun  # noqa: E402
+from storage import JsonlStorage  # noqa: E402
+
+CONCLUSIONS = ["success"] * 8 + ["failure", "cancelled"]
+JOB_NAMES = [
+    "docker-build (main)",
+    "docker-build (nightly)",
+    "docker-build (main-cuda)",
+    "docker-build (nightly-cuda)",
+]
+
+
+def series_specs() -> list[tuple[str, str, bool]]:
+    """(repo, workflow_id, has_jobs) of every stored run series."""
+    specs = [
+        (mw.REPO, spec["id"], spec["accurate"]) for spec in mw.WORKFLOWS.values()
+    ]
+    specs += [
+        (spec["repo"], spec["workflow_id"], False)
+        for spec in mw.MULTI_REPO_WORKFLOWS
+    ]
+    return specs
+
+
+def synthetic_runs(
+    count: int, start: datetime, end: datetime, has_jobs: bool, seed: int
+) -> list[WorkflowRun]:
+    rng = random.Random(seed)
+    step = (end - start) / max(count, 1)
+    runs = []
+    for i in range(count):
+        jobs = (
+            {name: round(rng.uniform(600, 7200), 1) for name in JOB_NAMES}
+            if has_jobs
+            else {}
+        )
+        runs.append(
+            WorkflowRun(
+                id=10_000_000 + i,
+                created_at=(start + step * i).replace(microsecond=0),
+                conclusion=rng.choice(CONCLUSIONS),
+                duration=sum(jobs.values()) or round(rng.uniform(300, 9000), 1),
+                jobs=jobs,
+                html_url=f"https://github.com/fake/fake/actions/runs/{i}",
+                head_sha=f"{rng.getrandbits(160):040x}",
+                commit_title=f"fix(component): change number {i}",
+            )
+        )
+    return runs
+
+
+def image_size_entries(start: datetime, end: datetime) -> list[dict]:
+    rng = random.Random(1)
+    entries = []
+    day = start.replace(hour=3, minute=0, second=0, microsecond=0)
+    while day < end:
+        for tag in mw.CANONICAL_TAGS:
+            compressed = rng.randint(3, 12) * 1024**3
+            entries.append(
+                {
+                    "tag": tag,
+                    "fetched_at": day.isoformat(),
+                    "compressed_size_bytes": compressed,
+                    "uncompressed_size_bytes": compressed * 3,
+                    "num_layers": rng.randint(20, 60),
+                    "digest": f"sha256:{rng.getrandbits(256):064x}",
+                }
+            )
+        day += timedelta(days=1)
+    return entries
+
+
+def generate(
+    out: pathlib.Path, runs: int, years: int, seed: int = 0
+) -> dict[str, int]:
+    """Write the tree under `out`; return the number of runs per series."""
+    store = JsonlStorage(out, mw.REPO, mw.MANIFEST_ID_WINDOW)
+    end = datetime.now(timezone.utc).replace(microsecond=0)
+    start = end - timedelta(days=365 * years)
+    specs = series_specs()
+    counts = {}
+    for k, (repo, workflow_id, has_jobs) in enumerate(specs):
+        count = runs // len(specs) + (k < runs % len(specs))
+        series_runs = synthetic_runs(count, start, end, has_jobs, seed + k)
+        # Year by year keeps memory to one year of one series.
+        for year in range(start.year, end.year + 1):
+            store.append_runs(
+                repo,
+                workflow_id,
+                [r for r in series_runs if r.created_at.year == year],
+            )
+        counts[f"{repo}/{workflow_id}"] = count
+    store.append_image_sizes(image_size_entries(start, end))
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", required=True, type=pathlib.Path)
+    parser.add_argument("--runs", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.out.exists() and any(args.out.iterdir()):
+        parser.error(f"{args.out} is not empty")
+    started = time.perf_counter()
+    counts = generate(args.out, args.runs, args.years, args.seed)
+    for name, count in counts.items():
+        print(f"{count:>9} {name}")
+    print(f"Wrote {sum(counts.values())} runs in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,18 @@ const SWIMLANE_JITTER = 0.32;
 let rawData = null;
 let charts = {};
 
+// Sharded payloads written by measure_workflows.py --shard-dir. Windows up
+// to index.recent.days render from the small recent shard; longer ones pull
+// the per-year archives they overlap. Without an index the dashboard falls
+// back to the monolithic github_action_data.json. The rollups (from
+// index.rollups.file) and meta (from the index itself) are not sharded;
+// they are attached to every window's data, as in the monolithic payload.
+const SHARD_DIR = 'data';
+let shardIndex = null;
+let recentData = null;
+let sharedSections = {};
+const archiveCache = {};
+
 // Initial state is hydrated from ?duration=…&distro=… so views are
 // shareable via URL. Anything not in the URL falls back to defaults.
 function readStateFromUrl() {
@@ -655,6 +667,91 @@ function renderImageSizeTable(containerId, sizeField) {
     </table>`;
 }
 
+function fetchJson(url) {
+  return fetch(url).then(res => {
+    if (!res.ok) throw new Error(`${url}: HTTP ${res.status} ${res.statusText}`);
+    return res.json();
+  });
+}
+
+// Year shards cover disjoint ranges, so merging is a per-series concat in
+// year order.
+function mergeShards(shards) {
+  const merged = {
+    generated_at: shards.length ? shards[shards.length - 1].generated_at : null,
+    workflow_time: {},
+    docker_images: {},
+    repo_ci_runs: {},
+  };
+  for (const shard of shards) {
+    for (const section of ['workflow_time', 'docker_images', 'repo_ci_runs']) {
+      for (const [key, items] of Object.entries(shard[section] || {})) {
+        merged[section][key] = (merged[section][key] || []).concat(items);
+      }
+    }
+  }
+  return merged;
+}
+
+function withSharedSections(data) {
+  return Object.assign(data, sharedSections);
+}
+
+function loadDataFor(durationKey) {
+  if (!shardIndex) return Promise.resolve(rawData);
+  const days = DURATION_DAYS[durationKey];
+  if (days !== null && days <= shardIndex.recent.days) {
+    return Promise.resolve(recentData);
+  }
+  const cutoff = cutoffDate(durationKey);
+  const archives = shardIndex.archives.filter(
+    a => !cutoff || a.year >= cutoff.getFullYear());
+  return Promise.all(archives.map(a => {
+    if (!archiveCache[a.file]) {
+      archiveCache[a.file] = fetchJson(`${SHARD_DIR}/${a.file}`);
+    }
+    return archiveCache[a.file];
+  })).then(shards => withSharedSections(mergeShards(shards)));
+}
+
+function loadInitialData() {
+  return fetchJson(`${SHARD_DIR}/index.json`)
+    .then(index => Promise.all([
+      fetchJson(`${SHARD_DIR}/${index.recent.file}`),
+      index.rollups ? fetchJson(`${SHARD_DIR}/${index.rollups.file}`) : null,
+    ]).then(([recent, rollups]) => {
+      sharedSections = {};
+      if (rollups) sharedSections.rollups = rollups;
+      if (index.meta) sharedSections.meta = index.meta;
+      shardIndex = index;
+      recentData = withSharedSections(recent);
+    }))
+    .then(() => loadDataFor(currentDuration), err => {
+      console.warn('dashboard shards unavailable, loading full payload', err);
+      return fetchJson('github_action_data.json');
+    });
+}
+
+// Swap in the data for the selected window, then render. A slower archive
+// fetch for a window the user has already left is dropped.
+function refreshData() {
+  const requested = currentDuration;
+  return loadDataFor(requested)
+    .then(data => {
+      if (requested !== currentDuration) return;
+      rawData = data;
+      setDashboardStatus(null);
+      renderAll();
+    })
+    .catch(err => {
+      console.error('dashboard archive load failed', err);
+      setDashboardStatus(
+        'error',
+        `Failed to load history for this window: ${escapeHtml(err.message || String(err))}.`
+      );
+    });
+}
+
 function renderAll() {
   const cutoff = cutoffDate(currentDuration);
   charts.repoSwimlane.setOption(repoSwimlaneOption(cutoff), true);
@@ -697,7 +794,7 @@ function wireDurationButtons() {
       currentDuration = btn.dataset.duration;
       syncButtonActive('[data-duration]', currentDuration, 'duration');
       writeStateToUrl();
-      renderAll();
+      refreshData();
     });
   });
 }
@@ -812,11 +909,7 @@ function wireThemeToggle() {
   });
 }
 
-fetch('github_action_data.json')
-  .then(res => {
-    if (!res.ok) throw new Error(`HTTP ${res.status} ${res.statusText}`);
-    return res.json();
-  })
+loadInitialData()
   .then(json => {
     rawData = json;
     setDashboardStatus(null);
@@ -840,6 +933,6 @@ fetch('github_action_data.json')
     console.error('dashboard load failed', err);
     setDashboardStatus(
       'error',
-      `Failed to load <code>github_action_data.json</code>: ${escapeHtml(err.message || String(err))}. Retry in a minute — if this persists, the Pages deploy may be mid-publish or the scraper may have errored.`
+      `Failed to load dashboard data: ${escapeHtml(err.message || String(err))}. Retry in a minute — if this persists, the Pages deploy may be mid-publish or the scraper may have errored.`
     );
   });
@@ -3,9 +3,16 @@
 
 Fetches the amd64 manifest digest for each canonical tag from GHCR (cheap —
 no image pulls) and compares it against the digest on the most recent
-JSONL entry for that tag in the data-storage directory. Emits the list of
-tags whose digest differs so the workflow can skip the expensive pull /
-measure step when nothing upstream has changed.
+JSONL entry for that tag in the data-storage directory. Those entries come
+from the sidecar latest-entry index docker_image_size.py keeps up to date
+(rebuilt in one pass if missing or stale), not from a scan per tag. Emits
+the list of tags whose digest differs so the workflow can skip the
+expensive pull / measure step when nothing upstream has changed.
+
+All tags are probed at once over one keep-alive session, mostly with a
+single HEAD each (see probe_digest), and each tag's latency is printed.
+A tag whose digest cannot be read is reported as unknown, not as changed:
+an unreachable registry says nothing about the image.
 
 When run inside GitHub Actions ($GITHUB_OUTPUT set), writes:
   changed-tags=<comma-separated tag list, may be empty>
@@ -13,65 +20,154 @@ When run inside GitHub Actions ($GITHUB_OUTPUT set), writes:
 """
 
 import argparse
-import json
 import os
 import pathlib
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
 
 from docker_image_size import (
     IMAGE,
+    MANIFEST_LIST_TYPE,
+    MANIFEST_TYPE,
     ORG,
     REGISTRY_URL,
-    get_auth_token,
-    get_compressed_size,
+    amd64_digest,
+    registry_auth,
 )
 from image_tags import TAGS as CANONICAL_TAGS
+from registry_auth import TokenProvider
+from storage import open_storage
+
+PROBE_WORKERS = 8
+
+
+def probe_digest(
+    session: requests.Session,
+    image: str,
+    tag: str,
+    auth: TokenProvider,
+    recorded: dict,
+) -> str:
+    """amd64 digest of tag, as docker_image_size records it.
+
+    A HEAD on the tag returns the digest and type of what it points at. For
+    an image manifest that digest is the answer. For a manifest list equal
+    to the recorded entry's list_digest, the recorded amd64 digest still
+    holds. Only a list not seen before is read (by digest, so it is the one
+    the HEAD saw), and its amd64 entry taken; the amd64 manifest itself is
+    never fetched.
+    """
+    headers = {"Accept": f"{MANIFEST_LIST_TYPE}, {MANIFEST_TYPE}"}
+    response = auth.request(
+        session, "HEAD", f"{image}/manifests/{tag}", headers=headers, timeout=30
+    )
+    response.raise_for_status()
+    digest = response.headers.get("Docker-Content-Digest", "")
+    media_type = response.headers.get("Content-Type", "").split(";")[0]
+    if digest and media_type != MANIFEST_LIST_TYPE:
+        return digest
+    if digest and digest == recorded.get("list_digest") and recorded["digest"]:
+        return recorded["digest"]
+
+    response = auth.request(
+        session,
+        "GET",
+        f"{image}/manifests/{digest or tag}",
+        headers=headers,
+        timeout=30,
+    )
+    response.raise_for_status()
+    manifest = response.json()
+    if manifest.get("mediaType") != MANIFEST_LIST_TYPE:
+        return response.headers.get("Docker-Content-Digest", "")
+    return amd64_digest(manifest)
+
+
+def probe_digests(
+    image: str,
+    tags: list[str],
+    auth: TokenProvider,
+    recorded: dict[str, dict],
+    workers: int = PROBE_WORKERS,
+) -> dict[str, tuple[str, float]]:
+    """tag -> (digest or '' if unavailable, seconds), probed concurrently."""
 
+    def probe(tag: str) -> tuple[str, float]:
+        started = time.perf_counter()
+        try:
+            digest = probe_digest(
+                session, image, tag, auth, recorded.get(tag, {})
+            )
+        except Exception as e:
+            print(f"Warning: failed to get digest for {tag}: {e}")
+            digest = ""
+        return digest, time.perf_counter() - started
 
-def latest_recorded_digest(data_dir: pathlib.Path, tag: str) -> str:
-    """Return the digest of the most recent JSONL entry for tag, or '' if none."""
-    latest_at = ""
-    latest_digest = ""
-    for path in sorted(data_dir.glob("docker_image_sizes-*.jsonl")):
-        with path.open() as f:
-            for line in f:
-                entry = json.loads(line)
-                if entry.get("tag") != tag:
-                    continue
-                fa = entry.get("fetched_at", "")
-                if fa > latest_at:
-                    latest_at = fa
-                    latest_digest = entry.get("digest", "")
-    return latest_digest
+    workers = max(1, min(workers, len(tags)))
+    with requests.Session() as session, ThreadPoolExecutor(workers) as pool:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return dict(zip(tags, pool.map(probe, tags)))
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--data-dir", required=True, type=pathlib.Path)
     parser.add_argument("--github-token", default="")
+    parser.add_argument(
+        "--sqlite-db",
+        type=pathlib.Path,
+        default=None,
+        help="Look digests up in this SQLite index instead of scanning JSONL.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PROBE_WORKERS,
+        help="Tags probed at once.",
+    )
+    # Overridable to run against benchmarks/fake_registry.py.
+    parser.add_argument("--registry-url", default=REGISTRY_URL)
     args = parser.parse_args()
+    store = open_storage(args.data_dir, args.sqlite_db)
 
-    try:
-        token = get_auth_token(args.github_token)
-    except Exception as e:
-        print(f"Warning: failed to obtain registry token: {e}")
-        token = ""
+    auth = registry_auth(args.github_token, args.registry_url)
 
-    image = f"{REGISTRY_URL}/v2/{ORG}/{IMAGE}"
+    image = f"{args.registry_url}/v2/{ORG}/{IMAGE}"
+    latest = store.latest_image_sizes()
+    started = time.perf_counter()
+    probed = probe_digests(image, CANONICAL_TAGS, auth, latest, args.workers)
+    elapsed = time.perf_counter() - started
     changed = []
+    unknown = []
     for tag in CANONICAL_TAGS:
-        # Reuse the manifest fetcher; throw away size/layer count, keep digest.
-        _, _, current = get_compressed_size(image, tag, token)
-        recorded = latest_recorded_digest(args.data_dir, tag)
-        is_changed = current != recorded
-        marker = "CHANGED" if is_changed else "same   "
-        print(f"  {marker}  {tag}")
+        current, seconds = probed[tag]
+        recorded = latest.get(tag, {}).get("digest", "")
+        is_changed = bool(current) and current != recorded
+        if not current:
+            marker = "unknown"
+            unknown.append(tag)
+        else:
+            marker = "CHANGED" if is_changed else "same   "
+        print(f"  {marker}  {tag}  ({seconds * 1000:.0f} ms)")
         print(f"      current : {current[:23] if current else '(unavailable)'}")
         print(f"      recorded: {recorded[:23] if recorded else '(none)'}")
         if is_changed:
             changed.append(tag)
 
+    store.close()
     print(f"\n{len(changed)}/{len(CANONICAL_TAGS)} tags need measurement")
+    if unknown:
+        print(f"Warning: could not check {', '.join(unknown)}")
+    print(
+        f"Probed {len(CANONICAL_TAGS)} tags in {elapsed * 1000:.0f} ms "
+        f"({auth.fetches} token requests)"
+    )
 
     out_path = os.environ.get("GITHUB_OUTPUT")
     if out_path:
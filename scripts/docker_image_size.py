@@ -4,13 +4,26 @@ import http.client
 import json
 import os
 import pathlib
+import shutil
 import socket
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Iterable, Optional
 
 import requests
 from subprocess import run, PIPE
 
-from image_tags import TAGS, TAG_GROUPS
+from image_layers import (
+    LAYER_CACHE_NAME,
+    LayerCache,
+    layer_records,
+    share_breakdown,
+)
+from image_tags import TAGS
+from pull_scheduler import layer_footprints, schedule_pulls
+from registry_auth import TokenProvider
+from storage import open_storage
 
 print = functools.partial(print, flush=True)
 
@@ -19,105 +32,249 @@ REGISTRY_URL = f"http://{REGISTRY}"
 ORG = "autowarefoundation"
 IMAGE = "autoware"
 OUTPUT_DIR = "data-storage"
-OUTPUT_FILE_TEMPLATE = "docker_image_sizes-{year}.jsonl"
+REGISTRY_SCOPE = f"repository:{ORG}/{IMAGE}:pull"
+
+MANIFEST_LIST_TYPE = "application/vnd.docker.distribution.manifest.list.v2+json"
+MANIFEST_TYPE = "application/vnd.docker.distribution.manifest.v2+json"
+GZIP_LAYER_TYPES = {
+    "application/vnd.docker.image.rootfs.diff.tar.gzip",
+    "application/vnd.oci.image.layer.v1.tar+gzip",
+}
+TAR_LAYER_TYPES = {
+    "application/vnd.docker.image.rootfs.diff.tar",
+    "application/vnd.oci.image.layer.v1.tar",
+}
+# Layer blobs are decompressed in chunks of this size as they arrive.
+BLOB_CHUNK_SIZE = 1024 * 1024
+# The gzip ISIZE trailer is the last member's size mod 2**32. A wrap past
+# 4 GiB that lands below the compressed size is caught (deflate never
+# shrinks data by more than its framing), but one landing above it reads
+# like a plausible size. The trailer is therefore only used for layers too
+# small to reach 4 GiB unless they compress better than ISIZE_MAX_RATIO;
+# larger layers are streamed. Autoware layers compress 2-3x, so a wrong
+# size needs a layer over 10x more compressible than usual, and is then
+# short by a multiple of 4 GiB.
+ISIZE_MAX_RATIO = 32
+ISIZE_MAX_COMPRESSED = 2**32 // ISIZE_MAX_RATIO
+# eStargz layers are multi-member gzip; their ISIZE covers one file only.
+STARGZ_ANNOTATION = "containerd.io/snapshot/stargz/toc.digest"
+# Pulls run together at most this many at a time (see pull_scheduler.py).
+MAX_PARALLEL_PULLS = 3
+# Disk space pulls leave free, in GB.
+DISK_RESERVE_GB = 10
+
+
+def registry_auth(
+    github_token: str = "", registry_url: str = REGISTRY_URL
+) -> TokenProvider:
+    """Token provider for pulling ORG/IMAGE, to share across registry calls.
+
+    If github_token (or else $GITHUB_TOKEN) is set, it is exchanged for
+    registry tokens with pull scope. Otherwise, tokens are anonymous.
+    """
+    github_token = github_token or os.environ.get("GITHUB_TOKEN", "")
+    return TokenProvider(registry_url, github_token, REGISTRY_SCOPE)
+
+
+def amd64_digest(manifest_list: dict) -> str:
+    """Digest of the amd64 entry of a manifest list (else its first one)."""
+    for m in manifest_list.get("manifests", []):
+        if m.get("platform", {}).get("architecture") == "amd64":
+            return m["digest"]
+    # Fallback to first manifest if no amd64
+    return manifest_list["manifests"][0]["digest"]
+
+
+def get_amd64_manifest(
+    image: str,
+    tag: str,
+    auth: TokenProvider,
+    session: Optional[requests.Session] = None,
+) -> tuple[dict, str, str]:
+    """Resolve tag to its amd64 image manifest.
+
+    Returns (manifest, digest, list_digest). list_digest is that of the
+    manifest list the tag points at, or '' when it points at an image
+    manifest directly; check_image_digests uses it to skip re-reading an
+    unchanged list.
+    """
+    # A Session, or the requests module itself (see TokenProvider).
+    client = session or requests
+
+    # Get manifest list (handles multi-arch images)
+    manifest_list_url = f"{image}/manifests/{tag}"
+    headers_list = {"Accept": MANIFEST_LIST_TYPE}
 
+    response = auth.request(
+        client, "GET", manifest_list_url, headers=headers_list, timeout=30
+    )
+    response.raise_for_status()
+    manifest_list = response.json()
+    response_digest = response.headers.get("Docker-Content-Digest", "")
+
+    # Handle both manifest list and direct manifest
+    if manifest_list.get("mediaType") != MANIFEST_LIST_TYPE:
+        # Already a direct manifest, not a list
+        return manifest_list, response_digest, ""
+
+    # Fetch the amd64 manifest (use first amd64 architecture)
+    digest = amd64_digest(manifest_list)
+    headers_manifest = {"Accept": MANIFEST_TYPE}
+    response = auth.request(
+        client,
+        "GET",
+        f"{image}/manifests/{digest}",
+        headers=headers_manifest,
+        timeout=30,
+    )
+    response.raise_for_status()
+    amd64_manifest = response.json()
 
-def get_auth_token(github_token: str = "") -> str:
-    """Get authentication token from GitHub Container Registry.
+    if not amd64_manifest:
+        raise ValueError("Failed to retrieve manifest")
+    return amd64_manifest, digest, response_digest
 
-    If github_token is provided, exchange it for a registry access token with pull scope.
-    Otherwise, request an anonymous token.
-    """
-    url = f"{REGISTRY_URL}/token?service=ghcr.io&scope=repository:{ORG}/{IMAGE}:pull"
-    headers = {}
-    if github_token:
-        print("Exchanging GitHub token for registry access token")
-        headers["Authorization"] = f"Bearer {github_token}"
-        headers["Accept"] = "application/json"
-        print("Requesting access token with pull scope")
-        print("Headers:", headers)
-    else:
-        print("Requesting anonymous access token")
 
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
-    data = response.json()
-    return data.get("token", "")
+def manifest_compressed_size(tag: str, manifest: dict) -> tuple[int, int]:
+    """(compressed_size_bytes, num_layers) from an image manifest."""
+    # Get manifest layer sizes (compressed)
+    total_compressed = 0
+    layers = manifest.get("layers", [])
+    for layer in layers:
+        total_compressed += layer.get("size", 0)
+
+    print(
+        f"Compressed size for {tag}: {total_compressed} bytes ({len(layers)} layers)"
+    )
+    return total_compressed, len(layers)
 
 
-def get_compressed_size(image: str, tag: str, token: str) -> tuple[int, int, str]:
+def get_compressed_size(
+    image: str, tag: str, auth: TokenProvider
+) -> tuple[int, int, str]:
     """Get the compressed size of a Docker image from registry manifest.
 
     Returns a tuple of (compressed_size_bytes, num_layers, digest).
     """
     try:
-        headers = {
-            "Authorization": f"Bearer {token}",
-        }
-
-        # Get manifest list (handles multi-arch images)
-        manifest_list_url = f"{image}/manifests/{tag}"
-        headers_list = headers.copy()
-        headers_list["Accept"] = (
-            "application/vnd.docker.distribution.manifest.list.v2+json"
-        )
-
-        response = requests.get(manifest_list_url, headers=headers_list, timeout=30)
-        response.raise_for_status()
-        manifest_list = response.json()
-
-        # Get the amd64 manifest (use first amd64 architecture)
-        amd64_manifest = None
-        amd64_digest = None
-
-        # Handle both manifest list and direct manifest
-        if manifest_list.get("mediaType") == (
-            "application/vnd.docker.distribution.manifest.list.v2+json"
-        ):
-            for m in manifest_list.get("manifests", []):
-                if m.get("platform", {}).get("architecture") == "amd64":
-                    amd64_digest = m["digest"]
-                    break
-
-            if not amd64_digest:
-                # Fallback to first manifest if no amd64
-                amd64_digest = manifest_list["manifests"][0]["digest"]
-        else:
-            # Already a direct manifest, not a list
-            amd64_manifest = manifest_list
-            amd64_digest = None
-
-        # Fetch the actual manifest if we have a digest
-        if amd64_digest:
-            headers_manifest = headers.copy()
-            headers_manifest["Accept"] = (
-                "application/vnd.docker.distribution.manifest.v2+json"
-            )
-            response = requests.get(
-                f"{image}/manifests/{amd64_digest}",
-                headers=headers_manifest,
-                timeout=30,
-            )
-            response.raise_for_status()
-            amd64_manifest = response.json()
+        manifest, digest, _ = get_amd64_manifest(image, tag, auth)
+        return (*manifest_compressed_size(tag, manifest), digest)
+    except Exception as e:
+        print(f"Warning: Failed to get compressed size for {tag}: {e}")
+        return 0, 0, ""
 
-        if not amd64_manifest:
-            raise ValueError("Failed to retrieve manifest")
 
-        # Get manifest layer sizes (compressed)
-        total_compressed = 0
-        layers = amd64_manifest.get("layers", [])
-        for layer in layers:
-            total_compressed += layer.get("size", 0)
+def gunzipped_size(chunks: Iterable[bytes]) -> int:
+    """Decompressed byte count of a gzip stream, one chunk at a time.
 
-        print(
-            f"Compressed size for {tag}: {total_compressed} bytes ({len(layers)} layers)"
+    Output is produced at most BLOB_CHUNK_SIZE at a time and dropped at
+    once, so memory stays flat however well a layer compresses.
+    Concatenated gzip members are followed, as gzip(1) does.
+    """
+    total = 0
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    in_member = False
+    for data in chunks:
+        while data:
+            in_member = True
+            total += len(decompressor.decompress(data, BLOB_CHUNK_SIZE))
+            data = decompressor.unconsumed_tail
+            if decompressor.eof:
+                # The rest of the input starts the next member.
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+                in_member = False
+    total += len(decompressor.flush())
+    if in_member and not decompressor.eof:
+        raise ValueError("truncated gzip stream")
+    return total
+
+
+def _isize_applies(layer: dict) -> bool:
+    if layer.get("size", 0) > ISIZE_MAX_COMPRESSED:
+        return False
+    return STARGZ_ANNOTATION not in (layer.get("annotations") or {})
+
+
+def _trusted_isize(layer: dict, isize: int) -> bool:
+    # Deflate never shrinks a stream by more than its framing, so a smaller
+    # ISIZE means it wrapped around 4 GiB. A wrap landing above the
+    # compressed size is bounded by ISIZE_MAX_COMPRESSED instead.
+    size = layer.get("size", 0)
+    return isize >= size - size // 100 - 64
+
+
+def layer_uncompressed_size(
+    session: requests.Session,
+    image: str,
+    layer: dict,
+    auth: TokenProvider,
+    use_isize: bool = True,
+) -> int:
+    """Uncompressed size of one layer blob, streamed and never stored."""
+    media_type = layer.get("mediaType", "")
+    if media_type in TAR_LAYER_TYPES:
+        return layer.get("size", 0)
+    if media_type not in GZIP_LAYER_TYPES:
+        raise ValueError(f"unsupported layer media type {media_type!r}")
+    url = f"{image}/blobs/{layer['digest']}"
+    if use_isize and _isize_applies(layer):
+        response = auth.request(
+            session, "GET", url, headers={"Range": "bytes=-4"}, timeout=30
         )
-        return total_compressed, len(layers), amd64_digest or ""
-
+        response.raise_for_status()
+        if response.status_code == 206 and len(response.content) == 4:
+            isize = int.from_bytes(response.content, "little")
+            if _trusted_isize(layer, isize):
+                return isize
+    with auth.request(
+        session, "GET", url, stream=True, timeout=30
+    ) as response:
+        response.raise_for_status()
+        return gunzipped_size(response.iter_content(BLOB_CHUNK_SIZE))
+
+
+def get_registry_uncompressed_size(
+    image: str,
+    tag: str,
+    auth: TokenProvider,
+    manifest: Optional[dict] = None,
+    use_isize: bool = True,
+    layer_cache: Optional[LayerCache] = None,
+) -> int:
+    """Uncompressed size of an image from its layer blobs, without a pull.
+
+    `manifest` is the amd64 manifest if already resolved. Layers are
+    streamed through a decompressor (or sized from their gzip trailer, see
+    ISIZE_MAX_COMPRESSED), so nothing is written to disk. Layers found in
+    `layer_cache` are not fetched at all, and measured ones are added to
+    it. The result is the total of the layer tarballs, which is close to,
+    but not the same as, what `docker image ls` reports for an unpacked
+    image. Returns 0 if unable to determine.
+    """
+    try:
+        if manifest is None:
+            manifest, _, _ = get_amd64_manifest(image, tag, auth)
+        total = 0
+        with requests.Session() as session:
+            for layer in manifest.get("layers", []):
+                size = None
+                if layer_cache is not None:
+                    size = layer_cache.uncompressed_size(layer["digest"])
+                if size is None:
+                    size = layer_uncompressed_size(
+                        session, image, layer, auth, use_isize
+                    )
+                    if layer_cache is not None:
+                        layer_cache.put(
+                            layer["digest"], layer.get("size", 0), size
+                        )
+                total += size
     except Exception as e:
-        print(f"Warning: Failed to get compressed size for {tag}: {e}")
-        return 0, 0, ""
+        print(f"Warning: Failed to size the layers of {tag}: {e}")
+        return 0
+    print(f"Uncompressed size for {tag} (registry): {total} bytes")
+    return total
 
 
 def get_image_disk_usage(image_ref: str) -> int:
@@ -215,16 +372,65 @@ def remove_docker_images(image: str, tags: list[str]) -> None:
             print(f"Warning: prune failed with {cmd}: {e}")
 
 
-def get_image_size(token: str, tag: str) -> dict:
-    """Get the compressed and uncompressed size of a Docker image."""
+def docker_root_dir() -> str:
+    """Where the container engine keeps images, for free-space checks."""
+    for cmd, field in [
+        ("docker", "{{.DockerRootDir}}"),
+        ("podman", "{{.Store.GraphRoot}}"),
+    ]:
+        try:
+            result = run(
+                [cmd, "info", "--format", field],
+                stdout=PIPE,
+                stderr=PIPE,
+                text=True,
+                timeout=30,
+            )
+        except Exception:
+            continue
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    return "/"
+
+
+def get_image_size(
+    auth: TokenProvider,
+    tag: str,
+    measure: str = "pull",
+    registry_url: str = REGISTRY_URL,
+    layer_cache: Optional[LayerCache] = None,
+    resolved: Optional[tuple[dict, str, str]] = None,
+) -> dict:
+    """Get the compressed and uncompressed size of a Docker image.
+
+    measure="pull" takes the uncompressed size from a pulled image;
+    "registry" sums the layer blobs without pulling, measuring only layers
+    `layer_cache` does not know yet. The layers are listed in the result
+    either way, with uncompressed sizes where the cache has them.
+    `resolved` is get_amd64_manifest's result for tag, if already fetched.
+    """
     try:
         # Get compressed size from registry manifest
-        image = f"{REGISTRY_URL}/v2/{ORG}/{IMAGE}"
-        compressed_size, num_layers, digest = get_compressed_size(image, tag, token)
-
-        # Get uncompressed size by pulling the image
-        image = f"{REGISTRY}/{ORG}/{IMAGE}"
-        uncompressed_size = get_uncompressed_size(image, tag)
+        image = f"{registry_url}/v2/{ORG}/{IMAGE}"
+        try:
+            manifest, digest, list_digest = resolved or get_amd64_manifest(
+                image, tag, auth
+            )
+        except Exception as e:
+            if measure == "registry":
+                raise
+            # The pull can still measure the image; it goes without layers.
+            print(f"Warning: Failed to get compressed size for {tag}: {e}")
+            manifest, digest, list_digest = {}, "", ""
+        compressed_size, num_layers = manifest_compressed_size(tag, manifest)
+        if measure == "registry":
+            uncompressed_size = get_registry_uncompressed_size(
+                image, tag, auth, manifest, layer_cache=layer_cache
+            )
+        else:
+            # Get uncompressed size by pulling the image
+            image = f"{REGISTRY}/{ORG}/{IMAGE}"
+            uncompressed_size = get_uncompressed_size(image, tag)
 
         return {
             "tag": tag,
@@ -234,6 +440,9 @@ def get_image_size(token: str, tag: str) -> dict:
             "uncompressed_size_gb": round(uncompressed_size / (1000**3), 2),
             "num_layers": num_layers,
             "digest": digest,
+            "list_digest": list_digest,
+            "measured_by": measure,
+            "layers": layer_records(manifest, layer_cache),
             "fetched_at": (datetime.now(timezone.utc).isoformat()),
         }
     except Exception as e:
@@ -246,6 +455,93 @@ def get_image_size(token: str, tag: str) -> dict:
         }
 
 
+def measurement_line(size_info: dict) -> Optional[dict]:
+    """The JSONL line for a get_image_size result; None if it failed."""
+    tag = size_info["tag"]
+    if "error" in size_info:
+        print(f"  {tag}: Error - {size_info['error']} (skipped)")
+        return None
+    print(
+        f"  {tag}: "
+        f"{size_info['compressed_size_gb']} GB (compressed), "
+        f"{size_info['uncompressed_size_gb']} GB (uncompressed) "
+        f"with {size_info['num_layers']} layers"
+    )
+    return {
+        "tag": size_info["tag"],
+        "fetched_at": size_info["fetched_at"],
+        "compressed_size_bytes": size_info["compressed_size_bytes"],
+        "uncompressed_size_bytes": size_info["uncompressed_size_bytes"],
+        "num_layers": size_info["num_layers"],
+        "digest": size_info["digest"],
+        "list_digest": size_info["list_digest"],
+        "measured_by": size_info["measured_by"],
+        "layers": size_info["layers"],
+    }
+
+
+def pull_and_measure(
+    auth: TokenProvider,
+    tags: list[str],
+    registry_url: str,
+    layer_cache: LayerCache,
+    max_parallel: int,
+    can_prune: bool,
+    reserve: int,
+    budget: Optional[int] = None,
+) -> list[dict]:
+    """Measure tags by pulling them, in the waves pull_scheduler plans."""
+    image = f"{registry_url}/v2/{ORG}/{IMAGE}"
+    resolved = {}
+    with requests.Session() as session:
+        for tag in tags:
+            try:
+                resolved[tag] = get_amd64_manifest(image, tag, auth, session)
+            except Exception as e:
+                # The pull can still measure the image; it goes without layers.
+                print(f"Warning: Failed to get compressed size for {tag}: {e}")
+                resolved[tag] = ({}, "", "")
+    layers_by_tag = {
+        tag: manifest.get("layers", [])
+        for tag, (manifest, _, _) in resolved.items()
+    }
+
+    root = docker_root_dir()
+
+    def free_bytes() -> int:
+        free = shutil.disk_usage(root).free
+        print(f"{free / 1e9:.1f} GB free under {root}")
+        return free - reserve
+
+    pull_image = f"{REGISTRY}/{ORG}/{IMAGE}"
+    lines = []
+    waves = schedule_pulls(
+        layers_by_tag,
+        layer_footprints(layers_by_tag, layer_cache),
+        free_bytes,
+        max_parallel,
+        can_prune,
+        budget,
+    )
+    for wave in waves:
+        if wave.prune:
+            remove_docker_images(pull_image, wave.prune)
+            continue
+        print(f"Fetching size for tags: {', '.join(wave.pull)}")
+        with ThreadPoolExecutor(max_workers=len(wave.pull)) as executor:
+            results = executor.map(
+                lambda tag: get_image_size(
+                    auth, tag, "pull", registry_url, layer_cache, resolved[tag]
+                ),
+                wave.pull,
+            )
+            for size_info in results:
+                line = measurement_line(size_info)
+                if line is not None:
+                    lines.append(line)
+    return lines
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Retrieve Docker image sizes from GHCR"
@@ -265,10 +561,31 @@ def main():
         action="store_true",
         help=(
             "Allow the script to remove pulled images and run `docker system prune` "
-            "between tag groups. Off by default to protect local Docker state; "
-            "CI runners should pass this flag to free disk between distros."
+            "when the next pull would not fit the disk budget. Off by default "
+            "to protect local Docker state; CI runners should pass this flag."
         ),
     )
+    parser.add_argument(
+        "--max-parallel-pulls",
+        type=int,
+        default=MAX_PARALLEL_PULLS,
+        help="Images pulled at the same time, disk budget permitting.",
+    )
+    parser.add_argument(
+        "--disk-budget-gb",
+        type=float,
+        default=None,
+        help=(
+            "Most disk the pulled images may take up at once (default: all "
+            "free space but --disk-reserve-gb)."
+        ),
+    )
+    parser.add_argument(
+        "--disk-reserve-gb",
+        type=float,
+        default=DISK_RESERVE_GB,
+        help="Disk space pulls always leave free.",
+    )
     parser.add_argument(
         "--tags",
         default="",
@@ -278,18 +595,39 @@ def main():
             "images."
         ),
     )
+    parser.add_argument(
+        "--sqlite-db",
+        type=pathlib.Path,
+        default=None,
+        help="Also record measurements in this SQLite index (see storage.py).",
+    )
+    parser.add_argument(
+        "--measure",
+        choices=("pull", "registry"),
+        default="pull",
+        help=(
+            "How to get the uncompressed size: pull the image and ask the "
+            "Docker Engine (default), or stream the layer blobs from the "
+            "registry through a decompressor, with no pull and no disk use."
+        ),
+    )
+    # Overridable so --measure registry can run against a local stand-in
+    # (see benchmarks/fake_registry.py); pulls always go to REGISTRY.
+    parser.add_argument("--registry-url", default=REGISTRY_URL)
     args = parser.parse_args()
 
     print(f"Fetching Docker image sizes for {ORG}/{IMAGE}")
 
+    auth = registry_auth(args.github_token, args.registry_url)
     try:
-        token = get_auth_token(args.github_token)
+        auth.token()
     except Exception as e:
+        # Requests fetch a token again when they need one.
         print(f"Warning: Failed to get auth token: {e}")
-        token = ""
 
     output_dir = pathlib.Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    store = open_storage(output_dir, args.sqlite_db)
 
     selected = {t.strip() for t in args.tags.split(",") if t.strip()}
     if selected:
@@ -298,45 +636,62 @@ def main():
             print(f"Warning: ignoring unknown tags: {sorted(unknown)}")
         print(f"Measuring filtered subset: {sorted(selected & set(TAGS))}")
 
-    pull_image = f"{REGISTRY}/{ORG}/{IMAGE}"
-    written = 0
-    for group in TAG_GROUPS:
-        group_to_measure = [t for t in group if not selected or t in selected]
-        if not group_to_measure:
-            continue
-        for tag in group_to_measure:
+    layer_cache = LayerCache(output_dir / LAYER_CACHE_NAME)
+    to_measure = [t for t in TAGS if not selected or t in selected]
+    lines = []
+    if args.measure == "registry":
+        # Nothing is pulled, so there is no disk to schedule.
+        for tag in to_measure:
             print(f"Fetching size for tag: {tag}")
-            size_info = get_image_size(token, tag)
-            if "error" in size_info:
-                print(f"  {tag}: Error - {size_info['error']} (skipped)")
-                continue
-            print(
-                f"  {tag}: "
-                f"{size_info['compressed_size_gb']} GB (compressed), "
-                f"{size_info['uncompressed_size_gb']} GB (uncompressed) "
-                f"with {size_info['num_layers']} layers"
+            line = measurement_line(
+                get_image_size(
+                    auth, tag, args.measure, args.registry_url, layer_cache
+                )
             )
-            line = {
-                "tag": size_info["tag"],
-                "fetched_at": size_info["fetched_at"],
-                "compressed_size_bytes": size_info["compressed_size_bytes"],
-                "uncompressed_size_bytes": size_info["uncompressed_size_bytes"],
-                "num_layers": size_info["num_layers"],
-                "digest": size_info["digest"],
-            }
-            year = datetime.fromisoformat(size_info["fetched_at"]).year
-            out_path = output_dir / OUTPUT_FILE_TEMPLATE.format(year=year)
-            with out_path.open("a") as f:
-                f.write(json.dumps(line) + "\n")
-            written += 1
-        if args.allow_pruning_images:
-            remove_docker_images(pull_image, group_to_measure)
-        else:
+            if line is not None:
+                lines.append(line)
+    else:
+        if not args.allow_pruning_images:
             print(
                 "Skipping image pruning (pass --allow-pruning-images to enable; "
                 "off by default to protect local Docker state)."
             )
+        budget = args.disk_budget_gb
+        lines = pull_and_measure(
+            auth,
+            to_measure,
+            args.registry_url,
+            layer_cache,
+            max(1, args.max_parallel_pulls),
+            args.allow_pruning_images,
+            int(args.disk_reserve_gb * 1e9),
+            int(budget * 1e9) if budget is not None else None,
+        )
 
+    # Shares are taken against every tag's newest image: measured in this
+    # run, or else as last recorded.
+    layers_by_tag = {
+        tag: entry["layers"]
+        for tag, entry in store.latest_image_sizes().items()
+        if tag in TAGS and "layers" in entry
+    }
+    layers_by_tag.update((line["tag"], line["layers"]) for line in lines)
+    for line in lines:
+        line.update(share_breakdown(line["tag"], layers_by_tag))
+        print(
+            f"  {line['tag']}: {line['unique_bytes']} B unique, "
+            f"{line['shared_bytes']} B shared with other tags"
+        )
+    written = store.append_image_sizes(lines)
+    store.close()
+
+    in_use = {l["digest"] for ls in layers_by_tag.values() for l in ls}
+    pruned = layer_cache.prune(in_use)
+    layer_cache.save()
+    print(
+        f"Layer cache: {layer_cache.hits} hits, {layer_cache.misses} measured, "
+        f"{pruned} pruned, {len(layer_cache.layers)} kept"
+    )
     print(f"Appended {written} measurements under {output_dir}/")
 
 
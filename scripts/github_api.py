@@ -1,13 +1,78 @@
 # GitHub Workflow API wrapper
+import asyncio
+import contextvars
+import io
 import math
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Container, Iterator, Mapping, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from http_cache import ResponseCache
+from perf_metrics import DEFAULT_RECORDER, Recorder
+from rate_limit import RequestScheduler
+from run_records import WorkflowRun
 
-class GitHubWorkflowAPI:
-    def __init__(self, github_token: str):
+API_URL = "https://api.github.com"
+
+# Upper bound on in-flight requests per client. GitHub discourages heavy
+# concurrency against one token (secondary rate limits), so keep it small.
+DEFAULT_MAX_WORKERS = 4
+
+# Download chunk size when spooling run logs to disk.
+LOG_CHUNK_SIZE = 1024 * 1024
+
+# Every client sends through this scheduler unless given its own, so all
+# of them draw from the same view of the token's rate-limit budget.
+DEFAULT_SCHEDULER = RequestScheduler()
+
+# Known run ids, or a predicate returning True for runs to leave out.
+RunFilter = Union[Container[int], Callable[[WorkflowRun], bool], None]
+
+
+def naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """`dt` as naive UTC, the form the pull request/package parsers produce."""
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _in_context(fn: Callable) -> Callable:
+    """fn, run by pool threads in a copy of the caller's context.
+
+    That carries the caller's log buffer (parallel_targets) and perf target
+    over to the worker threads.
+    """
+    context = contextvars.copy_context()
+    # One Context cannot be entered by two threads at once: copy per call.
+    return lambda *args: context.copy().run(fn, *args)
+
+
+class GitHubAPIClient:
+    """Shared transport for the GitHub API wrappers below.
+
+    Holds the auth headers, a keep-alive session sized for `max_workers`
+    concurrent requests, and an optional on-disk ResponseCache. Passing the
+    same cache to several clients lets them all revalidate against it.
+    Requests go out through a RequestScheduler, and stage timings go to a
+    perf_metrics Recorder; both are shared process-wide by default.
+    """
+
+    def __init__(
+        self,
+        github_token: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        api_url: str = API_URL,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        recorder: Optional[Recorder] = None,
+    ):
         self.github_token = github_token
         self.headers = {
             "Accept": "application/vnd.github+json",
@@ -15,6 +80,78 @@ class GitHubWorkflowAPI:
             "X-GitHub-Api-Version": "2022-11-28",
         }
         self.time_format = "%Y-%m-%dT%H:%M:%SZ"
+        # api_url is overridable so the client can be pointed at a local
+        # stand-in for the GitHub API.
+        self.api_url = api_url.rstrip("/")
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        self.scheduler = (
+            scheduler if scheduler is not None else DEFAULT_SCHEDULER
+        )
+        self.recorder = recorder if recorder is not None else DEFAULT_RECORDER
+        # One keep-alive session shared by all worker threads; the pool is
+        # sized so concurrent page fetches never wait for a free connection.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.max_workers, pool_maxsize=self.max_workers
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        return self.scheduler.get(self.session, url, **kwargs)
+
+    def _get_json(
+        self, url: str, params: Optional[dict] = None, cache: bool = True
+    ):
+        """GET url as JSON; through the ETag cache unless cache=False.
+
+        Responses that are never requested again (the jobs of a run, which
+        is stored once enriched) pass cache=False, so they don't evict
+        the listing pages the cache exists for.
+        """
+        if cache and self.cache is not None:
+            return self.cache.get_json(
+                self._get, url, headers=self.headers, params=params
+            )
+        response = self._get(url, headers=self.headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _paginate(self, url: str, params: Optional[dict] = None) -> Iterator:
+        """Yield each page of a list endpoint, following Link rel="next".
+
+        Callers stop consuming as soon as they have what they need, and the
+        remaining pages are never requested.
+        """
+        next_url: Optional[str] = url
+        headers: Mapping[str, str]
+        while next_url:
+            if self.cache is not None:
+                page, headers = self.cache.get(
+                    self._get, next_url, headers=self.headers, params=params
+                )
+            else:
+                response = self._get(next_url, headers=self.headers, params=params)
+                response.raise_for_status()
+                page, headers = response.json(), response.headers
+            yield page
+            links = requests.utils.parse_header_links(headers.get("Link", ""))
+            next_url = next(
+                (link["url"] for link in links if link.get("rel") == "next"), None
+            )
+            # The next link already carries the query string.
+            params = None
+
+
+class GitHubWorkflowAPI(GitHubAPIClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Runs/s of the most recent jobs-API fan-out (accurate=True only).
+        self.jobs_throughput = 0.0
+        # Jobs-API calls avoided by enrich_workflow_runs' skip filter over
+        # the client's lifetime.
+        self.jobs_calls_saved = 0
 
     def get_workflow_duration_list(
         self,
@@ -26,6 +163,124 @@ class GitHubWorkflowAPI:
         branch: Optional[str] = None,
         only_success: bool = True,
     ):
+        workflow_runs = self.list_workflow_runs(
+            repo,
+            workflow_id,
+            created_after=created_after,
+            event=event,
+            branch=branch,
+            only_success=only_success,
+        )
+        return self.enrich_workflow_runs(workflow_runs, accurate=accurate)
+
+    def list_workflow_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        created_after: Optional[datetime] = None,
+        event: Optional[str] = None,
+        branch: Optional[str] = None,
+        only_success: bool = True,
+    ) -> list[WorkflowRun]:
+        """Listing phase: parsed runs, oldest first, without durations."""
+        endpoint, payloads = self._runs_request(
+            repo, workflow_id, created_after, event, branch
+        )
+
+        with self.recorder.span("list") as span:
+            first_page_response = self._get_json(endpoint, params=payloads)
+            workflow_runs = first_page_response["workflow_runs"]
+
+            # Reuse first_page_response to get the total count of workflow runs
+            pages_needed = self._pages_needed(first_page_response, payloads)
+
+            def fetch_page(page: int) -> list[dict]:
+                params = {**payloads, "page": page}
+                page_response = self._get_json(endpoint, params=params)
+                return page_response["workflow_runs"]
+
+            # Pages 2..N are independent once total_count is known, so fetch
+            # them concurrently. executor.map yields in submission order,
+            # which keeps the merged list in page order regardless of
+            # completion order.
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for page_runs in executor.map(
+                    _in_context(fetch_page), range(2, pages_needed + 1)
+                ):
+                    workflow_runs += page_runs
+
+            span["pages"] = max(pages_needed, 1)
+            span["runs"] = len(workflow_runs)
+        return self._prepare_runs(workflow_runs, only_success)
+
+    def enrich_workflow_runs(
+        self,
+        workflow_runs: list[WorkflowRun],
+        accurate=False,
+        skip: RunFilter = None,
+    ) -> list[WorkflowRun]:
+        """Enrichment phase: fill in `duration` and `jobs`.
+
+        Runs matched by `skip` (a set of known run ids, or a predicate on
+        the run dict) are left out of the result, and with accurate=True
+        no jobs-API call is made for them.
+        """
+        workflow_runs = self._drop_skipped(workflow_runs, skip, accurate)
+
+        # Extract duration from each workflow run
+        if not accurate:
+            self._set_wall_clock_durations(workflow_runs)
+            return workflow_runs
+
+        # By calling jobs API for each workflow run. Runs are independent, so
+        # the calls fan out over the worker pool; each task fills in its own
+        # run dict, which keeps the returned list in created_at order.
+        def fetch_jobs(run: WorkflowRun) -> bool:
+            try:
+                json_response = self._get_json(run.jobs_url, cache=False)
+            except (requests.RequestException, ValueError) as e:
+                print(f"Error in fetching jobs from {run.jobs_url}: {e}")
+                return False
+            return self._apply_jobs(run, json_response)
+
+        started = time.monotonic()
+        fetched = [False] * len(workflow_runs)
+        fetch = _in_context(fetch_jobs)
+        with self.recorder.span("jobs") as span, ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            futures = {
+                executor.submit(fetch, run): index
+                for index, run in enumerate(workflow_runs)
+            }
+            # Progress is reported in completion order; the counter rather
+            # than the run index tracks how far along the fan-out is.
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                fetched[index] = future.result()
+                if fetched[index]:
+                    self._print_progress(
+                        done, len(workflow_runs), workflow_runs[index]
+                    )
+            span["runs"] = len(workflow_runs)
+            span["failed"] = fetched.count(False)
+        self._record_throughput(len(workflow_runs), time.monotonic() - started)
+
+        # A run whose jobs could not be fetched has no duration; drop it
+        # here instead of letting it fail the duration filters downstream.
+        return [run for run, ok in zip(workflow_runs, fetched) if ok]
+
+    # The helpers below hold everything in get_workflow_duration_list that
+    # does not do I/O, so AsyncGitHubWorkflowAPI produces identical output.
+
+    def _runs_request(
+        self,
+        repo: str,
+        workflow_id: str,
+        created_after: Optional[datetime],
+        event: Optional[str],
+        branch: Optional[str],
+    ) -> tuple[str, dict]:
         payloads = {"per_page": 100, "status": "completed", "page": "1"}
         if created_after is not None:
             # GitHub accepts "?created=>=YYYY-MM-DDTHH:MM:SSZ" as a server-side
@@ -36,201 +291,378 @@ class GitHubWorkflowAPI:
         if branch is not None:
             payloads["branch"] = branch
         endpoint = (
-            f"https://api.github.com/repos/{repo}/actions/workflows/{workflow_id}/runs"
+            f"{self.api_url}/repos/{repo}/actions/workflows/{workflow_id}/runs"
         )
         print(f"Fetching workflow runs from {endpoint} (created_after={created_after})")
+        return endpoint, payloads
 
-        first_page_response = requests.get(
-            endpoint, headers=self.headers, params=payloads
-        ).json()
-        workflow_runs = first_page_response["workflow_runs"]
-
-        # Reuse first_page_response to get the total count of workflow runs
+    def _drop_skipped(
+        self, workflow_runs: list[WorkflowRun], skip: RunFilter, accurate: bool
+    ) -> list[WorkflowRun]:
+        if skip is None:
+            return workflow_runs
+        if callable(skip):
+            is_skipped = skip
+        else:
+            known_ids = skip
+
+            def is_skipped(run: WorkflowRun) -> bool:
+                return run.id in known_ids
+
+        kept = [run for run in workflow_runs if not is_skipped(run)]
+        skipped = len(workflow_runs) - len(kept)
+        if skipped and accurate:
+            self.jobs_calls_saved += skipped
+            print(f"Skipping {skipped} already-known runs (jobs-API calls saved)")
+        elif skipped:
+            print(f"Skipping {skipped} already-known runs")
+        return kept
+
+    @staticmethod
+    def _pages_needed(first_page_response: dict, payloads: dict) -> int:
         total_count = first_page_response["total_count"]
-
-        # Calculate the number of pages needed
-        pages_needed = (total_count + payloads["per_page"] - 1) // payloads[
-            "per_page"
-        ]  # This calculates the ceiling of total_count/100
-
-        # Fetch using the list of page numbers
-        for page in range(2, pages_needed + 1):
-            payloads["page"] = page
-            page_response = requests.get(
-                endpoint, headers=self.headers, params=payloads
-            ).json()
-            workflow_runs = page_response["workflow_runs"] + workflow_runs
-
-        workflow_runs = [
-            run
+        # This calculates the ceiling of total_count/100
+        return (total_count + payloads["per_page"] - 1) // payloads["per_page"]
+
+    @staticmethod
+    def _prepare_runs(
+        workflow_runs: list[dict], only_success: bool
+    ) -> list[WorkflowRun]:
+        # Project straight into WorkflowRun records; the raw page dicts are
+        # dropped as soon as this returns.
+        records = [
+            WorkflowRun.from_api(run)
             for run in workflow_runs
             if (not only_success or run["conclusion"] == "success")
             and isinstance(run["created_at"], str)
             and isinstance(run["updated_at"], str)
         ]
 
-        for run in workflow_runs:
-            run["created_at"] = datetime.strptime(
-                run["created_at"], self.time_format
-            ).replace(tzinfo=timezone.utc)
-            run["updated_at"] = datetime.strptime(
-                run["updated_at"], self.time_format
-            ).replace(tzinfo=timezone.utc)
-            # run_started_at is the start of the *latest attempt*. For rerun
-            # runs, created_at is the first attempt's queue time (possibly
-            # days earlier), so using it inflates wall-clock. Matches what
-            # GitHub's UI shows per-run.
-            started_raw = run.get("run_started_at")
-            if started_raw:
-                run["run_started_at"] = datetime.strptime(
-                    started_raw, self.time_format
-                ).replace(tzinfo=timezone.utc)
-            else:
-                run["run_started_at"] = run["created_at"]
-            head_commit = run.get("head_commit") or {}
-            message = head_commit.get("message") or ""
-            run["commit_title"] = message.splitlines()[0] if message else ""
-
         # Sorting by created_at (oldest to newest, utility function)
-        workflow_runs = sorted(workflow_runs, key=lambda k: k["created_at"])
+        records.sort(key=lambda k: k.created_at)
+        return records
 
-        # Extract duration from each workflow run
-        if not accurate:
-            # Wall-clock of the latest attempt (updated_at - run_started_at).
-            # No per-job data.
-            for run in workflow_runs:
-                run["duration"] = (
-                    run["updated_at"] - run["run_started_at"]
-                ).total_seconds()
-                run["jobs"] = {}
-
-            return workflow_runs
-
-        # By calling jobs API for each workflow run
-        for index, run in enumerate(workflow_runs):
-            json_response = requests.get(run["jobs_url"], headers=self.headers).json()
-            if "jobs" not in json_response:
-                print(f"Error in fetching jobs from {run['jobs_url']}: {json_response}")
+    @staticmethod
+    def _set_wall_clock_durations(workflow_runs: list[WorkflowRun]) -> None:
+        # Wall-clock of the latest attempt (updated_at - run_started_at).
+        # No per-job data.
+        for run in workflow_runs:
+            # Both are set on runs fresh from the listing (from_api).
+            assert run.updated_at is not None
+            assert run.run_started_at is not None
+            run.duration = (run.updated_at - run.run_started_at).total_seconds()
+            run.jobs = {}
+
+    def _apply_jobs(self, run: WorkflowRun, json_response: dict) -> bool:
+        if "jobs" not in json_response:
+            print(f"Error in fetching jobs from {run.jobs_url}: {json_response}")
+            return False
+        jobs = json_response["jobs"]
+
+        run.jobs = {}
+        run.duration = 0
+        for job in jobs:
+            try:
+                completed_at = datetime.strptime(
+                    job["completed_at"], self.time_format
+                )
+                started_at = datetime.strptime(job["started_at"], self.time_format)
+            except TypeError:
+                print(f"Error in parsing {job}")
                 continue
-            jobs = json_response["jobs"]
+            run.jobs[job["name"]] = (completed_at - started_at).total_seconds()
+            run.duration += run.jobs[job["name"]]
+        return True
+
+    @staticmethod
+    def _print_progress(done: int, total: int, run: WorkflowRun) -> None:
+        print(
+            f"{done}/{total}: {run.created_at} "
+            f"{math.floor(run.duration / 60)}m "
+            f"{math.floor(run.duration % 60)}s "
+            f"{run.jobs} {run.conclusion}"
+        )
 
-            run["jobs"] = {}
-            run["duration"] = 0
-            for job in jobs:
-                try:
-                    completed_at = datetime.strptime(
-                        job["completed_at"], self.time_format
-                    )
-                    started_at = datetime.strptime(job["started_at"], self.time_format)
-                except TypeError:
-                    print(f"Error in parsing {job}")
-                    continue
-                run["jobs"][job["name"]] = (completed_at - started_at).total_seconds()
-                run["duration"] += run["jobs"][job["name"]]
+    def _record_throughput(self, count: int, elapsed: float) -> None:
+        if count and elapsed > 0:
+            self.jobs_throughput = count / elapsed
             print(
-                f"{index + 1}/{len(workflow_runs)}: {run['created_at']} "
-                f"{math.floor(run['duration'] / 60)}m "
-                f"{math.floor(run['duration'] % 60)}s "
-                f"{run['jobs']} {run['conclusion']}"
+                f"Fetched jobs for {count} runs in {elapsed:.1f}s "
+                f"({self.jobs_throughput:.1f} runs/s)"
             )
 
-        return workflow_runs
-
     def get_workflow_logs(self, repo: str, run_id: str):
-        import zipfile
-        from io import BytesIO
+        # Extract all of log file into memory as string. Prefer
+        # iter_workflow_logs for large logs; this holds every member at once.
+        return {
+            filename: "".join(lines)
+            for filename, lines in self.iter_workflow_logs(repo, run_id)
+        }
 
+    def iter_workflow_logs(
+        self,
+        repo: str,
+        run_id: str,
+        member_filter: Union[str, re.Pattern, None] = None,
+    ) -> Iterator[tuple[str, Iterator[str]]]:
+        """Yield (filename, line iterator) for each log file of a run.
+
+        The zip is spooled to a temporary file in chunks and members are
+        decompressed lazily, so memory stays bounded however large the logs
+        are. `member_filter` selects members: a str must equal the member
+        name, a compiled pattern is matched with `search`. Each line
+        iterator is only valid until the next member is requested.
+        """
         # This endpoint redirects to a zip file
-        endpoint = f"https://api.github.com/repos/{repo}/actions/runs/{run_id}/logs"
-        response = requests.get(
-            endpoint, headers=self.headers, allow_redirects=True
-        ).content
+        endpoint = f"{self.api_url}/repos/{repo}/actions/runs/{run_id}/logs"
+        with tempfile.TemporaryFile() as spool:
+            with self.recorder.span("logs") as span, self._get(
+                endpoint, headers=self.headers, allow_redirects=True, stream=True
+            ) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=LOG_CHUNK_SIZE):
+                    spool.write(chunk)
+                # Log archives are usually streamed without Content-Length,
+                # so the scheduler cannot count these bytes itself.
+                span["bytes"] = spool.tell()
+            spool.seek(0)
+
+            with zipfile.ZipFile(spool) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    if isinstance(member_filter, str):
+                        if info.filename != member_filter:
+                            continue
+                    elif member_filter is not None:
+                        if not member_filter.search(info.filename):
+                            continue
+                    with archive.open(info) as member:
+                        # newline="" keeps \r\n intact, matching a plain
+                        # bytes.decode of the member.
+                        yield info.filename, io.TextIOWrapper(
+                            member, encoding="utf-8", errors="replace", newline=""
+                        )
+
+
+class AsyncGitHubWorkflowAPI:
+    """asyncio front-end to GitHubWorkflowAPI for scraping many targets.
+
+    Coroutines from every target share one client, so one semaphore caps
+    the requests in flight across all of them. Requests still go through
+    the synchronous transport (session pool, ETag cache, rate-limit
+    scheduler) on a thread pool of the same size. get_workflow_duration_list
+    returns exactly what the synchronous client returns.
+    """
+
+    def __init__(
+        self,
+        github_token: str,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        api_url: str = API_URL,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        recorder: Optional[Recorder] = None,
+    ):
+        self.sync = GitHubWorkflowAPI(
+            github_token,
+            max_workers=max_concurrency,
+            api_url=api_url,
+            cache=cache,
+            scheduler=scheduler,
+            recorder=recorder,
+        )
+        self.scheduler = self.sync.scheduler
+        self.recorder = self.sync.recorder
+        self.max_concurrency = self.sync.max_workers
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _get_json(
+        self, url: str, params: Optional[dict] = None, cache: bool = True
+    ):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self.sync._get_json, url, params, cache
+            )
 
-        response = zipfile.ZipFile(BytesIO(response))
+    async def get_workflow_duration_list(
+        self,
+        repo: str,
+        workflow_id: str,
+        accurate=False,
+        created_after: Optional[datetime] = None,
+        event: Optional[str] = None,
+        branch: Optional[str] = None,
+        only_success: bool = True,
+    ):
+        workflow_runs = await self.list_workflow_runs(
+            repo,
+            workflow_id,
+            created_after=created_after,
+            event=event,
+            branch=branch,
+            only_success=only_success,
+        )
+        return await self.enrich_workflow_runs(workflow_runs, accurate=accurate)
 
-        # Extract all of log file into memory as string
-        logs = {}
+    async def list_workflow_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        created_after: Optional[datetime] = None,
+        event: Optional[str] = None,
+        branch: Optional[str] = None,
+        only_success: bool = True,
+    ) -> list[WorkflowRun]:
+        sync = self.sync
+        endpoint, payloads = sync._runs_request(
+            repo, workflow_id, created_after, event, branch
+        )
+        with self.recorder.span("list") as span:
+            first_page_response = await self._get_json(endpoint, payloads)
+            workflow_runs = first_page_response["workflow_runs"]
+            pages_needed = sync._pages_needed(first_page_response, payloads)
+            # gather preserves argument order, so pages merge in page order.
+            pages = await asyncio.gather(
+                *(
+                    self._get_json(endpoint, {**payloads, "page": page})
+                    for page in range(2, pages_needed + 1)
+                )
+            )
+            for page_response in pages:
+                workflow_runs += page_response["workflow_runs"]
+            span["pages"] = max(pages_needed, 1)
+            span["runs"] = len(workflow_runs)
 
-        for filename in response.namelist():
-            logs[filename] = response.read(filename).decode("utf-8")
+        return sync._prepare_runs(workflow_runs, only_success)
 
-        return logs
+    async def enrich_workflow_runs(
+        self,
+        workflow_runs: list[WorkflowRun],
+        accurate=False,
+        skip: RunFilter = None,
+    ) -> list[WorkflowRun]:
+        sync = self.sync
+        workflow_runs = sync._drop_skipped(workflow_runs, skip, accurate)
+        if not accurate:
+            sync._set_wall_clock_durations(workflow_runs)
+            return workflow_runs
 
+        done = 0
 
-class GithubPullRequestAPI:
-    def __init__(self, github_token: str):
-        self.github_token = github_token
-        self.headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": "Bearer " + github_token,
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
-        self.time_format = "%Y-%m-%dT%H:%M:%SZ"
+        async def fetch_jobs(run: WorkflowRun) -> bool:
+            nonlocal done
+            try:
+                json_response = await self._get_json(
+                    run.jobs_url, cache=False
+                )
+            except (requests.RequestException, ValueError) as e:
+                print(f"Error in fetching jobs from {run.jobs_url}: {e}")
+                ok = False
+            else:
+                ok = sync._apply_jobs(run, json_response)
+            done += 1
+            if ok:
+                sync._print_progress(done, len(workflow_runs), run)
+            return ok
+
+        started = time.monotonic()
+        with self.recorder.span("jobs") as span:
+            fetched = await asyncio.gather(
+                *(fetch_jobs(r) for r in workflow_runs)
+            )
+            span["runs"] = len(workflow_runs)
+            span["failed"] = fetched.count(False)
+        sync._record_throughput(len(workflow_runs), time.monotonic() - started)
+        return [run for run, ok in zip(workflow_runs, fetched) if ok]
 
-    def get_all_pull_requests(self, repo: str):
-        payloads = {"per_page": 100, "page": 1, "state": "all"}
-        endpoint = f"https://api.github.com/repos/{repo}/pulls"
-        response = requests.get(endpoint, headers=self.headers, params=payloads).json()
+    @property
+    def jobs_calls_saved(self) -> int:
+        return self.sync.jobs_calls_saved
 
-        pull_requests = response
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.sync.session.close()
 
-        while len(response) == payloads["per_page"]:
-            payloads["page"] += 1
-            response = requests.get(
-                endpoint, headers=self.headers, params=payloads
-            ).json()
 
-            pull_requests += response
+class GithubPullRequestAPI(GitHubAPIClient):
+    # Parsed to naive UTC datetimes; the last two can be null.
+    TIME_FIELDS = ("created_at", "updated_at", "closed_at", "merged_at")
 
-        for pull_request in pull_requests:
-            pull_request["created_at"] = datetime.strptime(
-                pull_request["created_at"], self.time_format
-            )
-            if pull_request["closed_at"] is not None:
-                pull_request["closed_at"] = datetime.strptime(
-                    pull_request["closed_at"], self.time_format
-                )
+    def get_all_pull_requests(
+        self, repo: str, since: Optional[datetime] = None
+    ):
+        """Pull requests of `repo`, most recently updated first.
+
+        With `since`, paging stops at the first pull request not updated
+        since then, so repeat calls only fetch those opened, closed, merged
+        or edited in between.
+        """
+        payloads = {
+            "per_page": 100,
+            "state": "all",
+            "sort": "updated",
+            "direction": "desc",
+        }
+        endpoint = f"{self.api_url}/repos/{repo}/pulls"
+        cutoff = naive_utc(since)
+
+        pull_requests = []
+        for page in self._paginate(endpoint, payloads):
+            older_found = False
+            for pull_request in page:
+                for key in self.TIME_FIELDS:
+                    if pull_request.get(key) is not None:
+                        pull_request[key] = datetime.strptime(
+                            pull_request[key], self.time_format
+                        )
+                if cutoff is not None and pull_request["updated_at"] < cutoff:
+                    older_found = True
+                    break
+                pull_requests.append(pull_request)
+            if older_found:
+                break
 
         return pull_requests
 
 
-class GithubPackagesAPI:
-    def __init__(self, github_token: str):
-        self.github_token = github_token
-        self.headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": "Bearer " + github_token,
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
-        self.time_format = "%Y-%m-%dT%H:%M:%SZ"
+class GithubPackagesAPI(GitHubAPIClient):
+    def get_all_containers(
+        self, org: str, pkg: str, since: Optional[datetime] = None
+    ):
+        """Versions of container package `pkg`, newest first.
 
-    def get_all_containers(self, org: str, pkg: str):
-        payloads = {"per_page": 100, "page": 1}
+        The versions endpoint lists newest first, so with `since` paging stops
+        at the first version created before it.
+        """
+        payloads = {"per_page": 100}
         endpoint = (
-            f"https://api.github.com/orgs/{org}/packages/container/{pkg}/versions"
+            f"{self.api_url}/orgs/{org}/packages/container/{pkg}/versions"
         )
-        print(f"Fetching packages from {endpoint}")
-        response = requests.get(endpoint, headers=self.headers, params=payloads).json()
-        packages = response
+        print(f"Fetching packages from {endpoint} (since={since})")
+        cutoff = naive_utc(since)
 
-        while len(response) == payloads["per_page"]:
-            payloads["page"] += 1
-            response = requests.get(
-                endpoint, headers=self.headers, params=payloads
-            ).json()
-
-            packages += response
-
-        for package in packages:
-            try:
-                package["created_at"] = datetime.strptime(
-                    package["created_at"], self.time_format
-                )
-                package["updated_at"] = datetime.strptime(
-                    package["updated_at"], self.time_format
-                )
-            except TypeError:
-                print(f"Error in parsing {package}")
-                continue
+        packages = []
+        for page in self._paginate(endpoint, payloads):
+            older_found = False
+            for package in page:
+                try:
+                    package["created_at"] = datetime.strptime(
+                        package["created_at"], self.time_format
+                    )
+                    package["updated_at"] = datetime.strptime(
+                        package["updated_at"], self.time_format
+                    )
+                except TypeError:
+                    print(f"Error in parsing {package}")
+                    continue
+                if cutoff is not None and package["created_at"] < cutoff:
+                    older_found = True
+                    break
+                packages.append(package)
+            if older_found:
+                break
 
         return packages
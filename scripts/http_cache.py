@@ -0,0 +1,172 @@
+"""On-disk conditional-request cache for GitHub API responses.
+
+Every cached response is stored with its ETag / Last-Modified validators.
+Repeat requests send If-None-Match / If-Modified-Since, and a 304 answer is
+served from disk. GitHub does not count 304s against the rate limit, so a
+cron tick that finds nothing new costs almost no quota.
+
+Entries live one file per (URL, params) key under the cache directory. The
+file mtime doubles as the LRU clock: hits touch it, and stores evict the
+least recently used files once the directory exceeds its byte budget.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode
+
+import requests
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Response headers stored alongside the body; Link carries pagination.
+KEPT_HEADERS = ("Link",)
+
+
+class ResponseCache:
+    def __init__(
+        self, cache_dir: pathlib.Path, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # API clients share one cache across worker threads.
+        self._lock = threading.Lock()
+        # key -> (last_used, size). Seeded from the directory so the byte
+        # budget covers entries left by earlier runs.
+        self._index: dict[str, tuple[float, int]] = {}
+        for path in self.cache_dir.glob("*.json"):
+            st = path.stat()
+            self._index[path.stem] = (st.st_mtime, st.st_size)
+        self._total_bytes = sum(size for _, size in self._index.values())
+        with self._lock:
+            self._evict_locked()
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load(self, key: str) -> Optional[dict]:
+        try:
+            with self._path(key).open() as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _touch(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            os.utime(path)
+            st = path.stat()
+        except OSError:
+            return
+        with self._lock:
+            self._index[key] = (st.st_mtime, st.st_size)
+
+    def _store(self, key: str, entry: dict) -> None:
+        path = self._path(key)
+        data = json.dumps(entry)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(data)
+        os.replace(tmp, path)
+        st = path.stat()
+        with self._lock:
+            _, old_size = self._index.get(key, (0.0, 0))
+            self._index[key] = (st.st_mtime, st.st_size)
+            self._total_bytes += st.st_size - old_size
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, (_, size) in sorted(self._index.items(), key=lambda kv: kv[1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            del self._index[key]
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def get(
+        self,
+        send: Callable[..., requests.Response],
+        url: str,
+        headers: dict,
+        params: Optional[dict] = None,
+    ) -> tuple[Any, dict]:
+        """GET url through `send`, revalidating against any cached copy.
+
+        `send` has the signature of requests.Session.get, so callers decide
+        how the request actually goes out (session, scheduler, ...). Returns
+        the decoded body and the response headers listed in KEPT_HEADERS,
+        which are replayed from the cache on a 304. Error responses raise
+        requests.HTTPError.
+        """
+        key = self.key(url, params)
+        entry = self._load(key)
+        request_headers = dict(headers)
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = send(url, headers=request_headers, params=params)
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.hits += 1
+            self._touch(key)
+            return json.loads(entry["body"]), entry.get("headers", {})
+
+        with self._lock:
+            self.misses += 1
+        response.raise_for_status()
+        kept = {
+            h: response.headers[h] for h in KEPT_HEADERS if h in response.headers
+        }
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            self._store(
+                key,
+                {
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "headers": kept,
+                    "body": response.text,
+                },
+            )
+        return response.json(), kept
+
+    def get_json(
+        self,
+        send: Callable[..., requests.Response],
+        url: str,
+        headers: dict,
+        params: Optional[dict] = None,
+    ) -> Any:
+        return self.get(send, url, headers=headers, params=params)[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+            }
@@ -0,0 +1,108 @@
+"""Sidecar index of the latest docker image size entry per tag.
+
+check_image_digests compares each tag's registry digest with the digest of
+its newest stored entry. Finding that entry in the yearly
+`docker_image_sizes-<year>.jsonl` files means decoding the whole history.
+Instead a small `docker_image_sizes.latest.json` next to them keeps:
+
+- latest: tag -> its newest entry (by fetched_at), as stored,
+- files: size and sha256 of every yearly file it was built from.
+
+JsonlStorage.append_image_sizes folds new entries in as it writes them, so
+reading the index back costs one lookup per tag. If the yearly files no
+longer match the recorded fingerprints (hand edits, a rebase on the data
+branch, ...), or the sidecar is missing, it is rebuilt in one pass over
+the JSONL on the next load.
+"""
+
+import pathlib
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from jsonl_reader import read_jsonl
+from sidecar import (
+    file_fingerprint,
+    files_current,
+    read_sidecar,
+    write_sidecar,
+    yearly_files,
+)
+
+INDEX_VERSION = 1
+
+
+@dataclass
+class LatestIndex:
+    latest: dict[str, dict] = field(default_factory=dict)
+    files: dict[str, dict] = field(default_factory=dict)
+
+    def add(self, entry: dict) -> None:
+        tag = entry.get("tag", "")
+        known = self.latest.get(tag)
+        # ISO timestamps in UTC compare in time order as strings.
+        if known is None or entry["fetched_at"] >= known["fetched_at"]:
+            self.latest[tag] = entry
+
+    def digest(self, tag: str) -> str:
+        """Digest of the latest entry for tag, or '' if none."""
+        return self.latest.get(tag, {}).get("digest", "")
+
+
+def index_path(directory: pathlib.Path, base: str) -> pathlib.Path:
+    return directory / f"{base}.latest.json"
+
+
+def _read(path: pathlib.Path) -> Optional[LatestIndex]:
+    data = read_sidecar(path, INDEX_VERSION)
+    if data is None:
+        return None
+    return LatestIndex(latest=data["latest"], files=data["files"])
+
+
+def write_index(
+    directory: pathlib.Path, base: str, index: LatestIndex
+) -> None:
+    data = {
+        "version": INDEX_VERSION,
+        "latest": index.latest,
+        "files": index.files,
+    }
+    write_sidecar(index_path(directory, base), data)
+
+
+def rebuild_index(directory: pathlib.Path, base: str) -> LatestIndex:
+    """Scan every yearly file once and write a fresh index."""
+    files = yearly_files(directory, base)
+    index = LatestIndex()
+    for record in read_jsonl(files, "fetched_at"):
+        index.add(record.data)
+    index.files = {path.name: file_fingerprint(path) for path in files}
+    if files:
+        write_index(directory, base, index)
+    return index
+
+
+def load_index(directory: pathlib.Path, base: str) -> LatestIndex:
+    """Return the index for `base`, rebuilding it if it is stale."""
+    files = yearly_files(directory, base)
+    index = _read(index_path(directory, base))
+    if index is not None and files_current(index.files, files):
+        return index
+    if files:
+        print(f"  rebuilding latest-entry index for {directory / base}")
+    return rebuild_index(directory, base)
+
+
+def record_append(
+    directory: pathlib.Path,
+    base: str,
+    index: LatestIndex,
+    entries: Iterable[dict],
+    touched: Iterable[str],
+) -> None:
+    """Fold entries just appended to the yearly files `touched` into index."""
+    for entry in entries:
+        index.add(entry)
+    for name in touched:
+        index.files[name] = file_fingerprint(directory / name)
+    write_index(directory, base, index)
@@ -0,0 +1,118 @@
+"""Per-layer bookkeeping for the docker image size measurements.
+
+The canonical tags share most of their layers (universe-dependencies-cuda
+is universe-dependencies plus a few layers, every flavor starts from the
+same base). Two pieces build on that:
+
+- LayerCache: a persistent digest -> sizes map, `docker_layers.json` in
+  the data directory. A layer blob is immutable, so once its uncompressed
+  size is known (from any tag, in any run) it is never measured again.
+  Entries for layers no current image uses are dropped after
+  LAYER_CACHE_MAX_AGE.
+- share_breakdown: splits a tag's bytes into those of layers no other
+  tag's current image has (unique) and those it shares with at least one
+  other tag (shared).
+"""
+
+import json
+import os
+import pathlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+LAYER_CACHE_NAME = "docker_layers.json"
+LAYER_CACHE_VERSION = 1
+LAYER_CACHE_MAX_AGE = timedelta(days=90)
+
+
+class LayerCache:
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+        self.layers: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            with self.path.open() as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == LAYER_CACHE_VERSION:
+            self.layers = data["layers"]
+
+    def uncompressed_size(self, digest: str) -> Optional[int]:
+        entry = self.layers.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["uncompressed_size"]
+
+    def put(self, digest: str, size: int, uncompressed_size: int) -> None:
+        self.layers[digest] = {
+            "size": size,
+            "uncompressed_size": uncompressed_size,
+            "measured_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def prune(self, in_use: Iterable[str]) -> int:
+        """Drop old entries of layers outside `in_use`; return how many."""
+        keep = set(in_use)
+        cutoff = (datetime.now(timezone.utc) - LAYER_CACHE_MAX_AGE).isoformat()
+        stale = [
+            digest
+            for digest, entry in self.layers.items()
+            if digest not in keep and entry["measured_at"] < cutoff
+        ]
+        for digest in stale:
+            del self.layers[digest]
+        return len(stale)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w") as f:
+            json.dump(
+                {"version": LAYER_CACHE_VERSION, "layers": self.layers},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+
+def layer_records(manifest: dict, cache: Optional[LayerCache]) -> list[dict]:
+    """The manifest's layers as stored in a measurement, in order."""
+    records = []
+    for layer in manifest.get("layers", []):
+        record = {"digest": layer["digest"], "size": layer.get("size", 0)}
+        entry = cache.layers.get(layer["digest"]) if cache else None
+        if entry is not None:
+            record["uncompressed_size"] = entry["uncompressed_size"]
+        records.append(record)
+    return records
+
+
+def share_breakdown(tag: str, layers_by_tag: dict[str, list[dict]]) -> dict:
+    """unique_bytes / shared_bytes of `tag` against the other tags' images.
+
+    Compressed bytes always; the uncompressed split as well when every
+    layer of the tag has an uncompressed size.
+    """
+    others = {
+        layer["digest"]
+        for other, layers in layers_by_tag.items()
+        if other != tag
+        for layer in layers
+    }
+    layers = layers_by_tag[tag]
+    split = {"unique_bytes": 0, "shared_bytes": 0}
+    with_uncompressed = all("uncompressed_size" in l for l in layers)
+    if with_uncompressed:
+        split.update(unique_uncompressed_bytes=0, shared_uncompressed_bytes=0)
+    for layer in layers:
+        kind = "shared" if layer["digest"] in others else "unique"
+        split[f"{kind}_bytes"] += layer["size"]
+        if with_uncompressed:
+            split[f"{kind}_uncompressed_bytes"] += layer["uncompressed_size"]
+    return split
@@ -0,0 +1,177 @@
+"""Pull request and container-version history, fetched incrementally.
+
+Both are stored like the workflow runs, one line per item in yearly files
+by created_at:
+
+    pull_requests/<repo_short>-<year>.jsonl
+    container_versions/<package>-<year>.jsonl
+
+Next to each family a `<base>.cursor.json` sidecar keeps:
+
+- cursor: the newest value of the family's cursor field stored,
+- count: the number of items stored,
+- files: size and sha256 of every yearly file it was built from, plus its
+  garbage (tombstoned lines and padding).
+
+A repeat scrape reads the sidecar, asks the API for the items past the
+cursor (usually one page) and upserts them by id: a stored item is
+rewritten in place or tombstoned and appended, as run_manifest does for
+runs, and a year file is compacted once its garbage passes
+COMPACT_GARBAGE_RATIO. If the yearly files no longer match the sidecar,
+it is rebuilt in one pass over them.
+
+Pull requests change after they are opened (closed, merged, retitled), so
+they are listed by updated_at, newest first, with updated_at as the
+cursor. Container versions are listed newest first by creation, with
+created_at as the cursor: a tag that later moves to a newer version stays
+on the stored line of the old one, and deleted versions are kept.
+"""
+
+import json
+import pathlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import run_manifest
+from sidecar import (
+    file_fingerprint,
+    files_current,
+    read_sidecar,
+    write_sidecar,
+    yearly_files,
+)
+from storage import COMPACT_GARBAGE_RATIO
+
+CURSOR_VERSION = 1
+
+PULL_REQUESTS_DIR = "pull_requests"
+PULL_REQUESTS_CURSOR = "updated_at"
+CONTAINER_VERSIONS_DIR = "container_versions"
+CONTAINER_VERSIONS_CURSOR = "created_at"
+
+
+@dataclass
+class ItemCursor:
+    cursor: Optional[datetime] = None
+    count: int = 0
+    files: dict[str, dict] = field(default_factory=dict)
+
+    def advance(self, value: Optional[str]) -> None:
+        if value is None:
+            return
+        dt = datetime.fromisoformat(value)
+        if self.cursor is None or dt > self.cursor:
+            self.cursor = dt
+
+
+def cursor_path(directory: pathlib.Path, base: str) -> pathlib.Path:
+    return directory / f"{base}.cursor.json"
+
+
+def _read(path: pathlib.Path) -> Optional[ItemCursor]:
+    data = read_sidecar(path, CURSOR_VERSION)
+    if data is None:
+        return None
+    return ItemCursor(
+        cursor=(
+            datetime.fromisoformat(data["cursor"]) if data["cursor"] else None
+        ),
+        count=data["count"],
+        files=data["files"],
+    )
+
+
+def write_cursor(directory: pathlib.Path, base: str, state: ItemCursor) -> None:
+    data = {
+        "version": CURSOR_VERSION,
+        "cursor": state.cursor.isoformat() if state.cursor else None,
+        "count": state.count,
+        "files": state.files,
+    }
+    write_sidecar(cursor_path(directory, base), data)
+
+
+def rebuild_cursor(directory: pathlib.Path, base: str, key: str) -> ItemCursor:
+    """Scan every yearly file once and write a fresh sidecar."""
+    state = ItemCursor()
+    for path in yearly_files(directory, base):
+        garbage = 0
+        for _, text, length in run_manifest.scan_lines(path):
+            if not text:
+                garbage += length + 1
+                continue
+            garbage += length - len(text)
+            state.count += 1
+            state.advance(json.loads(text)[key])
+        state.files[path.name] = {**file_fingerprint(path), "garbage": garbage}
+    if state.files:
+        write_cursor(directory, base, state)
+    return state
+
+
+def load_cursor(directory: pathlib.Path, base: str, key: str) -> ItemCursor:
+    """Return the sidecar state for `base`, rebuilding it if it is stale."""
+    files = yearly_files(directory, base)
+    state = _read(cursor_path(directory, base))
+    if state is not None and files_current(state.files, files):
+        return state
+    if files:
+        print(f"  rebuilding item cursor for {directory / base}")
+    return rebuild_cursor(directory, base, key)
+
+
+def upsert_items(
+    directory: pathlib.Path,
+    base: str,
+    key: str,
+    state: ItemCursor,
+    items: list[dict],
+) -> tuple[int, int]:
+    """Replace stored items by id and append the rest; (updated, added).
+
+    `items` carry an int "id", an ISO created_at and the cursor field `key`.
+    Each touched year file is scanned once to locate the stored lines.
+    """
+    if not items:
+        return 0, 0
+    directory.mkdir(parents=True, exist_ok=True)
+    # Paging while items are being updated can list one twice; the first
+    # listing is the newest.
+    unique: dict[int, dict] = {}
+    for item in items:
+        unique.setdefault(item["id"], item)
+    by_name: dict[str, list[dict]] = {}
+    for item in unique.values():
+        year = datetime.fromisoformat(item["created_at"]).year
+        by_name.setdefault(f"{base}-{year}.jsonl", []).append(item)
+
+    updated = added = 0
+    for name, year_items in sorted(by_name.items()):
+        path = directory / name
+        stored = run_manifest.locate_lines(
+            path, "id", (item["id"] for item in year_items)
+        )
+        garbage = state.files.get(name, {}).get("garbage", 0)
+        new_lines = []
+        for item in year_items:
+            line = json.dumps(item).encode()
+            location = stored.get(item["id"])
+            if location is None:
+                new_lines.append(line + b"\n")
+            else:
+                _, extra = run_manifest.replace_line(path, location, line)
+                garbage += extra
+            state.advance(item[key])
+        with path.open("ab") as f:
+            f.writelines(new_lines)
+        state.count += len(new_lines)
+        updated += len(year_items) - len(new_lines)
+        added += len(new_lines)
+        if garbage > COMPACT_GARBAGE_RATIO * path.stat().st_size:
+            run_manifest.compact_file(path)
+            garbage = 0
+        state.files[name] = {**file_fingerprint(path), "garbage": garbage}
+    write_cursor(directory, base, state)
+    print(f"    {directory / base}: updated {updated}, added {added}")
+    return updated, added
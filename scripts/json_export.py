@@ -0,0 +1,167 @@
+"""Streaming writer for the dashboard JSON.
+
+`write_json` walks nested dicts key by key and serializes array elements as
+they are produced, so sections can be generators and the full document is
+never built in memory. With an indent the output is byte-identical to
+json.dump(doc, f, indent=indent); without one it uses compact separators.
+
+The same bytes are teed into a `.gz` sibling and, when the optional brotli
+module is installed, a `.br` sibling, so static hosting can serve them
+precompressed.
+"""
+
+import gzip
+import json
+import pathlib
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any, BinaryIO, Optional
+
+try:
+    import brotli
+except ImportError:  # optional; only the .br sibling needs it
+    brotli = None
+
+# Serialized text is buffered and pushed to all outputs in chunks this big.
+FLUSH_CHARS = 64 * 1024
+
+
+class _TeeWriter:
+    """Text sink fanning encoded chunks out to plain and compressed files."""
+
+    def __init__(self, path: pathlib.Path, precompress: bool):
+        self.paths = {"json": path}
+        self._raw = path.open("wb")
+        # (file, compressor) of each compressed sibling
+        self._gz: Optional[tuple[BinaryIO, gzip.GzipFile]] = None
+        self._br: Optional[tuple[BinaryIO, Any]] = None
+        if precompress:
+            self.paths["gz"] = path.with_name(path.name + ".gz")
+            gz_file = self.paths["gz"].open("wb")
+            # mtime=0 keeps the archive byte-stable when the JSON is.
+            self._gz = gz_file, gzip.GzipFile(
+                filename=path.name,
+                fileobj=gz_file,
+                mode="wb",
+                compresslevel=9,
+                mtime=0,
+            )
+            if brotli is not None:
+                self.paths["br"] = path.with_name(path.name + ".br")
+                self._br = (
+                    self.paths["br"].open("wb"),
+                    brotli.Compressor(quality=11),
+                )
+        self._buf: list[str] = []
+        self._buffered = 0
+
+    def write(self, text: str) -> None:
+        self._buf.append(text)
+        self._buffered += len(text)
+        if self._buffered >= FLUSH_CHARS:
+            self.flush()
+
+    def flush(self) -> None:
+        data = "".join(self._buf).encode()
+        self._buf = []
+        self._buffered = 0
+        self._raw.write(data)
+        if self._gz is not None:
+            self._gz[1].write(data)
+        if self._br is not None:
+            br_file, compressor = self._br
+            br_file.write(compressor.process(data))
+
+    def close(self) -> None:
+        self.flush()
+        self._raw.close()
+        if self._gz is not None:
+            gz_file, compressor = self._gz
+            compressor.close()
+            gz_file.close()
+        if self._br is not None:
+            br_file, compressor = self._br
+            br_file.write(compressor.finish())
+            br_file.close()
+
+
+def _dump_leaf(value: Any, indent: Optional[int], level: int) -> str:
+    if indent is None:
+        return json.dumps(value, separators=(",", ":"))
+    text = json.dumps(value, indent=indent)
+    # JSON strings never hold raw newlines, so this only re-indents.
+    return text.replace("\n", "\n" + " " * (indent * level))
+
+
+def _write(out: _TeeWriter, value: Any, indent: Optional[int], level: int):
+    if isinstance(value, dict):
+        items: Iterator = iter(value.items())
+        brackets = "{}"
+    elif isinstance(value, (list, tuple, Iterator)):
+        items = iter(value)
+        brackets = "[]"
+    else:
+        out.write(_dump_leaf(value, indent, level))
+        return
+
+    key_sep = ": " if indent is not None else ":"
+    newline = "" if indent is None else "\n" + " " * (indent * (level + 1))
+    first = True
+    for item in items:
+        out.write(brackets[0] if first else ",")
+        first = False
+        out.write(newline)
+        if brackets == "{}":
+            key, item = item
+            out.write(json.dumps(key) + key_sep)
+            # Dict values may themselves be streamed sections.
+            _write(out, item, indent, level + 1)
+        else:
+            # Array elements are records: serialize each in one call.
+            out.write(_dump_leaf(item, indent, level + 1))
+    if first:
+        out.write(brackets)
+        return
+    if indent is not None:
+        out.write("\n" + " " * (indent * level))
+    out.write(brackets[1])
+
+
+def write_json(
+    path: pathlib.Path,
+    document: dict,
+    indent: Optional[int] = None,
+    precompress: bool = True,
+    trace_memory: bool = False,
+) -> dict:
+    """Stream `document` to `path` (plus compressed siblings).
+
+    Returns the export time and the byte size of every file written. With
+    `trace_memory`, also the peak Python heap allocated while writing
+    (tracemalloc slows the export down, so it is off by default).
+    """
+    path = pathlib.Path(path)
+    tracing = tracemalloc.is_tracing()
+    if trace_memory:
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+
+    out = _TeeWriter(path, precompress)
+    try:
+        _write(out, document, indent, 0)
+    finally:
+        out.close()
+
+    elapsed = time.perf_counter() - start
+    stats: dict[str, Any] = {
+        "seconds": round(elapsed, 3),
+        "bytes": {kind: p.stat().st_size for kind, p in out.paths.items()},
+    }
+    if trace_memory:
+        stats["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        if not tracing:
+            tracemalloc.stop()
+    return stats
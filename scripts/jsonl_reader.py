@@ -0,0 +1,151 @@
+"""Lazy, memory-mapped reader for the yearly JSONL files.
+
+`read_jsonl` yields the records of several `<base>-<year>.jsonl` files in
+key order (created_at, fetched_at, ...):
+
+- Files are memory-mapped, and only the byte range from the seek point on
+  is copied out and split into lines.
+- Only the ordering key is pulled out of each line, with a byte search; the
+  rest of the record is decoded as JSON the first time a field is
+  accessed. Keys stay strings: the writers store UTC isoformat() text,
+  which sorts the same as the timestamps it encodes.
+- Year files are combined with a k-way heapq.merge rather than a global
+  sort, or simply chained when their key ranges do not overlap. Within a
+  file, lines are time-ordered except for late runs from the cursor
+  overlap, which can land after newer lines; such a file is put in order
+  on its own (a stable sort of a nearly sorted list).
+- `since=` skips year files that end before it and bisects into the first
+  remaining file, so only the matching byte range is read. `disorder`
+  bounds how much older than an earlier line a later line can be; the
+  bisection aims that much before `since` so no late line is skipped.
+"""
+
+import heapq
+import itertools
+import json
+import mmap
+import pathlib
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator, Optional
+
+_decode = json.JSONDecoder().decode
+
+
+class LazyRecord:
+    """One JSONL line; decoded on first field access."""
+
+    __slots__ = ("raw", "key", "_data")
+
+    def __init__(self, raw: bytes, key: str):
+        self.raw = raw
+        self.key = key
+        self._data: Optional[dict] = None
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = _decode(self.raw.decode())
+        return self._data
+
+    def __getitem__(self, name: str) -> Any:
+        return self.data[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.data.get(name, default)
+
+
+def _key_of(raw: bytes, marker: bytes, key: str) -> str:
+    # The writers use json.dumps' default separators, so a string field
+    # reads `"key": "value"`; anything else goes through a full decode.
+    i = raw.find(marker)
+    if i >= 0:
+        start = i + len(marker)
+        return raw[start : raw.find(b'"', start)].decode()
+    return json.loads(raw)[key]
+
+
+def _line_end(buf: mmap.mmap, start: int) -> int:
+    end = buf.find(b"\n", start)
+    return len(buf) if end < 0 else end
+
+
+def _seek(buf: mmap.mmap, marker: bytes, key: str, target: str) -> int:
+    """Offset of the first line whose key is >= target (bisecting lines).
+
+    Tombstones (see run_manifest) are all-blank lines with no key: the
+    comparison uses the first real line at or after the probe, and a probe
+    with only blank lines before `hi` moves `hi` down. Either way the
+    result never passes the first matching line; it may stop on blank
+    lines before it, which the caller skips.
+    """
+    lo, hi = 0, len(buf)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = buf.rfind(b"\n", 0, mid) + 1
+        line, end = start, _line_end(buf, start)
+        while not buf[line:end].strip() and end + 1 < hi:
+            line, end = end + 1, _line_end(buf, end + 1)
+        raw = buf[line:end]
+        if raw.strip() and _key_of(raw, marker, key) < target:
+            lo = end + 1
+        else:
+            hi = start
+    return lo
+
+
+def _read_file(
+    path: pathlib.Path, key: str, seek_to: Optional[str]
+) -> list[LazyRecord]:
+    """Records of one file from seek_to on, sorted by key."""
+    marker = f'"{key}": "'.encode()
+    with path.open("rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return []
+        with buf:
+            start = _seek(buf, marker, key, seek_to) if seek_to else 0
+            lines = buf[start:].split(b"\n")
+    records = [
+        LazyRecord(raw, _key_of(raw, marker, key))
+        for raw in lines
+        if raw.strip()
+    ]
+    if any(a.key > b.key for a, b in zip(records, records[1:])):
+        records.sort(key=lambda r: r.key)
+    return records
+
+
+def _file_year(path: pathlib.Path) -> Optional[int]:
+    suffix = path.stem.rsplit("-", 1)[-1]
+    return int(suffix) if suffix.isdigit() else None
+
+
+def read_jsonl(
+    paths: Iterable[pathlib.Path],
+    key: str = "created_at",
+    since: Optional[datetime] = None,
+    disorder: timedelta = timedelta(0),
+) -> Iterator[LazyRecord]:
+    """Records of all `paths` in `key` order, optionally only key >= since.
+
+    `since` must be timezone-aware UTC, like the stored timestamps.
+    """
+    seek_to = since - disorder if since else None
+    seek_key = seek_to.isoformat() if seek_to else None
+    streams = []
+    for path in sorted(paths):
+        year = _file_year(path)
+        if seek_to and year is not None and year < seek_to.year:
+            continue
+        records = _read_file(path, key, seek_key)
+        if records:
+            streams.append(records)
+    if all(a[-1].key <= b[0].key for a, b in zip(streams, streams[1:])):
+        merged: Iterator[LazyRecord] = itertools.chain(*streams)
+    else:
+        merged = heapq.merge(*streams, key=lambda r: r.key)
+    if since is None:
+        return merged
+    since_key = since.isoformat()
+    return (r for r in merged if r.key >= since_key)
@@ -1,15 +1,26 @@
 import argparse
+import asyncio
+import bisect
 import functools
 import json
 import pathlib
-from collections import defaultdict
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional, TypedDict
 
 print = functools.partial(print, flush=True)
 
 import github_api
+import item_history
+import json_export
+import parallel_targets
+import perf_metrics
+import rollups
+from http_cache import DEFAULT_MAX_BYTES as HTTP_CACHE_MAX_BYTES, ResponseCache
 from image_tags import TAGS as CANONICAL_TAGS
+from run_manifest import CursorManifest
+from run_records import WorkflowRun
+from storage import SqliteStorage, Storage, open_storage, repo_short_name
 
 REPO = "autowarefoundation/autoware"
 
@@ -18,11 +29,29 @@ BACKFILL_DAYS = 90
 # Overlap re-fetched on each incremental run, in case late-completing runs
 # slipped in just under the previous cursor.
 CURSOR_OVERLAP = timedelta(days=1)
+# Run ids kept in the cursor manifest for dedup. Every run the next listing
+# can return is newer than max_created_at - CURSOR_OVERLAP; the extra day
+# is headroom should the overlap be widened.
+MANIFEST_ID_WINDOW = 2 * CURSOR_OVERLAP
+
+
+class _WorkflowSpecOptional(TypedDict, total=False):
+    only_success: bool  # defaults to True
+
+
+class WorkflowSpec(_WorkflowSpecOptional):
+    id: str
+    accurate: bool
+    event: Optional[str]
+    branch: Optional[str]
+    min_seconds: float
+    max_seconds: float
+
 
 # Per-workflow collection config. `accurate=True` triggers a jobs-API call
 # per run (needed to get per-job durations); `accurate=False` is wall-clock
 # only (created_at..updated_at) and skips the jobs API.
-WORKFLOWS = {
+WORKFLOWS: dict[str, WorkflowSpec] = {
     "health-check": {
         "id": "health-check.yaml",
         "accurate": True,
@@ -57,357 +86,733 @@ MULTI_REPO_WORKFLOWS = [
 ]
 
 
-def workflow_basename(workflow_id: str) -> str:
-    if workflow_id.endswith(".yaml"):
-        return workflow_id[:-5]
-    if workflow_id.endswith(".yml"):
-        return workflow_id[:-4]
-    return workflow_id
+def fetch_cursor(max_dt: Optional[datetime]) -> datetime:
+    """created_after for the next fetch, given the newest stored run."""
+    if max_dt is None:
+        cursor = datetime.now(timezone.utc) - timedelta(days=BACKFILL_DAYS)
+        print(f"  no existing data; backfilling from {cursor.date()}")
+    else:
+        cursor = max_dt - CURSOR_OVERLAP
+        print(
+            f"  existing through {max_dt.isoformat()}; fetching since {cursor.isoformat()}"
+        )
+    return cursor
 
 
-def workflow_runs_dir(data_dir: pathlib.Path) -> pathlib.Path:
-    return data_dir / "workflow_runs"
+def workflow_list_kwargs(workflow_key: str, cursor: datetime) -> dict:
+    spec = WORKFLOWS[workflow_key]
+    return {
+        "created_after": cursor,
+        "event": spec["event"],
+        "branch": spec["branch"],
+        # Listed unfiltered, so a stored success that turned into a failure
+        # is seen and removed; only_success is applied by the merge.
+        "only_success": False,
+    }
+
 
+def stored_recent_runs(
+    store: Storage, repo: str, workflow_id: str, cursor: CursorManifest
+) -> dict[int, WorkflowRun]:
+    """Stored runs the overlap listing can return again, by id."""
+    if cursor.max_created_at is None:
+        return {}
+    since = cursor.max_created_at - cursor.window
+    return {r.id: r for r in store.load_runs(repo, workflow_id, since=since)}
 
-def load_existing_workflow_runs(
-    data_dir: pathlib.Path, workflow_id: str
-) -> tuple[set, Optional[datetime], list[dict]]:
-    """Read all yearly JSONL files for a workflow.
 
-    Returns (existing_run_ids, max_created_at, all_entries_with_datetime).
+def unchanged_filter(
+    cursor: CursorManifest,
+    stored: dict[int, WorkflowRun],
+    only_success: bool = False,
+) -> Callable[[WorkflowRun], bool]:
+    """skip= predicate for stored runs whose conclusion has not changed.
+
+    A re-run (or a late conclusion) changes a stored run's conclusion; such
+    runs are enriched again and upserted (or removed). With only_success,
+    new runs that did not succeed are skipped as well.
     """
-    base = workflow_basename(workflow_id)
-    files = sorted(workflow_runs_dir(data_dir).glob(f"{base}-*.jsonl"))
-    run_ids: set = set()
-    max_dt: Optional[datetime] = None
-    entries: list[dict] = []
-    for path in files:
-        with path.open() as f:
-            for line in f:
-                entry = json.loads(line)
-                entry["created_at"] = datetime.fromisoformat(entry["created_at"])
-                entries.append(entry)
-                run_ids.add(entry["run_id"])
-                if max_dt is None or entry["created_at"] > max_dt:
-                    max_dt = entry["created_at"]
-    return run_ids, max_dt, entries
 
+    def unchanged(run: WorkflowRun) -> bool:
+        known = stored.get(run.id)
+        if known is None:
+            if only_success and run.conclusion != "success":
+                return True
+            return cursor.seen(run)
+        return known.conclusion == run.conclusion
 
-def append_workflow_runs(
-    data_dir: pathlib.Path, workflow_id: str, runs: list[dict]
-) -> int:
-    """Append new GitHub-shaped run dicts to the appropriate yearly JSONL."""
-    if not runs:
-        return 0
-    base = workflow_basename(workflow_id)
-    out_dir = workflow_runs_dir(data_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    by_year: dict[int, list[dict]] = defaultdict(list)
-    for run in runs:
-        by_year[run["created_at"].year].append(run)
-
-    total = 0
-    for year, year_runs in sorted(by_year.items()):
-        year_runs.sort(key=lambda r: r["created_at"])
-        path = out_dir / f"{base}-{year}.jsonl"
-        with path.open("a") as f:
-            for run in year_runs:
-                f.write(
-                    json.dumps(
-                        {
-                            "run_id": run["id"],
-                            "created_at": run["created_at"].isoformat(),
-                            "duration": run["duration"],
-                            "jobs": run["jobs"],
-                            "conclusion": run["conclusion"],
-                            "html_url": run.get("html_url", ""),
-                        }
-                    )
-                    + "\n"
-                )
-                total += 1
-        print(f"    appended {len(year_runs)} -> {path}")
-    return total
+    return unchanged
 
 
-def collect_workflow_runs(
-    workflow_key: str, data_dir: pathlib.Path, github_token: str
-) -> list[dict]:
-    """Incrementally fetch + persist runs for a workflow; return all known runs."""
-    spec = WORKFLOWS[workflow_key]
-    workflow_id = spec["id"]
-    print(f"workflow: {workflow_id}")
-    existing_ids, max_dt, existing_entries = load_existing_workflow_runs(
-        data_dir, workflow_id
-    )
+def split_new_and_changed(
+    runs: list[WorkflowRun],
+    cursor: CursorManifest,
+    stored: dict[int, WorkflowRun],
+) -> tuple[list[WorkflowRun], list[WorkflowRun]]:
+    new = [r for r in runs if r.id not in stored and not cursor.seen(r)]
+    changed = [
+        r
+        for r in runs
+        if r.id in stored and stored[r.id].conclusion != r.conclusion
+    ]
+    return new, changed
 
-    if max_dt is None:
-        cursor = datetime.now(timezone.utc) - timedelta(days=BACKFILL_DAYS)
-        print(f"  no existing data; backfilling from {cursor.date()}")
-    else:
-        cursor = max_dt - CURSOR_OVERLAP
-        print(
-            f"  existing through {max_dt.isoformat()}; fetching since {cursor.isoformat()}"
-        )
 
-    api = github_api.GitHubWorkflowAPI(github_token)
-    fetched = api.get_workflow_duration_list(
-        REPO,
-        workflow_id,
-        accurate=spec["accurate"],
-        created_after=cursor,
-        event=spec["event"],
-        branch=spec["branch"],
-        only_success=spec.get("only_success", True),
-    )
-    print(f"  fetched {len(fetched)} runs from API")
+def merge_workflow_runs(
+    workflow_key: str,
+    store: Storage,
+    fetched: list[WorkflowRun],
+    cursor: CursorManifest,
+    stored: dict[int, WorkflowRun],
+) -> list[WorkflowRun]:
+    """Persist the new and changed runs among `fetched`; return the new."""
+    spec = WORKFLOWS[workflow_key]
+    print(f"  fetched {len(fetched)} new runs from API")
 
-    # max_seconds is a universal sanity cap. min_seconds only filters
-    # *success* runs (drops the changed-files no-op fast path) — failures
-    # of any duration are kept so the dashboard can surface them.
-    def in_band(r):
-        if r["duration"] >= spec["max_seconds"]:
+    # only_success series keep successes only. max_seconds is a universal
+    # sanity cap. min_seconds only filters *success* runs (drops the
+    # changed-files no-op fast path) — failures of any duration are kept
+    # so the dashboard can surface them.
+    def in_band(r: WorkflowRun) -> bool:
+        if spec.get("only_success", True) and r.conclusion != "success":
             return False
-        if r["conclusion"] == "success" and r["duration"] <= spec["min_seconds"]:
+        if r.duration >= spec["max_seconds"]:
+            return False
+        if r.conclusion == "success" and r.duration <= spec["min_seconds"]:
             return False
         return True
 
-    in_band_runs = [r for r in fetched if in_band(r)]
-    new_runs = [r for r in in_band_runs if r["id"] not in existing_ids]
-    print(f"  in-band: {len(in_band_runs)}; new (deduped): {len(new_runs)}")
-
-    append_workflow_runs(data_dir, workflow_id, new_runs)
-
-    # Existing entries already have datetime created_at + run_id; expose `id`
-    # so export_to_json can treat them uniformly with freshly-fetched runs.
-    for entry in existing_entries:
-        entry["id"] = entry["run_id"]
-    combined = existing_entries + [
-        {
-            "id": r["id"],
-            "created_at": r["created_at"],
-            "duration": r["duration"],
-            "jobs": r["jobs"],
-            "conclusion": r["conclusion"],
-            "html_url": r.get("html_url", ""),
-        }
-        for r in new_runs
-    ]
-    combined.sort(key=lambda r: r["created_at"])
-    return combined
+    # Stored runs are matched before the band filter: one whose new record
+    # falls out of band is removed instead of keeping its stale record.
+    new_runs, changed_runs = split_new_and_changed(fetched, cursor, stored)
+    new_runs = [r for r in new_runs if in_band(r)]
+    dropped_runs = [r for r in changed_runs if not in_band(r)]
+    changed_runs = [r for r in changed_runs if in_band(r)]
+    print(
+        f"  new (deduped, in-band): {len(new_runs)}; "
+        f"changed: {len(changed_runs)}; out of band: {len(dropped_runs)}"
+    )
 
+    store.append_runs(REPO, spec["id"], new_runs, cursor)
+    store.upsert_runs(REPO, spec["id"], changed_runs, cursor)
+    store.delete_runs(REPO, spec["id"], dropped_runs, cursor)
+    return new_runs
 
-def repo_short_name(repo: str) -> str:
-    return repo.rsplit("/", 1)[-1]
+
+def collect_workflow_runs(
+    workflow_key: str, store: Storage, api: github_api.GitHubWorkflowAPI
+) -> list[WorkflowRun]:
+    """Incrementally fetch + persist runs for a workflow; return all known runs."""
+    workflow_id = WORKFLOWS[workflow_key]["id"]
+    print(f"workflow: {workflow_id}")
+    with perf_metrics.target(workflow_key):
+        # The scrape itself only needs the cursor; the full history is read
+        # afterwards for the dashboard export.
+        with api.recorder.span("cursor"):
+            cursor = store.run_cursor(REPO, workflow_id)
+            stored = stored_recent_runs(store, REPO, workflow_id, cursor)
+        # List cheaply first, then enrich only runs that are new or changed:
+        # with accurate=True that skips the jobs-API calls for the overlap.
+        listed = api.list_workflow_runs(
+            REPO,
+            workflow_id,
+            **workflow_list_kwargs(
+                workflow_key, fetch_cursor(cursor.max_created_at)
+            ),
+        )
+        fetched = api.enrich_workflow_runs(
+            listed,
+            accurate=WORKFLOWS[workflow_key]["accurate"],
+            skip=unchanged_filter(
+                cursor,
+                stored,
+                WORKFLOWS[workflow_key].get("only_success", True),
+            ),
+        )
+        with api.recorder.span("store") as span:
+            new_runs = merge_workflow_runs(
+                workflow_key, store, fetched, cursor, stored
+            )
+            span["runs"] = len(new_runs)
+        with api.recorder.span("load") as span:
+            runs = store.load_runs(REPO, workflow_id)
+            span["runs"] = len(runs)
+    return runs
 
 
-def multi_repo_runs_dir(data_dir: pathlib.Path, repo: str) -> pathlib.Path:
-    return workflow_runs_dir(data_dir) / repo_short_name(repo)
+async def collect_workflow_runs_async(
+    workflow_key: str,
+    store: Storage,
+    api: github_api.AsyncGitHubWorkflowAPI,
+) -> list[WorkflowRun]:
+    """collect_workflow_runs on the async client; storage I/O runs in threads."""
+    workflow_id = WORKFLOWS[workflow_key]["id"]
+    print(f"workflow: {workflow_id}")
+    with perf_metrics.target(workflow_key):
+        with api.recorder.span("cursor"):
+            cursor = await asyncio.to_thread(
+                store.run_cursor, REPO, workflow_id
+            )
+            stored = await asyncio.to_thread(
+                stored_recent_runs, store, REPO, workflow_id, cursor
+            )
+        listed = await api.list_workflow_runs(
+            REPO,
+            workflow_id,
+            **workflow_list_kwargs(
+                workflow_key, fetch_cursor(cursor.max_created_at)
+            ),
+        )
+        fetched = await api.enrich_workflow_runs(
+            listed,
+            accurate=WORKFLOWS[workflow_key]["accurate"],
+            skip=unchanged_filter(
+                cursor,
+                stored,
+                WORKFLOWS[workflow_key].get("only_success", True),
+            ),
+        )
+        with api.recorder.span("store") as span:
+            new_runs = await asyncio.to_thread(
+                merge_workflow_runs,
+                workflow_key,
+                store,
+                fetched,
+                cursor,
+                stored,
+            )
+            span["runs"] = len(new_runs)
+        with api.recorder.span("load") as span:
+            runs = await asyncio.to_thread(store.load_runs, REPO, workflow_id)
+            span["runs"] = len(runs)
+    return runs
 
 
-def load_existing_multi_repo_runs(
-    data_dir: pathlib.Path, repo: str, workflow_id: str
-) -> tuple[set, Optional[datetime], list[dict]]:
-    base = workflow_basename(workflow_id)
-    files = sorted(multi_repo_runs_dir(data_dir, repo).glob(f"{base}-*.jsonl"))
-    run_ids: set = set()
-    max_dt: Optional[datetime] = None
-    entries: list[dict] = []
-    for path in files:
-        with path.open() as f:
-            for line in f:
-                entry = json.loads(line)
-                entry["created_at"] = datetime.fromisoformat(entry["created_at"])
-                entries.append(entry)
-                run_ids.add(entry["run_id"])
-                if max_dt is None or entry["created_at"] > max_dt:
-                    max_dt = entry["created_at"]
-    return run_ids, max_dt, entries
+# Swimlane targets keep every terminal conclusion of push-to-main runs.
+MULTI_REPO_LIST_KWARGS: dict = {
+    "event": "push",
+    "branch": "main",
+    "only_success": False,
+}
 
 
-def append_multi_repo_runs(
-    data_dir: pathlib.Path, repo: str, workflow_id: str, runs: list[dict]
-) -> int:
-    if not runs:
-        return 0
-    base = workflow_basename(workflow_id)
-    out_dir = multi_repo_runs_dir(data_dir, repo)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    by_year: dict[int, list[dict]] = defaultdict(list)
-    for run in runs:
-        by_year[run["created_at"].year].append(run)
-
-    total = 0
-    for year, year_runs in sorted(by_year.items()):
-        year_runs.sort(key=lambda r: r["created_at"])
-        path = out_dir / f"{base}-{year}.jsonl"
-        with path.open("a") as f:
-            for run in year_runs:
-                f.write(
-                    json.dumps(
-                        {
-                            "run_id": run["id"],
-                            "created_at": run["created_at"].isoformat(),
-                            "duration": run["duration"],
-                            "conclusion": run["conclusion"],
-                            "html_url": run.get("html_url", ""),
-                            "head_sha": run.get("head_sha", ""),
-                            "commit_title": run.get("commit_title", ""),
-                        }
-                    )
-                    + "\n"
-                )
-                total += 1
-        print(f"    appended {len(year_runs)} -> {path}")
-    return total
+def merge_multi_repo_runs(
+    repo: str,
+    workflow_id: str,
+    store: Storage,
+    fetched: list[WorkflowRun],
+    cursor: CursorManifest,
+    stored: dict[int, WorkflowRun],
+) -> list[WorkflowRun]:
+    print(f"  fetched {len(fetched)} new runs from API")
+
+    new_runs, changed_runs = split_new_and_changed(fetched, cursor, stored)
+    print(f"  new (deduped): {len(new_runs)}; changed: {len(changed_runs)}")
+
+    store.append_runs(repo, workflow_id, new_runs, cursor)
+    store.upsert_runs(repo, workflow_id, changed_runs, cursor)
+    return new_runs
 
 
 def collect_multi_repo_runs(
-    repo: str, workflow_id: str, data_dir: pathlib.Path, github_token: str
-) -> list[dict]:
+    repo: str,
+    workflow_id: str,
+    store: Storage,
+    api: github_api.GitHubWorkflowAPI,
+) -> list[WorkflowRun]:
     """Scrape a single (repo, workflow) pair for the swimlane chart.
 
     Retains all terminal conclusions (not only success), writes a richer
     schema with html_url + head_sha + commit_title for hover/click UX.
     """
     print(f"{repo} :: {workflow_id}")
-    existing_ids, max_dt, existing_entries = load_existing_multi_repo_runs(
-        data_dir, repo, workflow_id
+    with perf_metrics.target(repo_short_name(repo)):
+        with api.recorder.span("cursor"):
+            cursor = store.run_cursor(repo, workflow_id)
+            stored = stored_recent_runs(store, repo, workflow_id, cursor)
+        listed = api.list_workflow_runs(
+            repo,
+            workflow_id,
+            created_after=fetch_cursor(cursor.max_created_at),
+            **MULTI_REPO_LIST_KWARGS,
+        )
+        fetched = api.enrich_workflow_runs(
+            listed, skip=unchanged_filter(cursor, stored)
+        )
+        with api.recorder.span("store") as span:
+            new_runs = merge_multi_repo_runs(
+                repo, workflow_id, store, fetched, cursor, stored
+            )
+            span["runs"] = len(new_runs)
+        with api.recorder.span("load") as span:
+            runs = store.load_runs(repo, workflow_id)
+            span["runs"] = len(runs)
+    return runs
+
+
+async def collect_multi_repo_runs_async(
+    repo: str,
+    workflow_id: str,
+    store: Storage,
+    api: github_api.AsyncGitHubWorkflowAPI,
+) -> list[WorkflowRun]:
+    print(f"{repo} :: {workflow_id}")
+    with perf_metrics.target(repo_short_name(repo)):
+        with api.recorder.span("cursor"):
+            cursor = await asyncio.to_thread(
+                store.run_cursor, repo, workflow_id
+            )
+            stored = await asyncio.to_thread(
+                stored_recent_runs, store, repo, workflow_id, cursor
+            )
+        listed = await api.list_workflow_runs(
+            repo,
+            workflow_id,
+            created_after=fetch_cursor(cursor.max_created_at),
+            **MULTI_REPO_LIST_KWARGS,
+        )
+        fetched = await api.enrich_workflow_runs(
+            listed, skip=unchanged_filter(cursor, stored)
+        )
+        with api.recorder.span("store") as span:
+            new_runs = await asyncio.to_thread(
+                merge_multi_repo_runs,
+                repo,
+                workflow_id,
+                store,
+                fetched,
+                cursor,
+                stored,
+            )
+            span["runs"] = len(new_runs)
+        with api.recorder.span("load") as span:
+            runs = await asyncio.to_thread(store.load_runs, repo, workflow_id)
+            span["runs"] = len(runs)
+    return runs
+
+
+async def collect_all_async(
+    store: Storage, api: github_api.AsyncGitHubWorkflowAPI
+) -> tuple[
+    list[WorkflowRun], list[WorkflowRun], dict[str, list[WorkflowRun]]
+]:
+    """Scrape every target concurrently under the client's concurrency cap.
+
+    Returns (health_check, docker_build_and_push, repo_ci_runs), the same
+    values the serial path in __main__ collects.
+    """
+    results = await asyncio.gather(
+        collect_workflow_runs_async("health-check", store, api),
+        collect_workflow_runs_async("docker-build-and-push", store, api),
+        *(
+            collect_multi_repo_runs_async(
+                spec["repo"], spec["workflow_id"], store, api
+            )
+            for spec in MULTI_REPO_WORKFLOWS
+        ),
     )
+    repo_ci_runs = {
+        repo_short_name(spec["repo"]): runs
+        for spec, runs in zip(MULTI_REPO_WORKFLOWS, results[2:])
+    }
+    return results[0], results[1], repo_ci_runs
 
-    if max_dt is None:
-        cursor = datetime.now(timezone.utc) - timedelta(days=BACKFILL_DAYS)
-        print(f"  no existing data; backfilling from {cursor.date()}")
-    else:
-        cursor = max_dt - CURSOR_OVERLAP
-        print(
-            f"  existing through {max_dt.isoformat()}; fetching since {cursor.isoformat()}"
+
+def collect_all_parallel(
+    store: Storage,
+    make_api: Callable[[], github_api.GitHubWorkflowAPI],
+    jobs: int,
+) -> tuple[
+    list[WorkflowRun], list[WorkflowRun], dict[str, list[WorkflowRun]], dict
+]:
+    """Run every target, docker history included, on a `jobs`-wide pool.
+
+    Returns (health_check, docker_build_and_push, repo_ci_runs,
+    docker_images). A target that fails is reported and replaced by its
+    already-stored history, so the export still covers it.
+    """
+    targets: dict[str, Callable] = {}
+    fallbacks: dict[str, Callable] = {}
+    for key in ("health-check", "docker-build-and-push"):
+        targets[key] = functools.partial(
+            collect_workflow_runs, key, store, make_api()
+        )
+        fallbacks[key] = functools.partial(
+            store.load_runs, REPO, WORKFLOWS[key]["id"]
         )
+    for spec in MULTI_REPO_WORKFLOWS:
+        name = repo_short_name(spec["repo"])
+        targets[name] = functools.partial(
+            collect_multi_repo_runs,
+            spec["repo"],
+            spec["workflow_id"],
+            store,
+            make_api(),
+        )
+        fallbacks[name] = functools.partial(
+            store.load_runs, spec["repo"], spec["workflow_id"]
+        )
+    targets["docker-images"] = functools.partial(
+        load_docker_image_history, store
+    )
+    fallbacks["docker-images"] = functools.partial(
+        salvage_docker_image_history, store
+    )
 
-    api = github_api.GitHubWorkflowAPI(github_token)
-    fetched = api.get_workflow_duration_list(
-        repo,
-        workflow_id,
-        accurate=False,
-        created_after=cursor,
-        event="push",
-        branch="main",
-        only_success=False,
+    values = {}
+    for name, result in parallel_targets.run_targets(targets, jobs).items():
+        if result.error is None:
+            values[name] = result.value
+            continue
+        print(
+            f"Warning: target {name} failed ({result.error!r}); "
+            "exporting its stored history instead"
+        )
+        values[name] = fallbacks[name]()
+    repo_ci_runs = {
+        repo_short_name(spec["repo"]): values[repo_short_name(spec["repo"])]
+        for spec in MULTI_REPO_WORKFLOWS
+    }
+    return (
+        values["health-check"],
+        values["docker-build-and-push"],
+        repo_ci_runs,
+        values["docker-images"],
     )
-    print(f"  fetched {len(fetched)} runs from API")
-
-    new_runs = [r for r in fetched if r["id"] not in existing_ids]
-    print(f"  new (deduped): {len(new_runs)}")
-
-    append_multi_repo_runs(data_dir, repo, workflow_id, new_runs)
-
-    for entry in existing_entries:
-        entry["id"] = entry["run_id"]
-    combined = existing_entries + [
-        {
-            "id": r["id"],
-            "created_at": r["created_at"],
-            "duration": r["duration"],
-            "conclusion": r["conclusion"],
-            "html_url": r.get("html_url", ""),
-            "head_sha": r.get("head_sha", ""),
-            "commit_title": r.get("commit_title", ""),
-        }
-        for r in new_runs
-    ]
-    combined.sort(key=lambda r: r["created_at"])
-    return combined
 
 
-def load_docker_image_history(data_dir: pathlib.Path) -> dict:
-    """Read all yearly docker JSONL files into the dashboard-shaped dict."""
+# Pull request and container-version history, kept with --item-history
+# (see item_history).
+PULL_REQUEST_REPOS = [REPO] + [spec["repo"] for spec in MULTI_REPO_WORKFLOWS]
+CONTAINER_PACKAGES = [("autowarefoundation", "autoware")]
+
+
+def _utc_iso(dt: Optional[datetime]) -> Optional[str]:
+    # The pull request / package parsers return naive UTC datetimes.
+    return dt.replace(tzinfo=timezone.utc).isoformat() if dt else None
+
+
+def collect_pull_requests(
+    repo: str, data_dir: pathlib.Path, api: github_api.GithubPullRequestAPI
+) -> int:
+    """Upsert the pull requests updated since the stored cursor."""
+    print(f"pull requests: {repo}")
+    directory = data_dir / item_history.PULL_REQUESTS_DIR
+    base = repo_short_name(repo)
+    key = item_history.PULL_REQUESTS_CURSOR
+    with perf_metrics.target(f"pulls:{base}"):
+        with api.recorder.span("cursor"):
+            state = item_history.load_cursor(directory, base, key)
+        with api.recorder.span("list") as span:
+            fetched = api.get_all_pull_requests(repo, since=state.cursor)
+            span["items"] = len(fetched)
+        records = [
+            {
+                "id": pr["id"],
+                "number": pr["number"],
+                "created_at": _utc_iso(pr["created_at"]),
+                "updated_at": _utc_iso(pr["updated_at"]),
+                "closed_at": _utc_iso(pr["closed_at"]),
+                "merged_at": _utc_iso(pr["merged_at"]),
+                "state": pr["state"],
+                "title": pr.get("title", ""),
+                "html_url": pr.get("html_url", ""),
+            }
+            for pr in fetched
+        ]
+        print(f"  fetched {len(records)} updated since {state.cursor}")
+        with api.recorder.span("store"):
+            updated, added = item_history.upsert_items(
+                directory, base, key, state, records
+            )
+    return updated + added
+
+
+def collect_container_versions(
+    org: str, pkg: str, data_dir: pathlib.Path, api: github_api.GithubPackagesAPI
+) -> int:
+    """Store the container versions created since the stored cursor."""
+    directory = data_dir / item_history.CONTAINER_VERSIONS_DIR
+    key = item_history.CONTAINER_VERSIONS_CURSOR
+    with perf_metrics.target(f"versions:{pkg}"):
+        with api.recorder.span("cursor"):
+            state = item_history.load_cursor(directory, pkg, key)
+        with api.recorder.span("list") as span:
+            fetched = api.get_all_containers(org, pkg, since=state.cursor)
+            span["items"] = len(fetched)
+        records = [
+            {
+                "id": version["id"],
+                "name": version["name"],
+                "created_at": _utc_iso(version["created_at"]),
+                "updated_at": _utc_iso(version["updated_at"]),
+                "tags": (version.get("metadata") or {})
+                .get("container", {})
+                .get("tags", []),
+            }
+            for version in fetched
+        ]
+        print(f"  fetched {len(records)} created since {state.cursor}")
+        with api.recorder.span("store"):
+            updated, added = item_history.upsert_items(
+                directory, pkg, key, state, records
+            )
+    return updated + added
+
+
+def collect_item_history(
+    data_dir: pathlib.Path,
+    github_token: str,
+    cache: Optional[ResponseCache],
+    jobs: int,
+) -> None:
+    """Bring the pull request and container-version history up to date.
+
+    A failing target (e.g. a token without packages: read) only leaves its
+    history where the previous scrape put it.
+    """
+    targets: dict[str, Callable] = {}
+    for repo in PULL_REQUEST_REPOS:
+        api = github_api.GithubPullRequestAPI(github_token, cache=cache)
+        targets[f"pull-requests:{repo_short_name(repo)}"] = functools.partial(
+            collect_pull_requests, repo, data_dir, api
+        )
+    for org, pkg in CONTAINER_PACKAGES:
+        packages_api = github_api.GithubPackagesAPI(github_token, cache=cache)
+        targets[f"container-versions:{pkg}"] = functools.partial(
+            collect_container_versions, org, pkg, data_dir, packages_api
+        )
+    for name, result in parallel_targets.run_targets(targets, jobs).items():
+        if result.error is not None:
+            print(
+                f"Warning: target {name} failed ({result.error!r}); "
+                "its stored history is kept as is"
+            )
+
+
+def load_docker_image_history(store: Storage) -> dict:
+    """Read all docker image size entries into the dashboard-shaped dict."""
+    docker_images: dict[str, list[dict]] = {tag: [] for tag in CANONICAL_TAGS}
+    recorder = perf_metrics.DEFAULT_RECORDER
+    with perf_metrics.target("docker-images"), recorder.span("load") as span:
+        for entry in store.load_image_sizes():
+            tag = entry.get("tag", "")
+            if tag in docker_images:
+                docker_images[tag].append(_image_point(entry))
+        span["entries"] = sum(len(e) for e in docker_images.values())
+    for tag, entries in docker_images.items():
+        print(f"  {tag}: {len(entries)} data points")
+    return docker_images
+
+
+def salvage_docker_image_history(store: Storage) -> dict:
+    """load_docker_image_history that skips what it cannot read.
+
+    The fallback of the docker-images target: the yearly files are read
+    one by one, line by line, so a bad file or line costs only its own
+    points instead of every image chart. The series are left empty only
+    if the files cannot even be listed.
+    """
     docker_images: dict[str, list[dict]] = {tag: [] for tag in CANONICAL_TAGS}
-    files = sorted(data_dir.glob("docker_image_sizes-*.jsonl"))
-    for path in files:
-        with path.open() as f:
-            for line in f:
+    jsonl = store.mirror if isinstance(store, SqliteStorage) else store
+    try:
+        paths = jsonl.image_size_files() if jsonl is not None else []
+    except OSError as e:
+        print(f"Warning: no docker image history to export ({e!r})")
+        return docker_images
+    skipped = 0
+    for path in paths:
+        try:
+            with path.open() as f:
+                lines = [line for line in f if line.strip()]
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Warning: skipping {path} ({e!r})")
+            continue
+        for line in lines:
+            try:
                 entry = json.loads(line)
-                tag = entry.get("tag", "")
-                if tag not in docker_images:
-                    continue
-                docker_images[tag].append(
-                    {
-                        "size_compressed": entry.get("compressed_size_bytes", 0),
-                        "size_uncompressed": entry.get(
-                            "uncompressed_size_bytes", 0
-                        ),
-                        "date": datetime.fromisoformat(entry["fetched_at"]).strftime(
-                            "%Y/%m/%d %H:%M:%S"
-                        ),
-                        "tag": tag,
-                        "digest": entry.get("digest", ""),
-                    }
-                )
+                point = _image_point(entry)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                skipped += 1
+                continue
+            if point["tag"] in docker_images:
+                docker_images[point["tag"]].append(point)
+    if skipped:
+        print(f"Warning: skipped {skipped} unreadable docker image entries")
     for tag, entries in docker_images.items():
+        # Dashboard dates sort in time order as strings.
+        entries.sort(key=lambda point: point["date"])
         print(f"  {tag}: {len(entries)} data points")
+    if not any(docker_images.values()):
+        print("Warning: exporting empty docker image series")
     return docker_images
 
 
-def export_to_json(health_check, docker_build_and_push, docker_images, repo_ci_runs):
+def _image_point(entry: dict) -> dict:
+    point = {
+        "size_compressed": entry.get("compressed_size_bytes", 0),
+        "size_uncompressed": entry.get("uncompressed_size_bytes", 0),
+        "date": datetime.fromisoformat(entry["fetched_at"]).strftime(
+            DASHBOARD_DATE_FORMAT
+        ),
+        "tag": entry.get("tag", ""),
+        "digest": entry.get("digest", ""),
+    }
+    # Entries recorded before per-layer bookkeeping have no split.
+    for key in IMAGE_SHARE_KEYS:
+        if key in entry:
+            point[key] = entry[key]
+    return point
+
+
+DASHBOARD_DATE_FORMAT = "%Y/%m/%d %H:%M:%S"
+IMAGE_SHARE_KEYS = (
+    "unique_bytes",
+    "shared_bytes",
+    "unique_uncompressed_bytes",
+    "shared_uncompressed_bytes",
+)
+
+
+def _runs_between(
+    runs: list[WorkflowRun], start: Optional[datetime], end: Optional[datetime]
+) -> list[WorkflowRun]:
+    """Runs with start <= created_at < end; `runs` is sorted by created_at."""
+    lo = bisect.bisect_left(runs, start, key=_created_at) if start else 0
+    hi = bisect.bisect_left(runs, end, key=_created_at) if end else len(runs)
+    return runs[lo:hi]
+
+
+def _created_at(run: WorkflowRun) -> datetime:
+    return run.created_at
+
+
+def _images_between(
+    docker_images: dict,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    keep_latest: bool = False,
+) -> dict:
+    """docker_images entries dated in [start, end).
+
+    With keep_latest, each tag also keeps its newest entry even if it is
+    older than `start`, so the "latest size" tables never come up empty.
+    """
+    lo = start.strftime(DASHBOARD_DATE_FORMAT) if start else ""
+    hi = end.strftime(DASHBOARD_DATE_FORMAT) if end else None
+    out = {}
+    for tag, entries in docker_images.items():
+        kept = [
+            e
+            for e in entries
+            if e["date"] >= lo and (hi is None or e["date"] < hi)
+        ]
+        if keep_latest and entries and not kept:
+            kept = entries[-1:]
+        out[tag] = kept
+    return out
+
+
+def health_check_jobs(run: WorkflowRun) -> dict[str, float]:
+    """The docker-build jobs of a health-check run, by dashboard label."""
+    jobs = {}
+    for job, seconds in run.jobs.items():
+        if "docker-build (main)" in job:
+            jobs["main-amd64"] = seconds
+        elif "docker-build (nightly)" in job:
+            jobs["nightly-amd64"] = seconds
+        elif "docker-build (main-arm64)" in job:
+            jobs["main-arm64"] = seconds
+    return jobs
+
+
+def build_rollups(
+    health_check: list[WorkflowRun],
+    docker_build_and_push: list[WorkflowRun],
+    repo_ci_runs: dict[str, list[WorkflowRun]],
+) -> dict:
+    """Daily/weekly duration stats (seconds) for every dashboard series."""
+    series = {
+        f"health-check/{job}": cols
+        for job, cols in rollups.job_columns(
+            health_check, health_check_jobs
+        ).items()
+    }
+    series["docker-build-and-push"] = rollups.run_columns(docker_build_and_push)
+    for repo_key, runs in repo_ci_runs.items():
+        series[f"repo_ci_runs/{repo_key}"] = rollups.run_columns(runs)
+    return rollups.compute_rollups(series)
+
+
+def export_to_json(
+    health_check,
+    docker_build_and_push,
+    docker_images,
+    repo_ci_runs,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    rollup_data: Optional[dict] = None,
+    meta: Optional[dict] = None,
+):
+    """Dashboard document; record lists are generators for json_export.
+
+    `start`/`end` restrict the runs to a time window (used for shards); the
+    caller filters docker_images itself. `rollup_data` from build_rollups
+    becomes the "rollups" section, and `meta` the "meta" section.
+    """
+    health_check = _runs_between(health_check, start, end)
+    docker_build_and_push = _runs_between(docker_build_and_push, start, end)
+    repo_ci_runs = {
+        repo_key: _runs_between(runs, start, end)
+        for repo_key, runs in repo_ci_runs.items()
+    }
+
     def _export_health_check(workflow):
-        out = []
         for run in workflow:
-            jobs = {}
-            for job in run["jobs"]:
-                if "docker-build (main)" in job:
-                    jobs["main-amd64"] = run["jobs"][job]
-                elif "docker-build (nightly)" in job:
-                    jobs["nightly-amd64"] = run["jobs"][job]
-                elif "docker-build (main-arm64)" in job:
-                    jobs["main-arm64"] = run["jobs"][job]
+            jobs = health_check_jobs(run)
             if not jobs:
                 continue
-            out.append(
-                {
-                    "run_id": run["id"],
-                    "date": run["created_at"].strftime("%Y/%m/%d %H:%M:%S"),
-                    "duration": run["duration"] / 3600,
-                    "jobs": jobs,
-                }
-            )
-        return out
+            yield {
+                "run_id": run.id,
+                "date": run.created_at.strftime(DASHBOARD_DATE_FORMAT),
+                "duration": run.duration / 3600,
+                "jobs": jobs,
+            }
 
     def _export_docker_build_and_push(workflow):
         # Single wall-clock duration per run — push-to-main only. Non-success
         # runs are included so the dashboard can plot failures/cancellations
         # alongside the success line, coloured by conclusion.
-        return [
+        return (
             {
-                "run_id": run["id"],
-                "date": run["created_at"].strftime("%Y/%m/%d %H:%M:%S"),
-                "duration": run["duration"] / 3600,
-                "jobs": {"total": run["duration"]},
-                "conclusion": run.get("conclusion", "success"),
-                "html_url": run.get("html_url", ""),
+                "run_id": run.id,
+                "date": run.created_at.strftime(DASHBOARD_DATE_FORMAT),
+                "duration": run.duration / 3600,
+                "jobs": {"total": run.duration},
+                "conclusion": run.conclusion or "success",
+                "html_url": run.html_url,
             }
             for run in workflow
-        ]
+        )
 
     def _export_repo_ci_runs(runs_by_repo):
-        out: dict[str, list[dict]] = {}
-        for repo_key, runs in runs_by_repo.items():
-            out[repo_key] = [
+        return {
+            repo_key: (
                 {
-                    "run_id": r["id"],
-                    "date": r["created_at"].strftime("%Y/%m/%d %H:%M:%S"),
-                    "duration": r["duration"],
-                    "conclusion": r["conclusion"],
-                    "html_url": r.get("html_url", ""),
-                    "head_sha": r.get("head_sha", ""),
-                    "commit_title": r.get("commit_title", ""),
+                    "run_id": r.id,
+                    "date": r.created_at.strftime(DASHBOARD_DATE_FORMAT),
+                    "duration": r.duration,
+                    "conclusion": r.conclusion,
+                    "html_url": r.html_url,
+                    "head_sha": r.head_sha,
+                    "commit_title": r.commit_title,
                 }
                 for r in runs
-            ]
-        return out
+            )
+            for repo_key, runs in runs_by_repo.items()
+        }
 
-    return {
+    document = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "workflow_time": {
             "health-check": _export_health_check(health_check),
@@ -418,6 +823,92 @@ def export_to_json(health_check, docker_build_and_push, docker_images, repo_ci_r
         "docker_images": docker_images,
         "repo_ci_runs": _export_repo_ci_runs(repo_ci_runs),
     }
+    if rollup_data is not None:
+        document["rollups"] = rollup_data
+    if meta is not None:
+        document["meta"] = meta
+    return document
+
+
+# The dashboard's default views (up to 30 days) only need the recent shard;
+# longer windows fetch the per-year archives listed in index.json.
+RECENT_SHARD_DAYS = 30
+# Scraper runs summarised in the dashboard's meta.perf.history (one entry
+# per half-hourly scrape); the full records stay in
+# scraper_metrics-<year>.jsonl.
+PERF_HISTORY_DAYS = 7
+
+
+def write_dashboard_shards(
+    shard_dir: pathlib.Path,
+    health_check: list[WorkflowRun],
+    docker_build_and_push: list[WorkflowRun],
+    docker_images: dict,
+    repo_ci_runs: dict[str, list[WorkflowRun]],
+    indent: Optional[int] = None,
+    rollup_data: Optional[dict] = None,
+    meta: Optional[dict] = None,
+) -> dict:
+    """Write recent.json, archive-<year>.json and index.json; return the index.
+
+    `rollup_data` goes to rollups.json, listed in the index; `meta` goes
+    into the index itself.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    runs = (health_check, docker_build_and_push, *repo_ci_runs.values())
+
+    def shard(name: str, start, end, keep_latest=False) -> dict:
+        document = export_to_json(
+            health_check,
+            docker_build_and_push,
+            _images_between(docker_images, start, end, keep_latest),
+            repo_ci_runs,
+            start,
+            end,
+        )
+        stats = json_export.write_json(shard_dir / name, document, indent)
+        return {"file": name, "bytes": stats["bytes"]["json"]}
+
+    recent_since = now - timedelta(days=RECENT_SHARD_DAYS)
+    index: dict = {
+        "generated_at": now.isoformat(),
+        "recent": {
+            "days": RECENT_SHARD_DAYS,
+            "since": recent_since.isoformat(),
+            **shard("recent.json", recent_since, None, keep_latest=True),
+        },
+        "archives": [],
+    }
+
+    years = {run.created_at.year for series in runs for run in series}
+    years.update(
+        int(entry["date"][:4])
+        for entries in docker_images.values()
+        for entry in entries
+    )
+    for year in sorted(years):
+        start = datetime(year, 1, 1, tzinfo=timezone.utc)
+        end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+        index["archives"].append(
+            {"year": year, **shard(f"archive-{year}.json", start, end)}
+        )
+
+    if rollup_data is not None:
+        stats = json_export.write_json(
+            shard_dir / "rollups.json", rollup_data, indent
+        )
+        index["rollups"] = {
+            "file": "rollups.json",
+            "bytes": stats["bytes"]["json"],
+        }
+
+    if meta is not None:
+        index["meta"] = meta
+
+    # Fetched first; with meta.perf.history it is worth compressing too.
+    json_export.write_json(shard_dir / "index.json", index, indent)
+    return index
 
 
 if __name__ == "__main__":
@@ -435,27 +926,239 @@ if __name__ == "__main__":
         type=pathlib.Path,
         help="Path to the data-storage checkout.",
     )
+    parser.add_argument(
+        "--api-workers",
+        type=int,
+        default=github_api.DEFAULT_MAX_WORKERS,
+        help="Maximum concurrent GitHub API requests per listing (1 = serial).",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help=(
+            "Scrape all targets concurrently on the asyncio client; "
+            "--api-workers then caps requests in flight across all targets."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Scrape up to N targets at once on threads, with each target's "
+            "log buffered; a failing target falls back to its stored history."
+        ),
+    )
+    parser.add_argument(
+        "--http-cache-dir",
+        type=pathlib.Path,
+        default=None,
+        help="Directory for the ETag response cache (disabled when omitted).",
+    )
+    parser.add_argument(
+        "--http-cache-max-mb",
+        type=int,
+        default=HTTP_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Size budget of the response cache before LRU eviction.",
+    )
+    parser.add_argument(
+        "--item-history",
+        action="store_true",
+        help=(
+            "Also bring the pull request and container-version history in "
+            "the data directory up to date (usually one page each)."
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=pathlib.Path("github_action_data.json"),
+        help="Dashboard JSON to write; .gz/.br siblings are written next to it.",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        type=pathlib.Path,
+        default=None,
+        help=(
+            "Also write time-window shards (recent.json, archive-<year>.json, "
+            "index.json) for the dashboard into this directory."
+        ),
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write the dashboard JSON without indentation.",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Report the peak Python heap of the JSON export (slower).",
+    )
+    parser.add_argument(
+        "--sqlite-db",
+        type=pathlib.Path,
+        default=None,
+        help=(
+            "Index the data-storage history in this SQLite file (synced "
+            "from and mirrored to the JSONL); plain JSONL scans when omitted."
+        ),
+    )
     args = parser.parse_args()
+    if args.use_async and args.jobs > 1:
+        parser.error("--async and --jobs are alternative modes; pick one")
 
-    health_check = collect_workflow_runs(
-        "health-check", args.data_dir, args.github_token
-    )
-    docker_build_and_push = collect_workflow_runs(
-        "docker-build-and-push", args.data_dir, args.github_token
+    store = open_storage(
+        args.data_dir, args.sqlite_db, REPO, id_window=MANIFEST_ID_WINDOW
     )
+    cache = None
+    if args.http_cache_dir is not None:
+        cache = ResponseCache(
+            args.http_cache_dir, max_bytes=args.http_cache_max_mb * 1024 * 1024
+        )
 
-    repo_ci_runs: dict[str, list[dict]] = {}
-    for spec in MULTI_REPO_WORKFLOWS:
-        repo_ci_runs[repo_short_name(spec["repo"])] = collect_multi_repo_runs(
-            spec["repo"], spec["workflow_id"], args.data_dir, args.github_token
+    apis: list[github_api.GitHubWorkflowAPI | github_api.AsyncGitHubWorkflowAPI]
+    repo_ci_runs: dict[str, list[WorkflowRun]]
+    docker_images: Optional[dict] = None
+    if args.use_async:
+        async_api = github_api.AsyncGitHubWorkflowAPI(
+            args.github_token, max_concurrency=args.api_workers, cache=cache
+        )
+        apis = [async_api]
+        health_check, docker_build_and_push, repo_ci_runs = asyncio.run(
+            collect_all_async(store, async_api)
+        )
+        async_api.close()
+    elif args.jobs > 1:
+        apis = []
+
+        def make_api() -> github_api.GitHubWorkflowAPI:
+            # A client per target keeps connection pools and counters
+            # separate; the ETag cache and rate-limit scheduler are shared.
+            api = github_api.GitHubWorkflowAPI(
+                args.github_token, max_workers=args.api_workers, cache=cache
+            )
+            apis.append(api)
+            return api
+
+        (
+            health_check,
+            docker_build_and_push,
+            repo_ci_runs,
+            docker_images,
+        ) = collect_all_parallel(store, make_api, args.jobs)
+    else:
+        # One client for every target so they share the keep-alive session.
+        api = github_api.GitHubWorkflowAPI(
+            args.github_token, max_workers=args.api_workers, cache=cache
+        )
+        apis = [api]
+
+        health_check = collect_workflow_runs("health-check", store, api)
+        docker_build_and_push = collect_workflow_runs(
+            "docker-build-and-push", store, api
+        )
+
+        repo_ci_runs = {}
+        for spec in MULTI_REPO_WORKFLOWS:
+            repo_ci_runs[repo_short_name(spec["repo"])] = collect_multi_repo_runs(
+                spec["repo"], spec["workflow_id"], store, api
+            )
+
+    if args.item_history:
+        collect_item_history(
+            args.data_dir, args.github_token, cache, max(args.jobs, 1)
+        )
+
+    recorder = perf_metrics.DEFAULT_RECORDER
+    # Upserts leave tombstones behind; this rewrites only the year files
+    # where they passed the garbage threshold.
+    with recorder.span("compact"):
+        store.compact()
+    if docker_images is None:
+        print(f"Loading docker image history from {args.data_dir}")
+        docker_images = load_docker_image_history(store)
+    store.close()
+
+    rollup_start = time.perf_counter()
+    with recorder.span("rollups"):
+        rollup_data = build_rollups(
+            health_check, docker_build_and_push, repo_ci_runs
+        )
+    print(f"Computed rollups in {time.perf_counter() - rollup_start:.3f}s")
+
+    mode = "async" if args.use_async else f"jobs={args.jobs}"
+
+    def perf_record() -> dict:
+        # Every client sends through the process-wide scheduler.
+        return recorder.record(
+            github_api.DEFAULT_SCHEDULER.telemetry(),
+            mode=mode,
+            jobs_calls_saved=sum(a.jobs_calls_saved for a in apis),
+            http_cache=cache.stats() if cache is not None else None,
         )
 
-    print(f"Loading docker image history from {args.data_dir}")
-    docker_images = load_docker_image_history(args.data_dir)
+    # The export cannot time itself: meta.perf covers the scrape up to
+    # here, and the history line written afterwards adds the shards and
+    # the export. Only condensed totals are published; the per-span and
+    # per-endpoint detail stays in scraper_metrics-<year>.jsonl.
+    perf_since = datetime.now(timezone.utc) - timedelta(days=PERF_HISTORY_DAYS)
+    meta = {
+        "perf": {
+            "latest": perf_metrics.condense(perf_record()),
+            "history": perf_metrics.history(args.data_dir, since=perf_since),
+        }
+    }
+
+    indent = None if args.compact else 4
+    if args.shard_dir is not None:
+        with recorder.span("shards"):
+            index = write_dashboard_shards(
+                args.shard_dir,
+                health_check,
+                docker_build_and_push,
+                docker_images,
+                repo_ci_runs,
+                indent,
+                rollup_data,
+                meta,
+            )
+        print(
+            f"Wrote {len(index['archives'])} archive shards + recent "
+            f"({index['recent']['bytes']} B) to {args.shard_dir}/"
+        )
 
     json_data = export_to_json(
-        health_check, docker_build_and_push, docker_images, repo_ci_runs
+        health_check,
+        docker_build_and_push,
+        docker_images,
+        repo_ci_runs,
+        rollup_data=rollup_data,
+        meta=meta,
+    )
+    with recorder.span("export"):
+        export_stats = json_export.write_json(
+            args.output, json_data, indent, trace_memory=args.trace_memory
+        )
+    peak = export_stats.get("peak_bytes")
+    print(
+        f"Wrote {args.output} in {export_stats['seconds']}s"
+        + (f" (peak {peak / 2**20:.1f} MiB)" if peak is not None else "")
+        + ": "
+        + ", ".join(f"{k} {v} B" for k, v in export_stats["bytes"].items())
+    )
+    if cache is not None:
+        print(f"HTTP cache: {cache.stats()}")
+    perf = perf_record()
+    print(
+        "Jobs-API calls saved on already-stored runs: "
+        f"{perf['jobs_calls_saved']}"
+    )
+    for endpoint, stats in perf["http"]["endpoints"].items():
+        print(f"API budget: {endpoint}: {stats}")
+    print(
+        f"Scrape took {perf['seconds']:.1f}s: "
+        + ", ".join(f"{k} {v:.1f}s" for k, v in perf["stages"].items())
     )
-    with open("github_action_data.json", "w") as f:
-        json.dump(json_data, f, indent=4)
-    print("Wrote github_action_data.json")
+    path = perf_metrics.append_history(args.data_dir, perf)
+    print(f"Appended scraper metrics to {path}")
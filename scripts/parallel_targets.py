@@ -0,0 +1,95 @@
+"""Run independent scrape targets on a thread pool with buffered logs.
+
+Each target is a zero-argument callable run on its own worker thread. While
+it runs, whatever it prints is captured in a per-target buffer: sys.stdout
+is swapped for a proxy that writes to the buffer held in a context
+variable. The buffer is emitted as one block when the target finishes, so
+the logs of concurrent targets never interleave.
+
+An exception fails only its own target. It is logged with its traceback in
+that target's block, and the other targets' results are returned as usual.
+
+Helper threads a target starts itself (e.g. the jobs-API worker pool) land
+in the same buffer when their tasks run in a copy of the target's context,
+as github_api's pools do; anything else goes straight to stdout.
+"""
+
+import io
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+_buffer: ContextVar[Optional[io.StringIO]] = ContextVar(
+    "target_stdout", default=None
+)
+
+
+@dataclass
+class TargetResult:
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+
+
+class _BufferedStdout:
+    def __init__(self, real):
+        self.real = real
+
+    def write(self, text: str) -> int:
+        buffer = _buffer.get()
+        return (buffer if buffer is not None else self.real).write(text)
+
+    def flush(self) -> None:
+        if _buffer.get() is None:
+            self.real.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+def _run_one(name: str, fn: Callable[[], Any]) -> tuple[TargetResult, str]:
+    buffer = io.StringIO()
+    token = _buffer.set(buffer)
+    result = TargetResult(name)
+    started = time.monotonic()
+    try:
+        result.value = fn()
+    except Exception as e:
+        result.error = e
+        traceback.print_exc(file=buffer)
+    finally:
+        _buffer.reset(token)
+        result.seconds = time.monotonic() - started
+    return result, buffer.getvalue()
+
+
+def run_targets(
+    targets: dict[str, Callable[[], Any]], jobs: int
+) -> dict[str, TargetResult]:
+    """Run every target with up to `jobs` at a time; return results by name."""
+    real = sys.stdout
+    sys.stdout = _BufferedStdout(real)
+    results: dict[str, TargetResult] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = [
+                executor.submit(_run_one, name, fn)
+                for name, fn in targets.items()
+            ]
+            for future in as_completed(futures):
+                result, log = future.result()
+                status = "FAILED" if result.error else "done"
+                real.write(
+                    f"===== {result.name}: {status} in "
+                    f"{result.seconds:.1f}s =====\n{log}"
+                )
+                real.flush()
+                results[result.name] = result
+    finally:
+        sys.stdout = real
+    return results
@@ -0,0 +1,177 @@
+"""Stage timings and HTTP figures of one scrape, kept as a history.
+
+A Recorder collects spans: the wall time of a stage ("list", "jobs",
+"store", "load", "export", ...), labelled with the target it ran for and
+with counts the stage reports (pages, runs, ...). Spans with the same
+stage and target are summed. The target comes from the enclosing
+`target(...)` block, so code deep in github_api needs no extra argument;
+it is a context variable, which asyncio tasks and scrape threads each see
+their own value of. Spans are only opened on the thread that owns the
+target, not in its worker pools.
+
+HTTP figures (requests, bytes, time on the wire, retries, rate-limit
+waits and events) are not counted twice: `record` folds in the telemetry
+of the RequestScheduler every request went through.
+
+Each scrape appends its record to scraper_metrics-<year>.jsonl in the data
+directory; `history` reads them back condensed, for the dashboard's
+meta.perf. Only condensed entries are published.
+
+With --async or --jobs targets overlap, so stage totals can add up to more
+than the scrape's wall time.
+"""
+
+import json
+import pathlib
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from jsonl_reader import read_jsonl
+
+METRICS_BASE = "scraper_metrics"
+
+_target: ContextVar[Optional[str]] = ContextVar("perf_target", default=None)
+
+
+@contextmanager
+def target(name: str) -> Iterator[None]:
+    """Label the spans opened inside this block with `name`."""
+    token = _target.set(name)
+    try:
+        yield
+    finally:
+        _target.reset(token)
+
+
+class Recorder:
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans: dict[tuple[str, Optional[str]], dict] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[dict]:
+        """Time the block; counts set on the yielded dict are summed too."""
+        counts: dict[str, int] = {}
+        started = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            seconds = time.perf_counter() - started
+            self._add(stage, _target.get(), seconds, counts)
+
+    def _add(
+        self, stage: str, name: Optional[str], seconds: float, counts: dict
+    ) -> None:
+        with self._lock:
+            entry = self._spans.setdefault(
+                (stage, name),
+                {"stage": stage, "target": name, "count": 0, "seconds": 0.0},
+            )
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            for key, value in counts.items():
+                entry[key] = entry.get(key, 0) + value
+
+    def spans(self) -> list[dict]:
+        with self._lock:
+            spans = [dict(entry) for entry in self._spans.values()]
+        for entry in spans:
+            entry["seconds"] = round(entry["seconds"], 3)
+        return spans
+
+    def record(self, telemetry: dict, **extra) -> dict:
+        """The scrape so far, as one JSON-ready history record.
+
+        `telemetry` is RequestScheduler.telemetry(); `extra` is stored as is.
+        """
+        spans = self.spans()
+        stages: dict[str, float] = {}
+        for entry in spans:
+            stage = entry["stage"]
+            stages[stage] = stages.get(stage, 0.0) + entry["seconds"]
+        return {
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "stages": {stage: round(s, 3) for stage, s in stages.items()},
+            "spans": spans,
+            "http": http_summary(telemetry),
+            **extra,
+        }
+
+
+# Stages of every client and script in the process, like DEFAULT_SCHEDULER.
+DEFAULT_RECORDER = Recorder()
+
+_HTTP_TOTALS = (
+    "requests",
+    "bytes",
+    "seconds",
+    "retries",
+    "not_modified",
+    "errors",
+    "throttled_seconds",
+)
+
+
+def http_summary(telemetry: dict) -> dict:
+    """Totals and per-endpoint figures from RequestScheduler.telemetry()."""
+    endpoints = telemetry["endpoints"]
+    totals = {
+        key: sum(stats[key] for stats in endpoints.values())
+        for key in _HTTP_TOTALS
+    }
+    for key in ("seconds", "throttled_seconds"):
+        totals[key] = round(totals[key], 3)
+    return {
+        **totals,
+        "endpoints": endpoints,
+        "rate_limit": {
+            name: bucket["remaining"]
+            for name, bucket in telemetry["buckets"].items()
+        },
+        "events": telemetry["events"],
+    }
+
+
+def append_history(data_dir: pathlib.Path, record: dict) -> pathlib.Path:
+    """Append `record` to scraper_metrics-<year>.jsonl under data_dir."""
+    year = datetime.fromisoformat(record["started_at"]).year
+    path = pathlib.Path(data_dir) / f"{METRICS_BASE}-{year}.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        f.write(json.dumps(record) + "\n")
+    return path
+
+
+def condense(record: dict) -> dict:
+    """The stage totals and HTTP totals of a record, for charting.
+
+    The per-span and per-endpoint detail stays in the JSONL.
+    """
+    return {
+        "started_at": record["started_at"],
+        "seconds": record["seconds"],
+        "stages": record["stages"],
+        "http": {
+            key: record["http"][key]
+            for key in _HTTP_TOTALS
+            if key in record["http"]
+        },
+    }
+
+
+def history(
+    data_dir: pathlib.Path, since: Optional[datetime] = None
+) -> list[dict]:
+    """Stored records (started at or after since), each condensed."""
+    paths = pathlib.Path(data_dir).glob(f"{METRICS_BASE}-*.jsonl")
+    return [
+        condense(record.data)
+        for record in read_jsonl(paths, "started_at", since=since)
+    ]
@@ -0,0 +1,132 @@
+"""Order and batch image pulls so they fit a disk budget.
+
+docker_image_size used to pull the tags of one distro at a time, then
+remove everything with `docker system prune -a` before the next distro,
+whether the disk was short or not. The tags share most of their layers,
+and pruning threw away layers the next tags needed again.
+
+`schedule_pulls` plans pulls from each tag's manifest layers instead:
+
+- Tags are ordered so each one reuses as many bytes as possible of the
+  layers pulled before it (core, then universe, then cuda of one distro).
+- A wave is the next few tags in that order (up to max_parallel), pulled
+  at once, whose layers not yet on disk fit the space left. Layers shared
+  within a wave are downloaded once by the daemon.
+- Free space is read again before each wave, so estimates don't drift.
+- Only when the next tag does not fit, but would once the tags pulled so
+  far are removed, is a prune of those scheduled. Otherwise (pruning not
+  allowed, or not enough) the tag is pulled anyway, alone, keeping the
+  layers it reuses.
+
+A layer's disk footprint is its uncompressed size when the layer cache
+knows it, else its compressed size times DISK_EXPANSION.
+"""
+
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from image_layers import LayerCache
+
+# Unpacked / compressed size of a layer not measured yet. The Autoware
+# layers unpack to 2-3x their gzip size; the estimate errs on the high side.
+DISK_EXPANSION = 3.0
+
+
+class Wave(NamedTuple):
+    prune: list[str]  # tags to remove first
+    pull: list[str]  # tags to pull (and measure) together
+
+
+def layer_footprints(
+    layers_by_tag: dict[str, list[dict]], cache: Optional[LayerCache]
+) -> dict[str, int]:
+    """digest -> estimated bytes on disk once pulled."""
+    footprints = {}
+    for layers in layers_by_tag.values():
+        for layer in layers:
+            known = cache.layers.get(layer["digest"]) if cache else None
+            if known is not None:
+                footprints[layer["digest"]] = known["uncompressed_size"]
+            else:
+                size = layer.get("size", 0)
+                footprints[layer["digest"]] = int(size * DISK_EXPANSION)
+    return footprints
+
+
+def order_for_reuse(
+    layers_by_tag: dict[str, list[dict]], footprints: dict[str, int]
+) -> list[str]:
+    """Tags, each next one reusing the most bytes of those before it.
+
+    Ties go to the tag adding the fewest new bytes, then to input order.
+    """
+    digests = {
+        tag: {layer["digest"] for layer in layers}
+        for tag, layers in layers_by_tag.items()
+    }
+    seen: set[str] = set()
+    order = []
+    remaining = list(layers_by_tag)
+    while remaining:
+
+        def key(tag: str) -> tuple[int, int]:
+            reused = sum(footprints[d] for d in digests[tag] & seen)
+            new = sum(footprints[d] for d in digests[tag] - seen)
+            return -reused, new
+
+        tag = min(remaining, key=key)
+        remaining.remove(tag)
+        order.append(tag)
+        seen |= digests[tag]
+    return order
+
+
+def schedule_pulls(
+    layers_by_tag: dict[str, list[dict]],
+    footprints: dict[str, int],
+    free_bytes: Callable[[], int],
+    max_parallel: int,
+    can_prune: bool,
+    budget: Optional[int] = None,
+) -> Iterator[Wave]:
+    """Yield waves of pulls; each is carried out before the next is asked.
+
+    free_bytes() is the space pulls may still use (free space less any
+    reserve). budget, if set, also caps the total of what is on disk.
+    """
+    pending = order_for_reuse(layers_by_tag, footprints)
+    digests = {
+        tag: {layer["digest"] for layer in layers}
+        for tag, layers in layers_by_tag.items()
+    }
+    resident: set[str] = set()
+    pulled: list[str] = []
+    while pending:
+        available = free_bytes()
+        if budget is not None:
+            on_disk = sum(footprints[d] for d in resident)
+            available = min(available, budget - on_disk)
+        wave: list[str] = []
+        new: set[str] = set()
+        for tag in pending[:max_parallel]:
+            grown = new | (digests[tag] - resident)
+            if sum(footprints[d] for d in grown) > available:
+                break
+            wave.append(tag)
+            new = grown
+        if not wave:
+            tag = pending[0]
+            freed = sum(footprints[d] for d in resident)
+            whole = sum(footprints[d] for d in digests[tag])
+            if can_prune and pulled and whole <= available + freed:
+                yield Wave(prune=pulled, pull=[])
+                resident, pulled = set(), []
+                continue
+            print(
+                f"Warning: {tag} may not fit in the disk budget "
+                f"({available / 1e9:.1f} GB left); pulling it alone"
+            )
+            wave, new = [tag], digests[tag] - resident
+        pending = pending[len(wave) :]
+        resident |= new
+        pulled += wave
+        yield Wave(prune=[], pull=wave)
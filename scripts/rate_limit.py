@@ -0,0 +1,294 @@
+"""Rate-limit-aware request scheduler shared by the GitHub API clients.
+
+Every request from github_api goes through one RequestScheduler:
+
+- A token bucket per rate-limit resource ("core", "search", ...) is fed by
+  the X-RateLimit-* headers of each response. When the bucket is empty the
+  scheduler sleeps until X-RateLimit-Reset instead of sending a request
+  that would be rejected.
+- Secondary rate limits (403/429, usually with Retry-After) honour the
+  server's delay and widen a global spacing between requests. The spacing
+  shrinks again as requests succeed.
+- Transient 5xx answers and connection errors are retried with
+  full-jitter exponential backoff.
+
+Per-endpoint telemetry (request count, bytes received, time on the wire,
+retries, time spent throttled, the last reported budget) and a log of the
+most recent retry / rate-limit events are available from `telemetry()`.
+"""
+
+import email.utils
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+import requests
+
+RETRY_STATUSES = {500, 502, 503, 504}
+DEFAULT_MAX_RETRIES = 5
+# GitHub asks clients to wait at least a minute after a secondary limit
+# that does not say how long to wait.
+SECONDARY_LIMIT_WAIT = 60.0
+# Retry / rate-limit events kept for telemetry(); older ones are dropped.
+MAX_EVENTS = 200
+
+# Numeric path segments (run ids, job ids) are folded so telemetry groups
+# by endpoint rather than by individual resource.
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_key(url: str) -> str:
+    return _ID_SEGMENT.sub("/:id", urlparse(url).path)
+
+
+class TokenBucket:
+    """Request budget for one rate-limit resource, as last reported."""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.tokens: Optional[float] = None
+        self.reset_at = 0.0
+
+    def update(self, headers) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        self.tokens = float(remaining)
+        self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 0))
+        self.reset_at = float(headers.get("X-RateLimit-Reset", self.reset_at))
+
+    def take(self, now: float) -> float:
+        """Consume one token; return how long to wait before sending."""
+        if self.tokens is None:
+            return 0.0
+        if self.tokens < 1:
+            if now >= self.reset_at:
+                # Window rolled over; the next response reports the real
+                # figure, until then assume the full limit is back.
+                self.tokens = float(self.limit or 1)
+            else:
+                return self.reset_at - now
+        self.tokens -= 1
+        return 0.0
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = defaultdict(TokenBucket)
+        # Spacing between requests, widened on secondary limits.
+        self._min_interval = 0.0
+        self._next_slot = 0.0
+        self._telemetry: dict[str, dict] = defaultdict(
+            lambda: {
+                "requests": 0,
+                "bytes": 0,
+                "seconds": 0.0,
+                "retries": 0,
+                "not_modified": 0,
+                "errors": 0,
+                "throttled_seconds": 0.0,
+                "rate_limit_remaining": None,
+                "rate_limit_resource": None,
+            }
+        )
+        self._events: deque = deque(maxlen=MAX_EVENTS)
+
+    def _event(self, where: str, wait: float, **details) -> None:
+        """Log a retry / rate-limit event; `where` is an endpoint or bucket."""
+        with self._lock:
+            self._events.append(
+                {
+                    "at": datetime.now(timezone.utc).isoformat(),
+                    "where": where,
+                    "wait": round(wait, 3),
+                    **details,
+                }
+            )
+
+    def _acquire(self, resource: str) -> float:
+        """Block until a request may be sent; return the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.time()
+                budget_wait = self._buckets[resource].take(now)
+                delay = max(budget_wait, self._next_slot - now)
+                if delay <= 0:
+                    self._next_slot = now + self._min_interval
+                    return waited
+            if budget_wait > 0 and not waited:
+                self._event(resource, budget_wait, kind="rate_limit_wait")
+            if delay > 5:
+                print(f"Rate limit: waiting {delay:.0f}s ({resource})")
+            self.sleep(delay)
+            waited += delay
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt)
+        )
+
+    @staticmethod
+    def _secondary_limit_wait(response: requests.Response) -> Optional[float]:
+        """Seconds to wait if `response` is a rate-limit rejection."""
+        if response.status_code not in (403, 429):
+            return None
+        retry_after = response.headers.get("Retry-After")
+        wait = _retry_after_seconds(retry_after) if retry_after else None
+        if wait is not None:
+            return wait
+        # An unreadable Retry-After still marks a rate limit: fall back to
+        # the reset time, or GitHub's minimum wait.
+        reset_at = response.headers.get("X-RateLimit-Reset")
+        exhausted = response.headers.get("X-RateLimit-Remaining") == "0"
+        if exhausted or (retry_after and reset_at):
+            return max(float(reset_at or 0) - time.time(), 1.0)
+        if retry_after or "rate limit" in response.text.lower():
+            return SECONDARY_LIMIT_WAIT
+        # A plain 403 (permissions, missing resource) is not retryable.
+        return None
+
+    def request(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        resource: str = "core",
+        **kwargs,
+    ) -> requests.Response:
+        """Send a request through the shared budget, retrying if transient."""
+        with self._lock:
+            stats = self._telemetry[endpoint_key(url)]
+        attempt = 0
+        while True:
+            throttled = self._acquire(resource)
+            with self._lock:
+                stats["requests"] += 1
+                stats["throttled_seconds"] += throttled
+            sent = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        stats["errors"] += 1
+                    raise
+                wait = self._backoff(attempt)
+                event: dict = {"kind": "retry", "error": type(e).__name__}
+            else:
+                received = _received_bytes(response, bool(kwargs.get("stream")))
+                with self._lock:
+                    stats["bytes"] += received
+                    stats["seconds"] += time.perf_counter() - sent
+                    bucket_name = response.headers.get(
+                        "X-RateLimit-Resource", resource
+                    )
+                    self._buckets[bucket_name].update(response.headers)
+                    stats["rate_limit_resource"] = bucket_name
+                    remaining = response.headers.get("X-RateLimit-Remaining")
+                    if remaining is not None:
+                        stats["rate_limit_remaining"] = int(remaining)
+                    if response.status_code == 304:
+                        stats["not_modified"] += 1
+
+                limit_wait = self._secondary_limit_wait(response)
+                if limit_wait is not None:
+                    with self._lock:
+                        self._min_interval = min(
+                            max(self._min_interval * 2, 1.0), self.backoff_max
+                        )
+                    wait = limit_wait
+                    kind = "secondary_limit"
+                elif response.status_code in RETRY_STATUSES:
+                    wait = self._backoff(attempt)
+                    kind = "retry"
+                else:
+                    with self._lock:
+                        # Relax the spacing again while requests go through.
+                        self._min_interval *= 0.9
+                        if self._min_interval < 0.05:
+                            self._min_interval = 0.0
+                    return response
+
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        stats["errors"] += 1
+                    return response
+                # Hand a discarded streamed body's connection back.
+                response.close()
+                event = {"kind": kind, "status": response.status_code}
+
+            attempt += 1
+            self._event(endpoint_key(url), wait, attempt=attempt, **event)
+            with self._lock:
+                stats["retries"] += 1
+                stats["throttled_seconds"] += wait
+            print(f"Retrying {url} in {wait:.1f}s (attempt {attempt})")
+            self.sleep(wait)
+
+    def get(
+        self, session: requests.Session, url: str, **kwargs
+    ) -> requests.Response:
+        return self.request(session, "GET", url, **kwargs)
+
+    def telemetry(self) -> dict:
+        with self._lock:
+            return {
+                "endpoints": {k: dict(v) for k, v in self._telemetry.items()},
+                "buckets": {
+                    name: {
+                        "limit": bucket.limit,
+                        "remaining": bucket.tokens,
+                        "reset_at": bucket.reset_at,
+                    }
+                    for name, bucket in self._buckets.items()
+                },
+                "min_interval": self._min_interval,
+                "events": list(self._events),
+            }
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    """Retry-After in seconds, given as seconds or an HTTP-date.
+
+    None if the value is neither.
+    """
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:  # "-0000": UTC, source unknown
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _received_bytes(response: requests.Response, stream: bool) -> int:
+    """Body bytes of `response` as sent (compressed), where known.
+
+    A streamed body without Content-Length is not counted: reading it here
+    would defeat the streaming.
+    """
+    length = response.headers.get("Content-Length")
+    if length is not None and length.isdigit():
+        return int(length)
+    return 0 if stream else len(response.content)
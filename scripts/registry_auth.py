@@ -0,0 +1,110 @@
+"""Bearer tokens for the container registry, cached per scope.
+
+GHCR, like any Docker-distribution registry, wants a short-lived bearer
+token from its /token endpoint on every manifest and blob request. A
+TokenProvider fetches one per scope the first time it is needed, keeps it
+until shortly before its `expires_in` runs out, and is shared by every
+registry call of a script (and by the threads of a concurrent one):
+
+    auth = TokenProvider(registry_url, github_token, scope)
+    response = auth.request(session, "GET", url)
+
+`request` sends the token, and on a 401 (the token expired or was revoked
+early) drops it, fetches a fresh one and retries once. Tokens are kept in
+memory only; they are never logged or written to disk.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import requests
+
+# The Docker token spec's lifetime for a token that does not state one.
+DEFAULT_EXPIRES_IN = 60
+# A cached token is replaced once it has less than this left.
+TOKEN_REFRESH_MARGIN = 10
+
+
+class TokenProvider:
+    def __init__(
+        self,
+        registry_url: str,
+        github_token: str = "",
+        scope: str = "",
+        service: str = "ghcr.io",
+    ):
+        self.registry_url = registry_url
+        self.github_token = github_token
+        self.scope = scope
+        self.service = service
+        self.fetches = 0
+        self._lock = threading.Lock()
+        # scope -> (token, monotonic time it stops being used)
+        self._tokens: dict[str, tuple[str, float]] = {}
+
+    def _fetch(self, scope: str) -> tuple[str, float]:
+        headers = {"Accept": "application/json"}
+        if self.github_token:
+            print(f"Exchanging GitHub token for a registry token ({scope})")
+            headers["Authorization"] = f"Bearer {self.github_token}"
+        else:
+            print(f"Requesting anonymous registry token ({scope})")
+        requested = time.monotonic()
+        response = requests.get(
+            f"{self.registry_url}/token",
+            params={"service": self.service, "scope": scope},
+            headers=headers,
+            timeout=30,
+        )
+        response.raise_for_status()
+        data = response.json()
+        self.fetches += 1
+        token = data.get("token") or data.get("access_token", "")
+        expires_in = data.get("expires_in") or DEFAULT_EXPIRES_IN
+        return token, requested + expires_in - TOKEN_REFRESH_MARGIN
+
+    def token(self, scope: Optional[str] = None) -> str:
+        """A token for scope (the provider's own by default), cached."""
+        scope = scope or self.scope
+        # Held across the fetch so concurrent callers share one request.
+        with self._lock:
+            cached = self._tokens.get(scope)
+            if cached is None or time.monotonic() >= cached[1]:
+                cached = self._tokens[scope] = self._fetch(scope)
+            return cached[0]
+
+    def invalidate(self, token: str, scope: Optional[str] = None) -> None:
+        """Forget token, unless another caller has already replaced it."""
+        scope = scope or self.scope
+        with self._lock:
+            if self._tokens.get(scope, ("",))[0] == token:
+                del self._tokens[scope]
+
+    def request(
+        self,
+        session,
+        method: str,
+        url: str,
+        scope: Optional[str] = None,
+        headers: Optional[dict] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """session.request(...) with a bearer token; refreshed once on 401.
+
+        `session` is a requests.Session, or the requests module itself.
+        """
+        for retry in (False, True):
+            token = self.token(scope)
+            response = session.request(
+                method,
+                url,
+                headers={**(headers or {}), "Authorization": f"Bearer {token}"},
+                **kwargs,
+            )
+            if response.status_code != 401 or retry:
+                return response
+            response.close()
+            print(f"Registry token rejected for {url}; refreshing")
+            self.invalidate(token, scope)
+        return response
@@ -0,0 +1,123 @@
+"""Vectorized daily / weekly rollups of run durations.
+
+Runs are turned into columnar NumPy arrays (created_at as epoch seconds,
+duration in seconds, success flag) once; every statistic is then computed
+per bucket without a Python-level loop over runs:
+
+- sort by (bucket, duration) with one lexsort,
+- find bucket boundaries with a single comparison of neighbours,
+- read percentiles straight out of the sorted durations by index
+  (linear interpolation, the same as np.percentile's default),
+- sum success flags per bucket with np.add.reduceat.
+
+The result for one series is columnar as well: parallel lists of bucket
+start date, count, p50, p90, max (seconds) and success rate.
+"""
+
+from typing import Callable, Iterable
+
+import numpy as np
+
+from run_records import WorkflowRun
+
+SECONDS_PER_DAY = 86400
+PERIODS = ("daily", "weekly")
+PERCENTILES = {"p50": 0.5, "p90": 0.9}
+
+# (created_at epoch seconds, duration seconds, succeeded)
+Columns = tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _succeeded(run: WorkflowRun) -> bool:
+    # Runs without a stored conclusion predate it and were success-only.
+    return (run.conclusion or "success") == "success"
+
+
+def run_columns(runs: list[WorkflowRun]) -> Columns:
+    n = len(runs)
+    times = np.fromiter(
+        (r.created_at.timestamp() for r in runs), dtype=np.float64, count=n
+    ).astype(np.int64)
+    durations = np.fromiter(
+        (r.duration for r in runs), dtype=np.float64, count=n
+    )
+    success = np.fromiter((_succeeded(r) for r in runs), dtype=bool, count=n)
+    return times, durations, success
+
+
+def job_columns(
+    runs: Iterable[WorkflowRun],
+    jobs_of: Callable[[WorkflowRun], dict[str, float]],
+) -> dict[str, Columns]:
+    """One column set per job name, from `jobs_of(run)` -> {job: seconds}."""
+    rows: dict[str, tuple[list, list, list]] = {}
+    for run in runs:
+        created = run.created_at.timestamp()
+        ok = _succeeded(run)
+        for job, seconds in jobs_of(run).items():
+            times, durations, success = rows.setdefault(job, ([], [], []))
+            times.append(created)
+            durations.append(seconds)
+            success.append(ok)
+    return {
+        job: (
+            np.asarray(times, dtype=np.float64).astype(np.int64),
+            np.asarray(durations, dtype=np.float64),
+            np.asarray(success, dtype=bool),
+        )
+        for job, (times, durations, success) in rows.items()
+    }
+
+
+def _bucket_days(times: np.ndarray, period: str) -> np.ndarray:
+    """Bucket start, in days since the epoch (UTC)."""
+    days = times // SECONDS_PER_DAY
+    if period == "daily":
+        return days
+    # 1970-01-01 was a Thursday; shift so weeks start on Monday.
+    return (days + 3) // 7 * 7 - 3
+
+
+def summarize(columns: Columns, period: str) -> dict[str, list]:
+    times, durations, success = columns
+    out: dict[str, list] = {
+        "date": [],
+        "count": [],
+        **{name: [] for name in PERCENTILES},
+        "max": [],
+        "success_rate": [],
+    }
+    if not len(times):
+        return out
+
+    buckets = _bucket_days(times, period)
+    order = np.lexsort((durations, buckets))
+    buckets = buckets[order]
+    durations = durations[order]
+    success = success[order]
+
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    counts = np.diff(np.r_[starts, len(buckets)])
+
+    out["date"] = np.datetime_as_string(
+        buckets[starts].astype("datetime64[D]")
+    ).tolist()
+    out["count"] = counts.tolist()
+    for name, q in PERCENTILES.items():
+        pos = starts + q * (counts - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        value = durations[lo] + (durations[hi] - durations[lo]) * (pos - lo)
+        out[name] = np.round(value, 1).tolist()
+    out["max"] = np.round(durations[starts + counts - 1], 1).tolist()
+    rate = np.add.reduceat(success.astype(np.int64), starts) / counts
+    out["success_rate"] = np.round(rate, 3).tolist()
+    return out
+
+
+def compute_rollups(series: dict[str, Columns]) -> dict:
+    """{"daily": {name: columns}, "weekly": {...}} for every series."""
+    return {
+        period: {name: summarize(cols, period) for name, cols in series.items()}
+        for period in PERIODS
+    }
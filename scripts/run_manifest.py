@@ -0,0 +1,336 @@
+"""Sidecar cursor manifest for the yearly workflow-run JSONL files.
+
+An incremental scrape only needs the newest stored created_at (the cursor)
+and the ids of runs close to it (to dedup the re-fetched overlap). Deriving
+both from the JSONL means parsing every line of history. Instead, each
+`<base>-<year>.jsonl` family keeps a small `<base>.manifest.json` next to
+it with:
+
+- max_created_at and run_count,
+- recent_ids: id -> created_at for runs within `window` of the cursor,
+- offsets: id -> (file, byte offset, line length) for the same runs, so a
+  re-scraped run can be rewritten in place,
+- files: size and sha256 of every yearly file it was built from, plus its
+  garbage: bytes of tombstoned lines and padding that compaction drops.
+
+An upserted run is overwritten in place when its new line fits in the old
+one (padded with spaces). Otherwise the old line is blanked to spaces,
+which readers skip, and the new one is appended. A removed run's line is
+blanked the same way.
+
+The append and upsert functions update the manifest after writing. If a
+yearly file no longer matches its recorded size/checksum (hand edits, a
+rebase on the data branch, ...), the manifest is rebuilt from the JSONL on
+the next load.
+
+The line helpers below (locate_lines, replace_line, compact_file) are
+shared with item_history, which stores pull requests and container
+versions the same way.
+"""
+
+import json
+import os
+import pathlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator, Optional
+
+from jsonl_reader import read_jsonl
+from run_records import WorkflowRun
+from sidecar import (
+    file_fingerprint,
+    files_current,
+    read_sidecar,
+    write_sidecar,
+    yearly_files,
+)
+
+MANIFEST_VERSION = 2
+
+# (file name, byte offset, line length without the newline)
+Location = tuple[str, int, int]
+
+
+@dataclass
+class CursorManifest:
+    max_created_at: Optional[datetime] = None
+    run_count: int = 0
+    recent_ids: dict[int, datetime] = field(default_factory=dict)
+    offsets: dict[int, Location] = field(default_factory=dict)
+    files: dict[str, dict] = field(default_factory=dict)
+    # Width of recent_ids behind the cursor; not persisted.
+    window: timedelta = timedelta(0)
+
+    def seen(self, run: WorkflowRun) -> bool:
+        """Whether `run` is already stored.
+
+        Runs older than the recent-id window are treated as stored: the
+        cursor has long passed them, and their ids are no longer kept.
+        """
+        if run.id in self.recent_ids:
+            return True
+        return (
+            self.max_created_at is not None
+            and run.created_at < self.max_created_at - self.window
+        )
+
+    def add(
+        self,
+        run_id: int,
+        created_at: datetime,
+        location: Optional[Location] = None,
+    ) -> None:
+        self.run_count += 1
+        self.recent_ids[run_id] = created_at
+        if location is not None:
+            self.offsets[run_id] = location
+        if self.max_created_at is None or created_at > self.max_created_at:
+            self.max_created_at = created_at
+
+    def remove(self, run_id: int) -> None:
+        """Forget a stored run that was removed.
+
+        max_created_at is left as it is: the cursor only moves forward.
+        """
+        self.run_count -= 1
+        self.recent_ids.pop(run_id, None)
+        self.offsets.pop(run_id, None)
+
+    def trim(self) -> None:
+        """Drop recent ids older than `window` before the cursor."""
+        if self.max_created_at is None:
+            return
+        floor = self.max_created_at - self.window
+        self.recent_ids = {
+            run_id: created_at
+            for run_id, created_at in self.recent_ids.items()
+            if created_at >= floor
+        }
+        self.offsets = {
+            run_id: location
+            for run_id, location in self.offsets.items()
+            if run_id in self.recent_ids
+        }
+
+
+def manifest_path(directory: pathlib.Path, base: str) -> pathlib.Path:
+    return directory / f"{base}.manifest.json"
+
+
+def scan_lines(path: pathlib.Path) -> Iterator[tuple[int, bytes, int]]:
+    """(offset, JSON text, line length) of every line; blank ones included."""
+    offset = 0
+    with path.open("rb") as f:
+        for line in f:
+            length = len(line.rstrip(b"\n"))
+            yield offset, line.rstrip(), length
+            offset += len(line)
+
+
+def locate_lines(
+    path: pathlib.Path, key: str, values: Iterable[Any]
+) -> dict[Any, Location]:
+    """Locations of the lines whose `key` field is one of `values`.
+
+    One pass over the file; only lines containing a value are decoded.
+    """
+    wanted = set(values)
+    found: dict[Any, Location] = {}
+    if not wanted or not path.exists():
+        return found
+    prefix = f'"{key}": '.encode()
+    for offset, text, length in scan_lines(path):
+        i = text.find(prefix)
+        if i < 0:
+            continue
+        end = text.find(b",", i)
+        try:
+            value = json.loads(text[i + len(prefix) : end])
+        except ValueError:
+            value = json.loads(text)[key]
+        if value in wanted:
+            found[value] = (path.name, offset, length)
+    return found
+
+
+def replace_line(
+    path: pathlib.Path, location: Location, line: Optional[bytes]
+) -> tuple[Optional[Location], int]:
+    """Overwrite the line at `location` with `line`; blank it if None.
+
+    Return where the line is now and the bytes of garbage this added.
+    """
+    name, offset, length = location
+    with path.open("r+b") as f:
+        f.seek(offset)
+        padding = length - len(f.read(length).rstrip())
+        f.seek(offset)
+        if line is not None and len(line) <= length:
+            f.write(line.ljust(length))
+            return location, length - len(line) - padding
+        # Tombstone: readers skip all-blank lines.
+        f.write(b" " * length)
+        if line is None:
+            return None, length + 1 - padding
+        end = f.seek(0, os.SEEK_END)
+        f.write(line + b"\n")
+        return (name, end, len(line)), length + 1 - padding
+
+
+def compact_file(path: pathlib.Path) -> None:
+    """Drop tombstones and padding, and put the lines back in time order."""
+    before = path.stat().st_size
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        for record in read_jsonl([path], "created_at"):
+            f.write(record.raw.rstrip() + b"\n")
+    os.replace(tmp, path)
+    print(f"    compacted {path}: {before} -> {path.stat().st_size} bytes")
+
+
+def _read(path: pathlib.Path, window: timedelta) -> Optional[CursorManifest]:
+    data = read_sidecar(path, MANIFEST_VERSION)
+    if data is None:
+        return None
+    max_created_at = data.get("max_created_at")
+    return CursorManifest(
+        max_created_at=(
+            datetime.fromisoformat(max_created_at) if max_created_at else None
+        ),
+        run_count=data["run_count"],
+        recent_ids={
+            int(run_id): datetime.fromisoformat(created_at)
+            for run_id, created_at in data["recent_ids"].items()
+        },
+        offsets={
+            int(run_id): tuple(location)
+            for run_id, location in data["offsets"].items()
+        },
+        files=data["files"],
+        window=window,
+    )
+
+
+def write_manifest(
+    directory: pathlib.Path, base: str, manifest: CursorManifest
+) -> None:
+    data = {
+        "version": MANIFEST_VERSION,
+        "max_created_at": (
+            manifest.max_created_at.isoformat()
+            if manifest.max_created_at
+            else None
+        ),
+        "run_count": manifest.run_count,
+        "recent_ids": {
+            str(run_id): created_at.isoformat()
+            for run_id, created_at in sorted(manifest.recent_ids.items())
+        },
+        "offsets": {
+            str(run_id): list(location)
+            for run_id, location in sorted(manifest.offsets.items())
+        },
+        "files": manifest.files,
+    }
+    write_sidecar(manifest_path(directory, base), data)
+
+
+def rebuild_manifest(
+    directory: pathlib.Path, base: str, window: timedelta
+) -> CursorManifest:
+    """Scan every yearly file once and write a fresh manifest."""
+    manifest = CursorManifest(window=window)
+    for path in yearly_files(directory, base):
+        garbage = 0
+        for offset, text, length in scan_lines(path):
+            if not text:
+                garbage += length + 1
+                continue
+            garbage += length - len(text)
+            entry = json.loads(text)
+            manifest.add(
+                entry["run_id"],
+                datetime.fromisoformat(entry["created_at"]),
+                (path.name, offset, length),
+            )
+        manifest.files[path.name] = {
+            **file_fingerprint(path),
+            "garbage": garbage,
+        }
+    manifest.trim()
+    if manifest.files:
+        write_manifest(directory, base, manifest)
+    return manifest
+
+
+def load_manifest(
+    directory: pathlib.Path, base: str, window: timedelta
+) -> CursorManifest:
+    """Return the manifest for `base`, rebuilding it if it is stale."""
+    files = yearly_files(directory, base)
+    manifest = _read(manifest_path(directory, base), window)
+    if manifest is not None and files_current(manifest.files, files):
+        return manifest
+    if files:
+        print(f"  rebuilding cursor manifest for {directory / base}")
+    return rebuild_manifest(directory, base, window)
+
+
+def _refresh_files(
+    directory: pathlib.Path,
+    manifest: CursorManifest,
+    names: Iterable[str],
+    garbage: Optional[dict[str, int]] = None,
+) -> None:
+    for name in names:
+        added = (garbage or {}).get(name, 0)
+        manifest.files[name] = {
+            **file_fingerprint(directory / name),
+            "garbage": manifest.files.get(name, {}).get("garbage", 0) + added,
+        }
+
+
+def record_append(
+    directory: pathlib.Path,
+    base: str,
+    manifest: CursorManifest,
+    runs: Iterable[WorkflowRun],
+    locations: dict[int, Location],
+) -> None:
+    """Fold runs just appended to the yearly files into `manifest`."""
+    touched = set()
+    for run in runs:
+        manifest.add(run.id, run.created_at, locations.get(run.id))
+        touched.add(f"{base}-{run.created_at.year}.jsonl")
+    _refresh_files(directory, manifest, touched)
+    manifest.trim()
+    write_manifest(directory, base, manifest)
+
+
+def record_upsert(
+    directory: pathlib.Path,
+    base: str,
+    manifest: CursorManifest,
+    locations: dict[int, Location],
+    garbage: dict[str, int],
+) -> None:
+    """Fold runs just rewritten in place (or moved) into `manifest`."""
+    for run_id, location in locations.items():
+        if run_id in manifest.recent_ids:
+            manifest.offsets[run_id] = location
+    _refresh_files(directory, manifest, garbage, garbage)
+    write_manifest(directory, base, manifest)
+
+
+def record_delete(
+    directory: pathlib.Path,
+    base: str,
+    manifest: CursorManifest,
+    run_ids: Iterable[int],
+    garbage: dict[str, int],
+) -> None:
+    """Fold runs just blanked out of the yearly files into `manifest`."""
+    for run_id in run_ids:
+        manifest.remove(run_id)
+    _refresh_files(directory, manifest, garbage, garbage)
+    write_manifest(directory, base, manifest)
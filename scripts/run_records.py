@@ -0,0 +1,110 @@
+"""Compact typed record for a workflow run.
+
+GitHub's run JSON carries dozens of fields (repository, actor, head_commit
+blobs, ...) that nothing downstream reads. Runs are projected into a
+slotted WorkflowRun as soon as a page is parsed, and the JSONL load/append
+and export paths all pass these records around instead of dicts.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+GITHUB_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# JSONL schemas. Keys map to WorkflowRun attributes, except run_id -> id.
+WORKFLOW_JSONL_FIELDS = (
+    "run_id",
+    "created_at",
+    "duration",
+    "jobs",
+    "conclusion",
+    "html_url",
+)
+MULTI_REPO_JSONL_FIELDS = (
+    "run_id",
+    "created_at",
+    "duration",
+    "conclusion",
+    "html_url",
+    "head_sha",
+    "commit_title",
+)
+
+
+def _parse_github_time(value: str) -> datetime:
+    return datetime.strptime(value, GITHUB_TIME_FORMAT).replace(
+        tzinfo=timezone.utc
+    )
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Conclusions repeat across every run; share one string per value.
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(slots=True)
+class WorkflowRun:
+    id: int
+    created_at: datetime
+    conclusion: Optional[str] = None
+    duration: float = 0.0
+    jobs: dict[str, float] = field(default_factory=dict)
+    html_url: str = ""
+    head_sha: str = ""
+    commit_title: str = ""
+    # Only known for runs fresh from the API; never persisted.
+    updated_at: Optional[datetime] = None
+    run_started_at: Optional[datetime] = None
+    jobs_url: str = ""
+
+    @classmethod
+    def from_api(cls, run: dict) -> "WorkflowRun":
+        """Project a run object of the GitHub runs listing."""
+        created_at = _parse_github_time(run["created_at"])
+        # run_started_at is the start of the *latest attempt*. For rerun
+        # runs, created_at is the first attempt's queue time (possibly
+        # days earlier), so using it inflates wall-clock. Matches what
+        # GitHub's UI shows per-run.
+        started_raw = run.get("run_started_at")
+        head_commit = run.get("head_commit") or {}
+        message = head_commit.get("message") or ""
+        return cls(
+            id=run["id"],
+            created_at=created_at,
+            conclusion=_intern(run.get("conclusion")),
+            html_url=run.get("html_url") or "",
+            head_sha=run.get("head_sha") or "",
+            commit_title=message.splitlines()[0] if message else "",
+            updated_at=_parse_github_time(run["updated_at"]),
+            run_started_at=(
+                _parse_github_time(started_raw) if started_raw else created_at
+            ),
+            jobs_url=run.get("jobs_url") or "",
+        )
+
+    @classmethod
+    def from_jsonl(cls, entry: dict) -> "WorkflowRun":
+        """Rebuild a run from a line written by to_jsonl (either schema)."""
+        return cls(
+            id=entry["run_id"],
+            created_at=datetime.fromisoformat(entry["created_at"]),
+            conclusion=_intern(entry.get("conclusion")),
+            duration=entry.get("duration", 0.0),
+            jobs=entry.get("jobs") or {},
+            html_url=entry.get("html_url", ""),
+            head_sha=entry.get("head_sha", ""),
+            commit_title=entry.get("commit_title", ""),
+        )
+
+    def to_jsonl(self, fields: tuple[str, ...]) -> dict:
+        out: dict = {}
+        for name in fields:
+            if name == "run_id":
+                out[name] = self.id
+            elif name == "created_at":
+                out[name] = self.created_at.isoformat()
+            else:
+                out[name] = getattr(self, name)
+        return out
@@ -0,0 +1,59 @@
+"""Helpers shared by the sidecar files kept next to the yearly JSONL.
+
+Data is stored as `<base>-<year>.jsonl` files. Summaries derived from them
+(run_manifest's cursor manifest, image_index's latest-entry index) are kept
+in small JSON sidecars that record the size and sha256 of every yearly file
+they were built from, so a stale sidecar is noticed and rebuilt.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+from typing import Optional
+
+
+def yearly_files(directory: pathlib.Path, base: str) -> list[pathlib.Path]:
+    return sorted(directory.glob(f"{base}-*.jsonl"))
+
+
+def file_fingerprint(path: pathlib.Path) -> dict:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return {"size": path.stat().st_size, "sha256": digest.hexdigest()}
+
+
+def files_current(recorded: dict[str, dict], files: list[pathlib.Path]) -> bool:
+    """Whether `files` are exactly those fingerprinted in `recorded`."""
+    if set(recorded) != {p.name for p in files}:
+        return False
+    for path in files:
+        # Size first: an append always changes it, and it costs one stat.
+        if path.stat().st_size != recorded[path.name]["size"]:
+            return False
+        if file_fingerprint(path)["sha256"] != recorded[path.name]["sha256"]:
+            return False
+    return True
+
+
+def read_sidecar(path: pathlib.Path, version: int) -> Optional[dict]:
+    """Contents of a sidecar; None if missing, unreadable or outdated."""
+    try:
+        with path.open() as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != version:
+        return None
+    return data
+
+
+def write_sidecar(path: pathlib.Path, data: dict) -> None:
+    """Write a sidecar atomically, so readers never see half of one."""
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
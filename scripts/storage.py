@@ -0,0 +1,778 @@
+"""Storage backends for the data-storage history.
+
+The yearly JSONL files on the data-storage branch stay the canonical,
+git-friendly record:
+
+    workflow_runs/<base>-<year>.jsonl           (runs of PRIMARY_REPO)
+    workflow_runs/<repo_short>/<base>-<year>.jsonl
+    docker_image_sizes-<year>.jsonl
+
+JsonlStorage reads them through jsonl_reader (memory-mapped, decoded lazily,
+merged in time order, with a `since` seek) and appends to them directly, so
+lookups that need every record are still a scan. The newest image size
+entry per tag is kept in a sidecar index (see image_index). SqliteStorage
+keeps the same records in an indexed SQLite database and mirrors every
+append to the JSONL files. On open
+it re-imports only the files whose content changed since the last sync, so a
+database kept in a CI cache stays consistent with the branch checkout.
+
+Runs re-scraped with a changed conclusion are upserted, or deleted when
+the scrape no longer keeps them. In the JSONL files, the id -> (file,
+offset) index in the cursor manifest locates the old line: it is
+rewritten in place, or tombstoned (and the run appended, see
+run_manifest). `compact` rewrites a year file once its tombstones and
+padding pass COMPACT_GARBAGE_RATIO of its size.
+
+Both backends expose the same methods; `open_storage` picks one.
+
+    python scripts/storage.py import --data-dir data-storage --db runs.db
+    python scripts/storage.py export --db runs.db --out-dir data-storage
+    python scripts/storage.py compact --data-dir data-storage
+"""
+
+import argparse
+import json
+import pathlib
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+import image_index
+import run_manifest
+import sidecar
+from jsonl_reader import read_jsonl
+from run_manifest import CursorManifest, Location
+from run_records import (
+    MULTI_REPO_JSONL_FIELDS,
+    WORKFLOW_JSONL_FIELDS,
+    WorkflowRun,
+)
+
+# Repository whose workflows are stored at the top of workflow_runs/.
+PRIMARY_REPO = "autowarefoundation/autoware"
+DEFAULT_ID_WINDOW = timedelta(days=2)
+DOCKER_SIZES_BASE = "docker_image_sizes"
+# One size scrape stamps its tags over minutes; allow for overlapping runs.
+DOCKER_SIZES_DISORDER = timedelta(hours=1)
+# Share of a year file's bytes that may be tombstones/padding before
+# compaction rewrites it.
+COMPACT_GARBAGE_RATIO = 0.25
+
+
+def workflow_basename(workflow_id: str) -> str:
+    if workflow_id.endswith(".yaml"):
+        return workflow_id[:-5]
+    if workflow_id.endswith(".yml"):
+        return workflow_id[:-4]
+    return workflow_id
+
+
+def repo_short_name(repo: str) -> str:
+    return repo.rsplit("/", 1)[-1]
+
+
+def workflow_runs_dir(data_dir: pathlib.Path) -> pathlib.Path:
+    return data_dir / "workflow_runs"
+
+
+def _base_of(path: pathlib.Path) -> str:
+    # "<base>-<year>.jsonl" -> "<base>"
+    return path.stem.rsplit("-", 1)[0]
+
+
+class JsonlStorage:
+    def __init__(
+        self,
+        data_dir: pathlib.Path,
+        primary_repo: str = PRIMARY_REPO,
+        id_window: timedelta = DEFAULT_ID_WINDOW,
+    ):
+        self.data_dir = pathlib.Path(data_dir)
+        self.primary = repo_short_name(primary_repo)
+        self.id_window = id_window
+        # Loaded (and validated) on first use, then kept current by appends.
+        self._latest: Optional[image_index.LatestIndex] = None
+
+    def _series(
+        self, repo: str, workflow_id: str
+    ) -> tuple[pathlib.Path, str, tuple[str, ...]]:
+        """(directory, file base, JSONL schema) of a run series."""
+        base = workflow_basename(workflow_id)
+        directory = workflow_runs_dir(self.data_dir)
+        short = repo_short_name(repo)
+        if short == self.primary:
+            return directory, base, WORKFLOW_JSONL_FIELDS
+        return directory / short, base, MULTI_REPO_JSONL_FIELDS
+
+    def run_series(self) -> list[tuple[str, str]]:
+        """Every (repo short name, workflow base) with stored runs."""
+        series = set()
+        root = workflow_runs_dir(self.data_dir)
+        for path in root.glob("*.jsonl"):
+            series.add((self.primary, _base_of(path)))
+        for path in root.glob("*/*.jsonl"):
+            series.add((path.parent.name, _base_of(path)))
+        return sorted(series)
+
+    def run_files(self, repo: str, workflow_id: str) -> list[pathlib.Path]:
+        directory, base, _ = self._series(repo, workflow_id)
+        return sidecar.yearly_files(directory, base)
+
+    def image_size_files(self) -> list[pathlib.Path]:
+        return sorted(self.data_dir.glob(f"{DOCKER_SIZES_BASE}-*.jsonl"))
+
+    def run_cursor(self, repo: str, workflow_id: str) -> CursorManifest:
+        """Cursor and recent ids, from the series' sidecar manifest."""
+        directory, base, _ = self._series(repo, workflow_id)
+        return run_manifest.load_manifest(directory, base, self.id_window)
+
+    def load_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        since: Optional[datetime] = None,
+    ) -> list[WorkflowRun]:
+        """Stored runs of a series, created at or after since, oldest first."""
+        # Late runs from the cursor overlap land after newer lines, but never
+        # more than the id window behind them.
+        records = read_jsonl(
+            self.run_files(repo, workflow_id),
+            "created_at",
+            since=since,
+            disorder=self.id_window,
+        )
+        return [WorkflowRun.from_jsonl(record.data) for record in records]
+
+    def append_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        runs: list[WorkflowRun],
+        cursor: Optional[CursorManifest] = None,
+    ) -> int:
+        """Append runs to the yearly files and fold them into the manifest."""
+        if not runs:
+            return 0
+        directory, base, fields = self._series(repo, workflow_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        if cursor is None:
+            # Validate before writing: afterwards the files no longer match.
+            cursor = run_manifest.load_manifest(directory, base, self.id_window)
+
+        by_year: dict[int, list[WorkflowRun]] = defaultdict(list)
+        for run in runs:
+            by_year[run.created_at.year].append(run)
+
+        total = 0
+        locations: dict[int, Location] = {}
+        for year, year_runs in sorted(by_year.items()):
+            year_runs.sort(key=lambda r: r.created_at)
+            path = directory / f"{base}-{year}.jsonl"
+            offset = path.stat().st_size if path.exists() else 0
+            with path.open("a") as f:
+                for run in year_runs:
+                    # json.dumps escapes non-ASCII, so len() is the byte size.
+                    line = json.dumps(run.to_jsonl(fields))
+                    f.write(line + "\n")
+                    locations[run.id] = (path.name, offset, len(line))
+                    offset += len(line) + 1
+                    total += 1
+            print(f"    appended {len(year_runs)} -> {path}")
+        run_manifest.record_append(directory, base, cursor, runs, locations)
+        return total
+
+    def upsert_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        runs: list[WorkflowRun],
+        cursor: Optional[CursorManifest] = None,
+    ) -> int:
+        """Replace stored runs by id; runs not stored yet are appended.
+
+        A run in the manifest's id index costs one seek. Older runs are
+        located by scanning their year file.
+        """
+        if not runs:
+            return 0
+        directory, base, fields = self._series(repo, workflow_id)
+        if cursor is None:
+            cursor = run_manifest.load_manifest(
+                directory, base, self.id_window
+            )
+
+        missing: list[WorkflowRun] = []
+        locations: dict[int, Location] = {}
+        garbage: dict[str, int] = defaultdict(int)
+        for run in runs:
+            location = cursor.offsets.get(run.id) or _locate(
+                directory / f"{base}-{run.created_at.year}.jsonl", run.id
+            )
+            if location is None:
+                missing.append(run)
+                continue
+            name = location[0]
+            line = json.dumps(run.to_jsonl(fields)).encode()
+            moved, added = run_manifest.replace_line(
+                directory / name, location, line
+            )
+            assert moved is not None
+            locations[run.id] = moved
+            garbage[name] += added
+        if locations:
+            print(f"    updated {len(locations)} runs in {directory / base}")
+            run_manifest.record_upsert(
+                directory, base, cursor, locations, garbage
+            )
+        return len(locations) + self.append_runs(
+            repo, workflow_id, missing, cursor
+        )
+
+    def delete_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        runs: list[WorkflowRun],
+        cursor: Optional[CursorManifest] = None,
+    ) -> int:
+        """Tombstone stored runs by id; runs not stored are ignored."""
+        if not runs:
+            return 0
+        directory, base, _ = self._series(repo, workflow_id)
+        if cursor is None:
+            cursor = run_manifest.load_manifest(
+                directory, base, self.id_window
+            )
+
+        deleted: list[int] = []
+        garbage: dict[str, int] = defaultdict(int)
+        for run in runs:
+            location = cursor.offsets.get(run.id) or _locate(
+                directory / f"{base}-{run.created_at.year}.jsonl", run.id
+            )
+            if location is None:
+                continue
+            name = location[0]
+            _, added = run_manifest.replace_line(
+                directory / name, location, None
+            )
+            garbage[name] += added
+            deleted.append(run.id)
+        if deleted:
+            print(f"    removed {len(deleted)} runs from {directory / base}")
+            run_manifest.record_delete(
+                directory, base, cursor, deleted, garbage
+            )
+        return len(deleted)
+
+    def compact(
+        self, threshold: float = COMPACT_GARBAGE_RATIO
+    ) -> list[pathlib.Path]:
+        """Rewrite the run files whose garbage ratio exceeds threshold."""
+        rewritten = []
+        for short, base in self.run_series():
+            directory, _, _ = self._series(short, base)
+            cursor = run_manifest.load_manifest(
+                directory, base, self.id_window
+            )
+            paths = [
+                directory / name
+                for name, info in sorted(cursor.files.items())
+                if info["size"]
+                and info.get("garbage", 0) / info["size"] > threshold
+            ]
+            if not paths:
+                continue
+            for path in paths:
+                run_manifest.compact_file(path)
+            run_manifest.rebuild_manifest(directory, base, self.id_window)
+            rewritten += paths
+        return rewritten
+
+    def load_image_sizes(
+        self, since: Optional[datetime] = None
+    ) -> list[dict]:
+        """Docker image size entries (fetched at or after since), in order."""
+        records = read_jsonl(
+            self.image_size_files(),
+            "fetched_at",
+            since=since,
+            disorder=DOCKER_SIZES_DISORDER,
+        )
+        return [record.data for record in records]
+
+    def append_image_sizes(self, entries: Iterable[dict]) -> int:
+        entries = list(entries)
+        if not entries:
+            return 0
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # Validate the index against the files before they change.
+        latest = self._latest_index()
+        touched = set()
+        for entry in entries:
+            year = datetime.fromisoformat(entry["fetched_at"]).year
+            path = self.data_dir / f"{DOCKER_SIZES_BASE}-{year}.jsonl"
+            with path.open("a") as f:
+                f.write(json.dumps(entry) + "\n")
+            touched.add(path.name)
+        image_index.record_append(
+            self.data_dir, DOCKER_SIZES_BASE, latest, entries, touched
+        )
+        return len(entries)
+
+    def _latest_index(self) -> image_index.LatestIndex:
+        if self._latest is None:
+            self._latest = image_index.load_index(
+                self.data_dir, DOCKER_SIZES_BASE
+            )
+        return self._latest
+
+    def latest_image_sizes(self) -> dict[str, dict]:
+        """tag -> its most recent image size entry, from the sidecar index."""
+        return self._latest_index().latest
+
+    def latest_digest(self, tag: str) -> str:
+        """Digest of the most recent entry for tag, or '' if none."""
+        return self._latest_index().digest(tag)
+
+    def close(self) -> None:
+        pass
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    repo TEXT NOT NULL,
+    workflow TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    duration REAL NOT NULL DEFAULT 0,
+    jobs TEXT,
+    conclusion TEXT,
+    html_url TEXT NOT NULL DEFAULT '',
+    head_sha TEXT NOT NULL DEFAULT '',
+    commit_title TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (repo, workflow, run_id)
+);
+CREATE INDEX IF NOT EXISTS workflow_runs_by_time
+    ON workflow_runs (repo, workflow, created_at);
+CREATE INDEX IF NOT EXISTS workflow_runs_by_run_id
+    ON workflow_runs (run_id);
+
+CREATE TABLE IF NOT EXISTS docker_image_sizes (
+    tag TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    digest TEXT NOT NULL DEFAULT '',
+    entry TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS docker_image_sizes_by_tag
+    ON docker_image_sizes (tag, fetched_at);
+
+-- JSONL files already imported, by path relative to the data dir.
+CREATE TABLE IF NOT EXISTS synced_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+"""
+
+_RUN_COLUMNS = (
+    "run_id, created_at, duration, jobs, conclusion, html_url, head_sha, "
+    "commit_title"
+)
+# Insert, or refresh a re-scraped run in place (its rowid is kept).
+_UPSERT_RUN = (
+    "INSERT INTO workflow_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT (repo, workflow, run_id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _RUN_COLUMNS.split(", ")[1:])
+)
+
+
+def _run_row(repo: str, workflow: str, run: WorkflowRun) -> tuple:
+    return (
+        repo,
+        workflow,
+        run.id,
+        run.created_at.isoformat(),
+        run.duration,
+        json.dumps(run.jobs) if run.jobs else None,
+        run.conclusion,
+        run.html_url,
+        run.head_sha,
+        run.commit_title,
+    )
+
+
+def _run_from_row(row: tuple) -> WorkflowRun:
+    run_id, created_at, duration, jobs, conclusion, url, sha, title = row
+    return WorkflowRun.from_jsonl(
+        {
+            "run_id": run_id,
+            "created_at": created_at,
+            "duration": duration,
+            "jobs": json.loads(jobs) if jobs else {},
+            "conclusion": conclusion,
+            "html_url": url,
+            "head_sha": sha,
+            "commit_title": title,
+        }
+    )
+
+
+def _locate(path: pathlib.Path, run_id: int) -> Optional[Location]:
+    return run_manifest.locate_lines(path, "run_id", [run_id]).get(run_id)
+
+
+class SqliteStorage:
+    def __init__(
+        self,
+        db_path: pathlib.Path,
+        mirror: Optional[JsonlStorage] = None,
+        id_window: timedelta = DEFAULT_ID_WINDOW,
+    ):
+        self.mirror = mirror
+        self.id_window = id_window
+        # Scrapes run series on worker threads; one connection, serialized.
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _key(self, repo: str, workflow_id: str) -> tuple[str, str]:
+        return repo_short_name(repo), workflow_basename(workflow_id)
+
+    def run_cursor(self, repo: str, workflow_id: str) -> CursorManifest:
+        key = self._key(repo, workflow_id)
+        cursor = CursorManifest(window=self.id_window)
+        with self._lock:
+            count, max_created_at = self.conn.execute(
+                "SELECT count(*), max(created_at) FROM workflow_runs"
+                " WHERE repo = ? AND workflow = ?",
+                key,
+            ).fetchone()
+            if max_created_at is None:
+                return cursor
+            cursor.max_created_at = datetime.fromisoformat(max_created_at)
+            floor = (cursor.max_created_at - self.id_window).isoformat()
+            rows = self.conn.execute(
+                "SELECT run_id, created_at FROM workflow_runs"
+                " WHERE repo = ? AND workflow = ? AND created_at >= ?",
+                (*key, floor),
+            ).fetchall()
+        cursor.run_count = count
+        cursor.recent_ids = {
+            run_id: datetime.fromisoformat(created_at)
+            for run_id, created_at in rows
+        }
+        return cursor
+
+    def load_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        since: Optional[datetime] = None,
+    ) -> list[WorkflowRun]:
+        floor = since.isoformat() if since else ""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {_RUN_COLUMNS} FROM workflow_runs"
+                " WHERE repo = ? AND workflow = ? AND created_at >= ?"
+                " ORDER BY created_at, rowid",
+                (*self._key(repo, workflow_id), floor),
+            ).fetchall()
+        return [_run_from_row(row) for row in rows]
+
+    def append_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        runs: list[WorkflowRun],
+        cursor: Optional[CursorManifest] = None,
+    ) -> int:
+        if not runs:
+            return 0
+        if self.mirror is not None:
+            self.mirror.append_runs(repo, workflow_id, runs)
+        self._write_runs(repo, workflow_id, runs)
+        if cursor is not None:
+            for run in runs:
+                cursor.add(run.id, run.created_at)
+            cursor.trim()
+        return len(runs)
+
+    def upsert_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        runs: list[WorkflowRun],
+        cursor: Optional[CursorManifest] = None,
+    ) -> int:
+        if not runs:
+            return 0
+        if self.mirror is not None:
+            self.mirror.upsert_runs(repo, workflow_id, runs)
+        self._write_runs(repo, workflow_id, runs)
+        if cursor is not None:
+            for run in runs:
+                if run.id not in cursor.recent_ids:
+                    cursor.add(run.id, run.created_at)
+            cursor.trim()
+        return len(runs)
+
+    def delete_runs(
+        self,
+        repo: str,
+        workflow_id: str,
+        runs: list[WorkflowRun],
+        cursor: Optional[CursorManifest] = None,
+    ) -> int:
+        if not runs:
+            return 0
+        if self.mirror is not None:
+            self.mirror.delete_runs(repo, workflow_id, runs)
+        with self._lock, self.conn:
+            deleted = self.conn.executemany(
+                "DELETE FROM workflow_runs"
+                " WHERE repo = ? AND workflow = ? AND run_id = ?",
+                [(*self._key(repo, workflow_id), run.id) for run in runs],
+            ).rowcount
+        self._mark_years_synced(repo, workflow_id, runs)
+        if cursor is not None:
+            for run in runs:
+                if run.id in cursor.recent_ids:
+                    cursor.remove(run.id)
+        return deleted
+
+    def _write_runs(
+        self, repo: str, workflow_id: str, runs: list[WorkflowRun]
+    ) -> None:
+        repo_key, workflow = self._key(repo, workflow_id)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                _UPSERT_RUN,
+                [_run_row(repo_key, workflow, run) for run in runs],
+            )
+        self._mark_years_synced(repo, workflow_id, runs)
+
+    def load_image_sizes(
+        self, since: Optional[datetime] = None
+    ) -> list[dict]:
+        floor = since.isoformat() if since else ""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT entry FROM docker_image_sizes WHERE fetched_at >= ?"
+                " ORDER BY fetched_at, rowid",
+                (floor,),
+            ).fetchall()
+        return [json.loads(entry) for (entry,) in rows]
+
+    def _insert_image_sizes(self, entries: Iterable[dict]) -> None:
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO docker_image_sizes VALUES (?, ?, ?, ?)",
+            [
+                (
+                    entry.get("tag", ""),
+                    entry.get("fetched_at", ""),
+                    entry.get("digest", ""),
+                    json.dumps(entry),
+                )
+                for entry in entries
+            ],
+        )
+
+    def append_image_sizes(self, entries: Iterable[dict]) -> int:
+        entries = list(entries)
+        if self.mirror is not None:
+            self.mirror.append_image_sizes(entries)
+        with self._lock, self.conn:
+            self._insert_image_sizes(entries)
+        if self.mirror is not None:
+            self._mark_synced(self.mirror.image_size_files())
+        return len(entries)
+
+    def latest_image_sizes(self) -> dict[str, dict]:
+        with self._lock:
+            # With MAX(), SQLite takes the bare columns from the max row.
+            rows = self.conn.execute(
+                "SELECT tag, entry, MAX(fetched_at) FROM docker_image_sizes"
+                " GROUP BY tag"
+            ).fetchall()
+        return {tag: json.loads(entry) for tag, entry, _ in rows}
+
+    def latest_digest(self, tag: str) -> str:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest FROM docker_image_sizes WHERE tag = ?"
+                " ORDER BY fetched_at DESC LIMIT 1",
+                (tag,),
+            ).fetchone()
+        return row[0] if row else ""
+
+    def _mark_years_synced(
+        self, repo: str, workflow_id: str, runs: list[WorkflowRun]
+    ) -> None:
+        """Record the mirror's year files of runs as in sync."""
+        if self.mirror is None:
+            return
+        years = {run.created_at.year for run in runs}
+        self._mark_synced(
+            p
+            for p in self.mirror.run_files(repo, workflow_id)
+            if int(p.stem.rsplit("-", 1)[1]) in years
+        )
+
+    def _mark_synced(self, paths: Iterable[pathlib.Path]) -> None:
+        assert self.mirror is not None
+        rows = []
+        for path in paths:
+            fp = sidecar.file_fingerprint(path)
+            rel = str(path.relative_to(self.mirror.data_dir))
+            rows.append((rel, fp["size"], fp["sha256"]))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO synced_files VALUES (?, ?, ?)", rows
+            )
+
+    def sync_from_jsonl(self, source: JsonlStorage) -> int:
+        """Import every JSONL file that changed since it was last synced.
+
+        Rows are keyed, so re-importing a file that only grew inserts just
+        its new lines. Returns the number of files imported.
+        """
+        with self._lock:
+            synced = {
+                path: (size, sha256)
+                for path, size, sha256 in self.conn.execute(
+                    "SELECT path, size, sha256 FROM synced_files"
+                )
+            }
+        imported = 0
+        run_files = [
+            (series, path)
+            for series in source.run_series()
+            for path in source.run_files(*series)
+        ]
+        docker_files = [(None, path) for path in source.image_size_files()]
+        for series, path in run_files + docker_files:
+            rel = str(path.relative_to(source.data_dir))
+            fp = sidecar.file_fingerprint(path)
+            if synced.get(rel) == (fp["size"], fp["sha256"]):
+                continue
+            with path.open() as f:
+                # Blank lines are tombstones of upserted runs.
+                entries = [json.loads(line) for line in f if line.strip()]
+            with self._lock, self.conn:
+                if series is None:
+                    self._insert_image_sizes(entries)
+                else:
+                    self.conn.executemany(
+                        _UPSERT_RUN,
+                        [
+                            _run_row(*series, WorkflowRun.from_jsonl(e))
+                            for e in entries
+                        ],
+                    )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO synced_files VALUES (?, ?, ?)",
+                    (rel, fp["size"], fp["sha256"]),
+                )
+            print(f"  imported {len(entries)} rows from {path}")
+            imported += 1
+        return imported
+
+    def export_jsonl(self, target: JsonlStorage) -> None:
+        """Write the whole database as fresh yearly JSONL files."""
+        with self._lock:
+            series = self.conn.execute(
+                "SELECT DISTINCT repo, workflow FROM workflow_runs"
+            ).fetchall()
+        for repo, workflow in series:
+            directory, base, fields = target._series(repo, workflow)
+            directory.mkdir(parents=True, exist_ok=True)
+            for path in sidecar.yearly_files(directory, base):
+                path.unlink()
+            by_year: dict[int, list[WorkflowRun]] = defaultdict(list)
+            for run in self.load_runs(repo, workflow):
+                by_year[run.created_at.year].append(run)
+            for year, runs in by_year.items():
+                with (directory / f"{base}-{year}.jsonl").open("w") as f:
+                    for run in runs:
+                        f.write(json.dumps(run.to_jsonl(fields)) + "\n")
+            run_manifest.rebuild_manifest(directory, base, target.id_window)
+        for path in target.image_size_files():
+            path.unlink()
+        target.append_image_sizes(self.load_image_sizes())
+
+    def compact(
+        self, threshold: float = COMPACT_GARBAGE_RATIO
+    ) -> list[pathlib.Path]:
+        """Compact the JSONL mirror; the database itself has no garbage."""
+        if self.mirror is None:
+            return []
+        rewritten = self.mirror.compact(threshold)
+        self._mark_synced(rewritten)
+        return rewritten
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+Storage = JsonlStorage | SqliteStorage
+
+
+def open_storage(
+    data_dir: pathlib.Path,
+    sqlite_db: Optional[pathlib.Path] = None,
+    primary_repo: str = PRIMARY_REPO,
+    id_window: timedelta = DEFAULT_ID_WINDOW,
+) -> Storage:
+    """JSONL storage over data_dir, or an SQLite index mirroring it."""
+    jsonl = JsonlStorage(data_dir, primary_repo, id_window)
+    if sqlite_db is None:
+        return jsonl
+    store = SqliteStorage(sqlite_db, mirror=jsonl, id_window=id_window)
+    store.sync_from_jsonl(jsonl)
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Import data-storage JSONL into SQLite, or export it back."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="Sync JSONL into the DB.")
+    import_cmd.add_argument("--data-dir", required=True, type=pathlib.Path)
+    import_cmd.add_argument("--db", required=True, type=pathlib.Path)
+    export_cmd = commands.add_parser(
+        "export", help="Rewrite JSONL from the DB."
+    )
+    export_cmd.add_argument("--db", required=True, type=pathlib.Path)
+    export_cmd.add_argument("--out-dir", required=True, type=pathlib.Path)
+    compact_cmd = commands.add_parser(
+        "compact", help="Rewrite JSONL files with many tombstones."
+    )
+    compact_cmd.add_argument("--data-dir", required=True, type=pathlib.Path)
+    compact_cmd.add_argument(
+        "--threshold", type=float, default=COMPACT_GARBAGE_RATIO
+    )
+    args = parser.parse_args()
+
+    store: Storage
+    if args.command == "import":
+        store = SqliteStorage(args.db)
+        count = store.sync_from_jsonl(JsonlStorage(args.data_dir))
+        print(f"Imported {count} changed files into {args.db}")
+    elif args.command == "compact":
+        store = JsonlStorage(args.data_dir)
+        count = len(store.compact(args.threshold))
+        print(f"Compacted {count} files in {args.data_dir}/")
+    else:
+        store = SqliteStorage(args.db)
+        store.export_jsonl(JsonlStorage(args.out_dir))
+        print(f"Exported {args.db} to {args.out_dir}/")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Ordering and seeking of jsonl_reader.read_jsonl."""
+
+import json
+import pathlib
+from datetime import datetime, timedelta, timezone
+
+from jsonl_reader import read_jsonl
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def write(path: pathlib.Path, hours: list[int]) -> pathlib.Path:
+    with path.open("w") as f:
+        for h in hours:
+            created_at = (T0 + timedelta(hours=h)).isoformat()
+            f.write(json.dumps({"id": h, "created_at": created_at}) + "\n")
+    return path
+
+
+def ids(records) -> list[int]:
+    return [record["id"] for record in records]
+
+
+def test_merges_overlapping_files(tmp_path: pathlib.Path):
+    a = write(tmp_path / "runs-2025.jsonl", [0, 2, 4, 6])
+    b = write(tmp_path / "other-2025.jsonl", [1, 3, 5])
+    assert ids(read_jsonl([a, b])) == list(range(7))
+
+
+def test_sorts_late_lines(tmp_path: pathlib.Path):
+    path = write(tmp_path / "runs-2025.jsonl", [0, 1, 3, 4, 2, 5])
+    assert ids(read_jsonl([path])) == list(range(6))
+
+
+def test_since_finds_late_lines_within_disorder(tmp_path: pathlib.Path):
+    hours = list(range(0, 200, 2))
+    hours.insert(150 // 2 + 3, 151)  # written after three newer lines
+    path = write(tmp_path / "runs-2025.jsonl", hours)
+    since = T0 + timedelta(hours=150)
+    got = ids(read_jsonl([path], since=since, disorder=timedelta(hours=8)))
+    assert got == sorted(h for h in hours if h >= 150)
+
+
+def test_since_skips_blank_lines(tmp_path: pathlib.Path):
+    path = write(tmp_path / "runs-2025.jsonl", list(range(100)))
+    lines = path.read_bytes().split(b"\n")
+    for i in range(40, 60):
+        lines[i] = b" " * len(lines[i])
+    path.write_bytes(b"\n".join(lines))
+    for h in range(0, 101, 3):
+        since = T0 + timedelta(hours=h)
+        expected = [i for i in range(100) if i >= h and not 40 <= i < 60]
+        assert ids(read_jsonl([path], since=since)) == expected
+
+
+def test_since_skips_earlier_years(tmp_path: pathlib.Path):
+    old = tmp_path / "runs-2024.jsonl"
+    old.write_text("not json\n")  # never opened
+    path = write(tmp_path / "runs-2025.jsonl", [0, 1, 2])
+    since = T0 + timedelta(hours=1)
+    assert ids(read_jsonl([old, path], since=since)) == [1, 2]
@@ -0,0 +1,232 @@
+"""Round trips of JsonlStorage and item_history: append, upsert, tombstones,
+compaction."""
+
+import pathlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import github_api
+import item_history
+import measure_workflows as mw
+import perf_metrics
+import sidecar
+from jsonl_reader import read_jsonl
+from run_records import WorkflowRun
+from storage import JsonlStorage
+
+REPO = "autowarefoundation/autoware"
+WORKFLOW = "build.yaml"
+T0 = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def make_runs(
+    ids: range, conclusion: str = "failure", duration: float = 1.0
+) -> list[WorkflowRun]:
+    # One run a day: the reader's 2-day disorder spans only a few lines,
+    # so a `since` bisection really lands among them.
+    return [
+        WorkflowRun(
+            id=i,
+            created_at=T0 + timedelta(days=i),
+            conclusion=conclusion,
+            duration=duration,
+        )
+        for i in ids
+    ]
+
+
+def ids_since(store: JsonlStorage, days: int) -> list[int]:
+    runs = store.load_runs(REPO, WORKFLOW, since=T0 + timedelta(days=days))
+    return [run.id for run in runs]
+
+
+@pytest.fixture
+def store(tmp_path: pathlib.Path) -> JsonlStorage:
+    store = JsonlStorage(tmp_path)
+    store.append_runs(REPO, WORKFLOW, make_runs(range(100)))
+    return store
+
+
+@pytest.mark.parametrize("tombstones", [2, 20])
+def test_since_reads_past_tombstones(store: JsonlStorage, tombstones: int):
+    # A longer line does not fit in place: the old one is blanked out.
+    longer = make_runs(range(100 - tombstones, 100), "cancelled", 12345.678)
+    store.upsert_runs(REPO, WORKFLOW, longer)
+    for days in range(101):
+        assert ids_since(store, days) == list(range(days, 100))
+
+
+def run_file(store: JsonlStorage) -> pathlib.Path:
+    (path,) = store.run_files(REPO, WORKFLOW)
+    return path
+
+
+def test_upsert_in_place_keeps_file_size(store: JsonlStorage):
+    path = run_file(store)
+    size = path.stat().st_size
+    # "ok" is shorter than "failure": rewritten in place, padded.
+    assert store.upsert_runs(REPO, WORKFLOW, make_runs(range(95, 100), "ok"))
+    assert path.stat().st_size == size
+    runs = store.load_runs(REPO, WORKFLOW)
+    assert [r.conclusion for r in runs[95:]] == ["ok"] * 5
+    assert len(runs) == 100
+
+
+def test_upsert_moved_run_twice(store: JsonlStorage):
+    # The manifest must point at the moved line for the second rewrite.
+    store.upsert_runs(REPO, WORKFLOW, make_runs(range(99, 100), "cancelled"))
+    store.upsert_runs(
+        REPO, WORKFLOW, make_runs(range(99, 100), "cancelled", 123456.5)
+    )
+    runs = store.load_runs(REPO, WORKFLOW)
+    assert [r.id for r in runs] == list(range(100))
+    assert runs[-1].duration == 123456.5
+    assert run_file(store).read_bytes().count(b"\n") == 102
+
+
+def test_upsert_appends_unknown_runs(store: JsonlStorage):
+    assert store.upsert_runs(REPO, WORKFLOW, make_runs(range(100, 103))) == 3
+    assert ids_since(store, 98) == [98, 99, 100, 101, 102]
+
+
+def test_manifest_rebuild_after_tombstones(store: JsonlStorage):
+    store.upsert_runs(REPO, WORKFLOW, make_runs(range(90, 100), "cancelled"))
+    cursor = store.run_cursor(REPO, WORKFLOW)
+    manifest = run_file(store).with_name("build.manifest.json")
+    manifest.unlink()
+    rebuilt = store.run_cursor(REPO, WORKFLOW)
+    assert rebuilt.max_created_at == cursor.max_created_at
+    assert rebuilt.offsets == cursor.offsets
+    assert rebuilt.files == cursor.files
+
+
+def test_compact_drops_garbage(store: JsonlStorage):
+    store.upsert_runs(REPO, WORKFLOW, make_runs(range(50, 100), "cancelled"))
+    before = store.load_runs(REPO, WORKFLOW)
+    path = run_file(store)
+    assert store.compact(threshold=0.0) == [path]
+    lines = path.read_bytes().splitlines()
+    assert all(line.strip() == line and line for line in lines)
+    assert store.load_runs(REPO, WORKFLOW) == before
+    cursor = store.run_cursor(REPO, WORKFLOW)
+    assert cursor.files[path.name]["garbage"] == 0
+    # Nothing left to compact.
+    assert store.compact(threshold=0.0) == []
+
+
+def test_delete_runs_tombstones_and_forgets(store: JsonlStorage):
+    assert store.delete_runs(REPO, WORKFLOW, make_runs([40, 99, 200])) == 2
+    expected = [i for i in range(100) if i not in (40, 99)]
+    assert [r.id for r in store.load_runs(REPO, WORKFLOW)] == expected
+    assert ids_since(store, 39) == expected[39:]
+    cursor = store.run_cursor(REPO, WORKFLOW)
+    assert 99 not in cursor.recent_ids and 99 not in cursor.offsets
+    assert cursor.run_count == 98
+    assert cursor.files[run_file(store).name]["garbage"] > 0
+
+
+def rescrape(workflow_key: str, store: JsonlStorage, fetched: list):
+    workflow_id = mw.WORKFLOWS[workflow_key]["id"]
+    cursor = store.run_cursor(mw.REPO, workflow_id)
+    stored = mw.stored_recent_runs(store, mw.REPO, workflow_id, cursor)
+    mw.merge_workflow_runs(workflow_key, store, fetched, cursor, stored)
+    return {r.id: r for r in store.load_runs(mw.REPO, workflow_id)}
+
+
+def test_rescraped_run_leaving_the_band_is_removed(tmp_path: pathlib.Path):
+    # health-check keeps successes of 3 min .. 10 h only.
+    store = JsonlStorage(tmp_path)
+    workflow_id = mw.WORKFLOWS["health-check"]["id"]
+    store.append_runs(
+        mw.REPO, workflow_id, make_runs(range(10), "success", 600)
+    )
+    runs = rescrape(
+        "health-check",
+        store,
+        # 8 was re-run and failed; the re-run of 9 was cancelled early.
+        make_runs(range(8, 9), "failure", 600)
+        + make_runs(range(9, 10), "cancelled", 120),
+    )
+    assert sorted(runs) == list(range(8))
+    # Gone for good, also once the manifest is rebuilt from the files.
+    run_file = store.run_files(mw.REPO, workflow_id)[0]
+    run_file.with_name("health-check.manifest.json").unlink()
+    assert store.run_cursor(mw.REPO, workflow_id).run_count == 8
+
+
+def test_rescraped_run_in_band_is_upserted(tmp_path: pathlib.Path):
+    # docker-build-and-push keeps every conclusion below 10 h.
+    store = JsonlStorage(tmp_path)
+    workflow_id = mw.WORKFLOWS["docker-build-and-push"]["id"]
+    store.append_runs(mw.REPO, workflow_id, make_runs(range(10), "failure", 60))
+    runs = rescrape(
+        "docker-build-and-push",
+        store,
+        make_runs(range(8, 9), "success", 30)
+        + make_runs(range(9, 10), "success", 3600 * 11),
+    )
+    assert sorted(runs) == list(range(9))
+    assert (runs[8].conclusion, runs[8].duration) == ("success", 30)
+
+
+class FakePullRequestAPI:
+    """Lists `pulls` the way the API pages them: newest update first,
+    stopping before the first one not updated since `since`."""
+
+    def __init__(self, pulls: list[dict]):
+        self.pulls = pulls
+        self.since: list = []
+        self.recorder = perf_metrics.Recorder()
+
+    def get_all_pull_requests(self, repo, since=None):
+        self.since.append(since)
+        listed = sorted(self.pulls, key=lambda pr: pr["updated_at"])[::-1]
+        cutoff = github_api.naive_utc(since)
+        return [
+            dict(pr)
+            for pr in listed
+            if not cutoff or pr["updated_at"] >= cutoff
+        ]
+
+
+def make_pull(number: int, updated_days: int, merged: bool = False) -> dict:
+    created = T0.replace(tzinfo=None) + timedelta(days=number)
+    updated = created + timedelta(days=updated_days)
+    return {
+        "id": 1000 + number,
+        "number": number,
+        "created_at": created,
+        "updated_at": updated,
+        "closed_at": updated if merged else None,
+        "merged_at": updated if merged else None,
+        "state": "closed" if merged else "open",
+        "title": f"PR {number}",
+        "html_url": f"https://github.com/{REPO}/pull/{number}",
+    }
+
+
+def test_pull_requests_are_upserted_past_the_cursor(tmp_path: pathlib.Path):
+    api = FakePullRequestAPI([make_pull(n, 0) for n in range(5)])
+    mw.collect_pull_requests(REPO, tmp_path, api)
+    # Merging 1 updates it; the repeat call only lists what changed.
+    api.pulls[1] = make_pull(1, 10, merged=True)
+    mw.collect_pull_requests(REPO, tmp_path, api)
+
+    assert api.since == [None, T0 + timedelta(days=4)]
+    directory = tmp_path / item_history.PULL_REQUESTS_DIR
+    paths = sidecar.yearly_files(directory, "autoware")
+    stored = {r["number"]: r.data for r in read_jsonl(paths)}
+    assert sorted(stored) == list(range(5))
+    assert stored[1]["state"] == "closed"
+    assert stored[1]["merged_at"] == (T0 + timedelta(days=11)).isoformat()
+    # The sidecar matches one rebuilt from the files.
+    state = item_history.load_cursor(directory, "autoware", "updated_at")
+    item_history.cursor_path(directory, "autoware").unlink()
+    rebuilt = item_history.load_cursor(directory, "autoware", "updated_at")
+    assert (state.cursor, state.count) == (T0 + timedelta(days=11), 5)
+    assert (rebuilt.cursor, rebuilt.count, rebuilt.files) == (
+        state.cursor,
+        state.count,
+        state.files,
+    )